@@ -1,37 +1,140 @@
-class AudioScheduler:
+import asyncio
+from collections import deque
+from itertools import islice
+
+
+class AudioScheduler(asyncio.Queue):
+    """
+    재생 대기열. asyncio.Queue를 상속하므로 재생 루프는 get()으로 다음 곡을 기다리고,
+    명령어 쪽은 기존처럼 동기 메서드(enqueue, remove, move 등)로 대기열을 다룸.
+    """
+
     def __init__(self):
-        self.queues = []
+        super().__init__()
         self.text_channel = None
         self.playing_message = None
+        self.listeners = []
         return
 
-    def enqueue(self, track):
+    def add_listener(self, callback):
+        """
+        대기열이 바뀔 때마다 호출될 콜백 등록 (예: 다음 곡 미리 불러오기).
+        """
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _notify(self):
+        for callback in self.listeners:
+            callback()
+
+    # asyncio.Queue의 저장소 훅(_init/_put/_get)을 재정의해 대기열을 직접 관리
+    def _init(self, maxsize):
+        self.queues = deque()
+
+    def _put(self, track):
         self.queues.append(track)
+
+    def _get(self):
+        removed = self.queues.popleft()
+        print(f"🎵 대기열 삭제: {removed.title}")
+        self._notify()
+        return removed
+
+    def enqueue(self, track):
+        self.put_nowait(track)
         print(f"🎵 대기열 추가: {track.title}")
+        self._notify()
         return track
 
     def enqueue_list(self, tracks):
-        self.queues.extend(tracks)
+        for track in tracks:
+            self.put_nowait(track)
         print(f"🎵 대기열 추가: {len(tracks)}곡")
+        self._notify()
         return tracks
 
     def clear(self):
+        for track in self.queues:
+            _discard(track)
         self.queues.clear()
         print("🎵 대기열 초기화")
+        self._notify()
         return
 
     def dequeue(self):
         if not self.is_empty():
-            removed = self.queues.pop(0)
-            print(f"🎵 대기열 삭제: {removed.title}")
-            return removed
+            return self.get_nowait()
+        return None
+
+    def requeue(self, track):
+        """
+        꺼냈지만 재생하지 못한 트랙을 대기열 맨 앞으로 되돌림.
+        """
+        self.put_nowait(track)
+        self.queues.rotate(1)
+        self._notify()
+        return track
+
+    def take(self, track):
+        """
+        재생을 시작한 트랙을 위치와 관계없이 대기열에서 꺼냄 (미리 띄운 소스는 정리하지 않음).
+        대기열에 없으면 None.
+        """
+        for index, queued in enumerate(self.queues):
+            if queued is track:
+                del self.queues[index]
+                print(f"🎵 대기열 삭제: {track.title}")
+                self._notify()
+                return track
         return None
 
+    def peek(self, count=1):
+        """
+        대기열 앞쪽의 트랙을 최대 count개까지 복사 없이 반환.
+        """
+        return list(islice(self.queues, count))
+
+    def remove(self, index):
+        """
+        index 위치(0부터 시작)의 트랙을 대기열에서 제거.
+        """
+        if not 0 <= index < len(self.queues):
+            raise IndexError("대기열 범위를 벗어났습니다")
+        # deque의 del은 가까운 끝 쪽에서 rotate 하므로 min(i, n - i)에 비례
+        removed = self.queues[index]
+        del self.queues[index]
+        _discard(removed)
+        print(f"🎵 대기열 삭제: {removed.title}")
+        self._notify()
+        return removed
+
+    def move(self, source, destination):
+        """
+        source 위치의 트랙을 destination 위치로 이동.
+        """
+        size = len(self.queues)
+        if not 0 <= source < size or not 0 <= destination < size:
+            raise IndexError("대기열 범위를 벗어났습니다")
+        track = self.queues[source]
+        del self.queues[source]
+        self.queues.insert(destination, track)
+        self._notify()
+        return track
+
     def clone(self):
-        return self.queues.copy()
+        return list(self.queues)
+
+    def qsize(self):
+        return len(self.queues)
+
+    def empty(self):
+        return not self.queues
 
     def is_empty(self):
-        return len(self.queues) == 0
+        return self.empty()
 
     def __len__(self):
         return len(self.queues)
@@ -40,6 +143,14 @@ class AudioScheduler:
         return iter(self.queues)
 
     def __del__(self):
+        self.listeners = []
         self.clear()
         print("🔚 오디오 스케줄러 삭제")
         return
+
+
+def _discard(track):
+    # 미리 띄워 둔 FFmpeg 소스와 (업로드라면) 아직 받는 중인 파일을 정리
+    drop = getattr(track, "drop", None) or getattr(track, "discard", None)
+    if drop:
+        drop()
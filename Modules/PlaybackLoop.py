@@ -0,0 +1,350 @@
+"""Per-guild playback task driven by the queue and the player's track-finished callback."""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from Modules.track_sources.config import CROSSFADE_PRELOAD_SECONDS, CROSSFADE_SECONDS
+from Modules.track_sources.crossfade import CrossfadeMixer
+from Modules.track_sources.executor import current_guild
+
+logger = logging.getLogger(__name__)
+
+
+class PlaybackState(enum.Enum):
+    STOPPED = "stopped"  # 루프가 돌고 있지 않음 (음성 채널 미접속)
+    IDLE = "idle"  # 대기열에 곡이 들어오기를 기다리는 중
+    LOADING = "loading"  # 다음 곡의 소스를 만드는 중
+    PLAYING = "playing"
+    PAUSED = "paused"
+
+
+@dataclass(frozen=True)
+class Transition:
+    at: float
+    previous: PlaybackState
+    state: PlaybackState
+    detail: str = ""
+
+
+class PlaybackLoop:
+    """Plays one guild's queue, one track at a time, from a single asyncio task.
+
+    The task waits on the scheduler (an ``asyncio.Queue``) for the next
+    track, builds its source, starts the voice client and then awaits a
+    future that the player thread's ``after`` callback resolves with
+    ``call_soon_threadsafe``. The callback therefore returns immediately
+    instead of blocking the audio thread, and only this task ever calls
+    ``play()``, so transitions happen in queue order however many commands
+    arrive at once. Every state change is kept in ``transitions`` for
+    debugging.
+
+    With ``crossfade`` set (seconds; 0 for gapless) tracks are played
+    through one :class:`CrossfadeMixer` instead: shortly before the current
+    track ends the head of the queue is loaded and handed to the mixer,
+    which overlaps the two without a new ``play()`` call. The preloaded
+    track stays in the queue until the mixer switches to it, so it can
+    still be listed, moved or removed; if the head changes before the fade
+    begins, the new head is loaded instead.
+    """
+
+    def __init__(self, client: Any, *, history: int = 50, crossfade: Optional[float] = CROSSFADE_SECONDS):
+        self.client = client
+        self.crossfade = crossfade
+        self.state = PlaybackState.STOPPED
+        self.current = None
+        self.transitions: deque[Transition] = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+        self._loading: Optional[asyncio.Future] = None
+        self._mixer: Optional[CrossfadeMixer] = None
+
+    def _transition(self, state: PlaybackState, detail: str = "") -> None:
+        if state is self.state and not detail:
+            return
+        transition = Transition(time.time(), self.state, state, detail)
+        self.transitions.append(transition)
+        self.state = state
+        logger.debug("Guild %s playback: %s -> %s %s", self.client.server_id, transition.previous.value, state.value, detail)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.current = None
+        self._transition(PlaybackState.STOPPED)
+
+    def interrupt(self) -> None:
+        """Abandon the track being loaded, if any (e.g. on ``?stop``)."""
+
+        if self._loading is not None and not self._loading.done():
+            self._loading.cancel()
+        if self._mixer is not None:
+            self._mixer.discard_next()
+
+    def pause(self) -> bool:
+        voice_client = self.client.voice_client
+        if not voice_client or not voice_client.is_playing():
+            return False
+        voice_client.pause()
+        self._transition(PlaybackState.PAUSED)
+        return True
+
+    def resume(self) -> bool:
+        voice_client = self.client.voice_client
+        if not voice_client or not voice_client.is_paused():
+            return False
+        voice_client.resume()
+        self._transition(PlaybackState.PLAYING)
+        return True
+
+    async def _notify(self, content: str) -> None:
+        channel = self.client.audio_scheduler.text_channel
+        if channel is None:
+            return
+        try:
+            await channel.send(content)
+        except Exception as exc:
+            logger.warning("Failed to send playback message: %s", exc)
+
+    async def _run(self) -> None:
+        # 재생 직전 추출 작업도 이 길드 몫으로 분배되도록 함
+        current_guild.set(self.client.server_id)
+        scheduler = self.client.audio_scheduler
+        upcoming = None
+        try:
+            while True:
+                if upcoming is None:
+                    self.current = None
+                    self._transition(PlaybackState.IDLE)
+                    track, source = await scheduler.get(), None
+                else:
+                    # 크로스페이드용으로 미리 불러왔지만 믹서가 먼저 끝난 곡
+                    (track, source), upcoming = upcoming, None
+
+                voice_client = self.client.voice_client
+                if not voice_client or not voice_client.is_connected():
+                    # 연결이 끊겼다면 곡을 되돌려 두고 다음 접속 때 다시 시작
+                    if source is not None:
+                        source.cleanup()
+                    scheduler.requeue(track)
+                    self._transition(PlaybackState.STOPPED, "voice disconnected")
+                    self._task = None
+                    return
+
+                try:
+                    upcoming = await self._play(voice_client, track, source)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Guild %s playback failed on %s", self.client.server_id, track.title)
+        finally:
+            if upcoming is not None:
+                upcoming[1].cleanup()
+                _drop(upcoming[0])
+
+    async def _load(self, track):
+        """Build ``track``'s source; None if it failed (reported) or the load was interrupted."""
+
+        self._loading = asyncio.ensure_future(track.create_source())
+        try:
+            return await self._loading
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise
+            self._transition(self.state, f"load cancelled: {track.title}")
+            return None
+        except Exception as e:
+            print(f'소스 생성 오류: {track.title} ({e})')
+            await self._notify(f"⚠️ 재생할 수 없는 곡을 건너뜁니다: {track.title}")
+            return None
+        finally:
+            self._loading = None
+
+    def _after_callback(self, finished: asyncio.Future):
+        loop = asyncio.get_running_loop()
+        metrics = self.client.playback_metrics
+
+        def after_play(error):
+            # discord.py 플레이어 스레드: 이벤트 루프에 결과만 넘기고 바로 반환
+            metrics.mark_track_end()
+            try:
+                loop.call_soon_threadsafe(_resolve, finished, error)
+            except RuntimeError:
+                pass  # 이벤트 루프가 이미 닫힘
+
+        return after_play
+
+    async def _play(self, voice_client, track, source=None):
+        """Play ``track`` to the end; returns a preloaded (track, source) still to be played, if any."""
+
+        self.current = track
+        if source is None:
+            # 대기열에는 PendingTrack만 들어 있으므로 재생 직전에 FFmpeg 소스를 생성
+            self._transition(PlaybackState.LOADING, track.title)
+            source = await self._load(track)
+            if source is None:
+                _drop(track)
+                self._transition(PlaybackState.IDLE)
+                return None
+            source = self.client.playback_metrics.wrap(source)
+
+        finished = asyncio.get_running_loop().create_future()
+        mixer = None
+        if self.crossfade is not None:
+            switched = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            mixer = CrossfadeMixer(self.crossfade, on_switch=lambda: loop.call_soon_threadsafe(switched.set))
+            mixer.start(source, track.duration)
+            player_source = mixer
+        else:
+            player_source = source
+
+        try:
+            voice_client.play(player_source, after=self._after_callback(finished))
+        except Exception as e:
+            source.cleanup()
+            _drop(track)
+            print(f'재생 시작 오류: {track.title} ({e})')
+            await self._notify(f"⚠️ 재생 오류: {track.title}")
+            return None
+
+        upcoming = None
+        self._mixer = mixer
+        scheduler = self.client.audio_scheduler
+        changed = asyncio.Event()
+        if mixer is not None:
+            scheduler.add_listener(changed.set)
+        try:
+            self._transition(PlaybackState.PLAYING, track.title)
+            await self._notify(f"**▶️ 재생 중:** {track.title}")
+            while mixer is not None:
+                upcoming = await self._preload(mixer, finished, changed)
+                if upcoming is None:
+                    break
+                next_track, next_source = upcoming
+                switched.clear()
+                if not mixer.queue_next(next_source, next_track.duration):
+                    scheduler.take(next_track)
+                    break  # 믹서가 먼저 끝났으므로 따로 재생
+                upcoming = None
+
+                while not switched.is_set() and not finished.done():
+                    changed.clear()
+                    waiters = {asyncio.ensure_future(switched.wait()), asyncio.ensure_future(changed.wait())}
+                    try:
+                        await asyncio.wait({finished, *waiters}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        for waiter in waiters:
+                            waiter.cancel()
+                    if not switched.is_set() and not finished.done() and _head(scheduler) is not next_track:
+                        # 넘어가기 전에 다음 곡이 바뀜(?remove/?move/?clear): 페이드 전이면 새 맨 앞 곡을 다시 준비
+                        source = mixer.detach_next()
+                        if source is not None:
+                            source.cleanup()
+                            break
+
+                if switched.is_set():
+                    scheduler.take(next_track)
+                    _drop(track)
+                    track = self.current = next_track
+                    self._transition(PlaybackState.PLAYING, track.title)
+                    await self._notify(f"**▶️ 재생 중:** {track.title}")
+                elif finished.done():
+                    # 넘어가기 전에 멈춤(?skip 등): 시작 전인 곡은 그 소스로 따로 재생하고,
+                    # 페이드 인 중이던 곡은 대기열 맨 앞에 남아 있으므로 처음부터 다시 재생
+                    source = mixer.detach_next()
+                    if source is not None:
+                        if scheduler.take(next_track) is not None:
+                            upcoming = next_track, source
+                        else:
+                            source.cleanup()
+                    break
+
+            error = await finished
+        finally:
+            self._mixer = None
+            if mixer is not None:
+                scheduler.remove_listener(changed.set)
+                # 페이드 인 중에 멈췄거나 취소로 빠져나온 경우 믹서에 넘겨 둔 다음 곡 정리
+                mixer.discard_next()
+
+        _drop(track)
+        if error:
+            print(f'재생 오류: {error}')
+            await self._notify(f"⚠️ 재생 오류: {track.title}")
+        self._transition(PlaybackState.IDLE, f"finished: {track.title}" + (f" ({error})" if error else ""))
+        return upcoming
+
+    async def _preload(self, mixer: CrossfadeMixer, finished: asyncio.Future, changed: asyncio.Event):
+        """Wait until the current track nears its end, then load the head of the queue without taking it."""
+
+        lead = self.crossfade + CROSSFADE_PRELOAD_SECONDS
+        while not finished.done():
+            remaining = mixer.remaining()
+            if remaining is None:
+                return None  # 길이를 모르면 미리 준비할 시점도 알 수 없음
+            if remaining <= lead:
+                break
+            # 일시정지하면 남은 시간이 줄지 않으므로 다시 계산
+            await asyncio.wait({finished}, timeout=remaining - lead)
+
+        scheduler = self.client.audio_scheduler
+        while not finished.done():
+            next_track = _head(scheduler)
+            if next_track is None:
+                changed.clear()
+                waiter = asyncio.ensure_future(changed.wait())
+                try:
+                    await asyncio.wait({finished, waiter}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    waiter.cancel()
+                continue
+            self._transition(PlaybackState.PLAYING, f"preloading: {next_track.title}")
+            source = await self._load(next_track)
+            if source is None:
+                # 불러올 수 없는 곡은 대기열에서 빼고 다음 곡으로 (자리만 옮겨져 취소된 곡은 그대로 둠)
+                if _head(scheduler) is next_track:
+                    scheduler.take(next_track)
+                    _drop(next_track)
+                continue
+            if _head(scheduler) is not next_track:
+                # 불러오는 사이에 맨 앞 곡이 바뀜
+                source.cleanup()
+                continue
+            return next_track, self.client.playback_metrics.wrap(source)
+        return None
+
+
+def _drop(track) -> None:
+    # 재생이 끝났거나 재생할 수 없는 곡이 붙들고 있는 것(받는 중인 업로드 등)을 정리
+    drop = getattr(track, "drop", None)
+    if drop:
+        drop()
+
+
+def _head(scheduler):
+    head = scheduler.peek()
+    return head[0] if head else None
+
+
+def _resolve(future: asyncio.Future, error: Optional[Exception]) -> None:
+    if not future.done():
+        future.set_result(error)
@@ -1,8 +1,12 @@
 import asyncio
+import contextlib
 
 import discord
 
 from AudioScheduler import AudioScheduler
+from Modules.PlaybackLoop import PlaybackLoop
+from Modules.TrackPrefetcher import PlaybackMetrics, TrackPrefetcher
+from Modules.track_sources.executor import current_guild
 
 
 class ServerClient:
@@ -10,9 +14,36 @@ class ServerClient:
         self.server_id = server_id
         self.voice_client: discord.VoiceClient = None
         self.audio_scheduler = AudioScheduler()
+        self.prefetcher = TrackPrefetcher(self.audio_scheduler, guild_id=server_id)
+        self.playback_metrics = PlaybackMetrics()
+        self.playback = PlaybackLoop(self)
         self._connection_lock = asyncio.Lock()
+        self._pending_requests: set[asyncio.Task] = set()
         return
 
+    @contextlib.contextmanager
+    def request_scope(self):
+        """
+        트랙 로딩 요청을 이 서버에 귀속시켜, 추출 작업을 길드 단위로 분배하고 취소할 수 있게 함.
+        """
+        task = asyncio.current_task()
+        self._pending_requests.add(task)
+        token = current_guild.set(self.server_id)
+        try:
+            yield
+        finally:
+            current_guild.reset(token)
+            self._pending_requests.discard(task)
+
+    def cancel_requests(self):
+        """
+        아직 로딩 중인 요청(대기 중인 추출 작업 포함)을 모두 취소.
+        """
+        current = asyncio.current_task()
+        for task in list(self._pending_requests):
+            if task is not current:
+                task.cancel()
+
     async def join_voice_channel(self, channel: discord.VoiceChannel):
         """
         해당 음성 채널에 접속하거나, 이미 연결되어 있다면 이동.
@@ -28,10 +59,15 @@ class ServerClient:
             elif self.voice_client.channel != channel:
                 await self.voice_client.move_to(channel)
             print(f"🔊 음성 채널 연결: {channel.name}")
+            # 대기열을 소비하는 재생 루프 시작 (이미 돌고 있으면 그대로 둠)
+            self.playback.start()
             return self.voice_client
 
     async def leave_voice_channel(self):
         async with self._connection_lock:
+            await self.playback.stop()
+            # 미리 띄워 둔 다음 곡 FFmpeg도 정리 (대기열은 다시 접속할 때를 위해 남겨 둠)
+            self.prefetcher.cancel_all()
             if self.voice_client and self.voice_client.is_connected():
                 await self.voice_client.disconnect(force=True)
                 self.voice_client = None
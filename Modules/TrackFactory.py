@@ -2,17 +2,24 @@
 
 from __future__ import annotations
 
-from typing import Sequence, Type
+import asyncio
+import logging
+from typing import AsyncIterator, Iterable, Sequence, Type
 
-from Modules.track_sources import TrackQuery, UploadPayload, sort_providers
+from Modules.track_sources import PendingTrack, TrackQuery, UploadPayload, sort_providers
 from Modules.track_sources.base import BaseTrackSource, BaseUploadSource
+from Modules.track_sources.config import UPLOAD_CONCURRENCY
+from Modules.track_sources.probe import metadata_prober
 from Modules.track_sources.providers import (
     SoundCloudSource,
+    SpotifySource,
     YouTubeSearchFallback,
     YouTubeUrlSource,
 )
 from Modules.track_sources.providers.upload import UploadSource
 
+logger = logging.getLogger(__name__)
+
 
 class SourceResolutionError(Exception):
     """Raised when no provider can satisfy the current request."""
@@ -22,7 +29,7 @@ class TrackFactory:
     """High level façade that delegates to registered providers only."""
 
     _URL_PROVIDERS: Sequence[Type[BaseTrackSource]] = sort_providers(
-        [SoundCloudSource, YouTubeUrlSource, YouTubeSearchFallback]
+        [SpotifySource, SoundCloudSource, YouTubeUrlSource, YouTubeSearchFallback]
     )
     _UPLOAD_PROVIDER: Type[BaseUploadSource] = UploadSource
 
@@ -48,6 +55,68 @@ class TrackFactory:
         return await cls.identify_source(url)
 
     @classmethod
-    async def from_upload(cls, file):
-        payload = UploadPayload(file=file)
+    async def iter_url(cls, url: str) -> AsyncIterator[PendingTrack]:
+        """Stream tracks from the first provider that yields any, in resolution order."""
+
+        track_query = TrackQuery(url)
+        for provider in cls._URL_PROVIDERS:
+            if not provider.supports(track_query):
+                continue
+            found = False
+            async for track in provider.iter_tracks(track_query):
+                found = True
+                yield track
+            if found:
+                return
+        raise SourceResolutionError("지원되는 오디오 소스를 찾지 못했습니다")
+
+    @classmethod
+    async def from_upload(cls, file, *, probe=None):
+        payload = UploadPayload(file=file, probe=probe)
         return await cls._UPLOAD_PROVIDER.create_tracks(payload)
+
+    @classmethod
+    async def iter_uploads(cls, files: Iterable, *, concurrency: int = UPLOAD_CONCURRENCY) -> AsyncIterator[PendingTrack]:
+        """Ingest several uploads concurrently and yield their tracks in the given order.
+
+        At most ``concurrency`` files are processed at once. Their tags are
+        probed up front as one batch over a shared HTTP session. Each file's
+        tracks are yielded as soon as it and every file before it are ready.
+        Files that fail are skipped; the first error is raised after the rest
+        have been yielded.
+        """
+
+        files = list(files)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        remote = [file for file in files if getattr(file, "url", None)]
+        probes = dict(zip(map(id, remote), metadata_prober.probe_attachments(remote)))
+
+        async def _load(file):
+            async with semaphore:
+                return await cls.from_upload(file, probe=probes.get(id(file)))
+
+        tasks = [asyncio.ensure_future(_load(file)) for file in files]
+        first_error = None
+        handed_over = 0
+        try:
+            for index, (file, task) in enumerate(zip(files, tasks)):
+                try:
+                    tracks = await task
+                except Exception as exc:
+                    logger.warning("Upload failed for %s: %s", getattr(file, "filename", file), exc)
+                    first_error = first_error or exc
+                    continue
+                handed_over = index + 1
+                for track in tracks or []:
+                    yield track
+        finally:
+            # 중간에 취소되면 아직 처리 중인 파일도 함께 취소하고,
+            # 이미 받기 시작했지만 넘기지 못한 파일은 다운로드를 멈춤
+            for task in (*tasks, *probes.values()):
+                task.cancel()
+            for task in tasks[handed_over:]:
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    for track in task.result() or []:
+                        track.drop()
+        if first_error is not None:
+            raise first_error
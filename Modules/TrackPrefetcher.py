@@ -0,0 +1,205 @@
+"""Background resolution of upcoming queue entries and transition metrics."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+import discord
+
+from AudioScheduler import AudioScheduler
+from Modules.track_sources.config import PREFETCH_CONCURRENCY, PREFETCH_DEPTH, PREFETCH_WARM_FFMPEG
+from Modules.track_sources.executor import background_extraction, current_guild
+from Modules.track_sources.utils.ffmpeg import source_cpu_time
+
+logger = logging.getLogger(__name__)
+
+
+class TrackPrefetcher:
+    """Resolves the next ``depth`` queued tracks while the current one plays.
+
+    Only the head of the queue is warmed (FFmpeg started); the rest just get
+    their stream URLs resolved, so the number of idle subprocesses stays at
+    one per guild regardless of depth.
+    """
+
+    def __init__(
+        self,
+        scheduler: AudioScheduler,
+        *,
+        guild_id: Optional[int] = None,
+        depth: int = PREFETCH_DEPTH,
+        concurrency: int = PREFETCH_CONCURRENCY,
+        warm_ffmpeg: bool = PREFETCH_WARM_FFMPEG,
+    ):
+        self.scheduler = scheduler
+        self.guild_id = guild_id
+        self.depth = depth
+        self.warm_ffmpeg = warm_ffmpeg
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._warming: set[int] = set()
+        self._warmed: list = []
+        scheduler.add_listener(self.schedule)
+
+    def schedule(self) -> None:
+        """Align running prefetch jobs with the current head of the queue."""
+
+        upcoming = self.scheduler.peek(self.depth) if self.depth > 0 else []
+        window = {id(track) for track in upcoming}
+
+        for key in [key for key in self._tasks if key not in window]:
+            self._tasks.pop(key).cancel()
+            self._warming.discard(key)
+
+        # 맨 앞에서 밀려났지만 아직 대기열에 있는 트랙의 소스만 정리.
+        # 대기열에서 빠진 트랙은 재생 루프가 띄워 둔 소스를 넘겨받으므로 건드리지 않음
+        # (remove/clear로 빠진 경우는 스케줄러가 이미 정리함)
+        head = upcoming[0] if upcoming else None
+        stale = [track for track in self._warmed if track is not head]
+        if stale:
+            queued = {id(track) for track in self.scheduler.queues}
+            for track in stale:
+                if id(track) in queued:
+                    track.discard()
+                self._warmed.remove(track)
+
+        for index, track in enumerate(upcoming):
+            if not hasattr(track, "resolve"):
+                continue
+            warm = self.warm_ffmpeg and index == 0
+            running = self._tasks.get(id(track))
+            if running is not None:
+                if not warm or id(track) in self._warming:
+                    continue
+                # 해석만 하던 트랙이 맨 앞으로 올라옴: 해석은 공유되므로 다시 시작해 소스까지 띄움
+                running.cancel()
+            task = asyncio.get_running_loop().create_task(self._prefetch(track, warm))
+            task.add_done_callback(self._forget)
+            self._tasks[id(track)] = task
+            if warm:
+                self._warming.add(id(track))
+
+    def _forget(self, task: asyncio.Task) -> None:
+        for key, running in list(self._tasks.items()):
+            if running is task:
+                del self._tasks[key]
+                self._warming.discard(key)
+
+    async def _prefetch(self, track, warm: bool) -> None:
+        # 추출 풀에서 사용자 요청보다 뒤로 밀리도록 백그라운드 작업으로 표시
+        current_guild.set(self.guild_id)
+        background_extraction.set(True)
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                await track.resolve()
+                if warm:
+                    await track.warm_up()
+                    self._warmed.append(track)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # 실제 재생 시점에 다시 시도하므로 여기서는 기록만 남김
+                logger.warning("Prefetch failed for %s: %s", track.title, exc)
+                return
+            logger.debug("Prefetched %s in %.2fs (warm=%s)", track.title, time.perf_counter() - started, warm)
+
+    def cancel_all(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._warming.clear()
+        for track in self._warmed:
+            track.discard()
+        self._warmed.clear()
+
+
+class PlaybackMetrics:
+    """Tracks transition gaps and the FFmpeg CPU time spent on one guild's playback.
+
+    CPU time is split by whether the source was remuxed (Opus passthrough) or
+    transcoded, so the savings from passthrough show up per guild.
+    """
+
+    def __init__(self, history: int = 50):
+        self.gaps: deque[float] = deque(maxlen=history)
+        self._ended_at: Optional[float] = None
+        self.ffmpeg_cpu: dict[str, float] = {"passthrough": 0.0, "transcode": 0.0}
+        self.ffmpeg_tracks: dict[str, int] = {"passthrough": 0, "transcode": 0}
+        self._active: Optional["_FirstFrameProbe"] = None
+
+    def mark_track_end(self) -> None:
+        # discord.py 플레이어 스레드에서 호출됨
+        self._ended_at = time.perf_counter()
+
+    def mark_first_frame(self) -> None:
+        # 다음 곡의 첫 프레임이 읽힐 때 오디오 스레드에서 호출됨
+        ended_at, self._ended_at = self._ended_at, None
+        if ended_at is None:
+            return
+        gap = time.perf_counter() - ended_at
+        self.gaps.append(gap)
+        logger.info("Track transition gap: %.0fms", gap * 1000)
+
+    @property
+    def last_gap(self) -> Optional[float]:
+        return self.gaps[-1] if self.gaps else None
+
+    @property
+    def average_gap(self) -> Optional[float]:
+        return sum(self.gaps) / len(self.gaps) if self.gaps else None
+
+    def record_ffmpeg(self, source: discord.AudioSource) -> None:
+        # 프로세스가 종료(reap)되기 전, cleanup 직전에 호출해야 /proc에서 읽을 수 있음
+        cpu = source_cpu_time(source)
+        if cpu is None:
+            return
+        mode = "passthrough" if getattr(source, "passthrough", False) else "transcode"
+        self.ffmpeg_cpu[mode] += cpu
+        self.ffmpeg_tracks[mode] += 1
+        logger.info("FFmpeg CPU for %s: %.2fs (%s)", getattr(source, "title", "track"), cpu, mode)
+
+    def current_ffmpeg_cpu(self) -> Optional[float]:
+        active = self._active
+        return source_cpu_time(active.original) if active is not None else None
+
+    def wrap(self, source: discord.AudioSource) -> discord.AudioSource:
+        probe = _FirstFrameProbe(source, self)
+        self._active = probe
+        return probe
+
+
+class _FirstFrameProbe(discord.AudioSource):
+    """Transparent wrapper that reports when the first frame is pulled."""
+
+    def __init__(self, original: discord.AudioSource, metrics: PlaybackMetrics):
+        self.original = original
+        self._metrics = metrics
+        self._seen_frame = False
+        self._recorded = False
+
+    def read(self) -> bytes:
+        data = self.original.read()
+        if not self._seen_frame and data:
+            self._seen_frame = True
+            self._metrics.mark_first_frame()
+        return data
+
+    def is_opus(self) -> bool:
+        return self.original.is_opus()
+
+    def cleanup(self) -> None:
+        # AudioSource.__del__에서도 cleanup이 다시 불리므로 한 번만 기록
+        if not self._recorded:
+            self._recorded = True
+            self._metrics.record_ffmpeg(self.original)
+            if self._metrics._active is self:
+                self._metrics._active = None
+        self.original.cleanup()
+
+    def __getattr__(self, name):
+        return getattr(self.original, name)
@@ -3,6 +3,7 @@
 from Modules.track_sources.base import (
     BaseTrackSource,
     BaseUploadSource,
+    PendingTrack,
     TrackQuery,
     UploadPayload,
     sort_providers,
@@ -11,6 +12,7 @@ from Modules.track_sources.base import (
 __all__ = [
     "BaseTrackSource",
     "BaseUploadSource",
+    "PendingTrack",
     "TrackQuery",
     "UploadPayload",
     "sort_providers",
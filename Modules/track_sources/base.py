@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Any, Iterable, Optional
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import discord
 
+# 같은 곡을 가리키지만 공유 경로마다 달라지는 쿼리 파라미터
+_TRACKING_PARAMS = {"si", "feature", "pp", "utm_source", "utm_medium", "utm_campaign", "ref"}
+
 
 @dataclass(frozen=True)
 class TrackQuery:
@@ -19,18 +24,166 @@ class TrackQuery:
     def normalized(self) -> str:
         return self.raw.strip().lower()
 
+    @property
+    def cache_key(self) -> str:
+        """Stable lookup key; URL paths and ids keep their case, tracking params are dropped."""
+
+        stripped = self.raw.strip()
+        parts = urlsplit(stripped)
+        if not parts.scheme.startswith("http") or not parts.netloc:
+            return stripped.lower()
+        params = sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key not in _TRACKING_PARAMS
+        )
+        host = parts.netloc.lower().removeprefix("www.").removeprefix("m.")
+        return urlunsplit(("https", host, parts.path.rstrip("/"), urlencode(params), ""))
+
 
 @dataclass(frozen=True)
 class UploadPayload:
-    """Container for upload based sources (e.g. Discord attachments)."""
+    """Container for upload based sources (e.g. Discord attachments).
+
+    ``probe`` optionally carries the file's metadata probe when it was
+    started ahead of time together with the rest of its message.
+    """
 
     file: Any
+    probe: Optional[Awaitable[Any]] = None
 
     @property
     def filename(self) -> str:
         return getattr(self.file, "filename", "Unknown")
 
 
+@dataclass
+class PendingTrack:
+    """Queue entry that defers creating the playable audio source.
+
+    Providers fill in the display metadata up front and hand over two hooks:
+    an optional ``resolver`` that performs the network lookup (stream URL,
+    hydration) and a ``loader`` that builds the FFmpeg backed source. Both run
+    only once playback approaches the track, so a long queue does not hold
+    open subprocesses. An optional ``on_drop`` hook releases whatever else
+    the track holds (e.g. an upload still downloading) once it is removed
+    from the queue or done playing.
+    """
+
+    title: str
+    webpage_url: Optional[str] = None
+    duration: float = 0
+    loader: Optional[Callable[["PendingTrack"], Awaitable[discord.AudioSource]]] = field(
+        default=None, repr=False, compare=False
+    )
+    resolver: Optional[Callable[["PendingTrack"], Awaitable[None]]] = field(
+        default=None, repr=False, compare=False
+    )
+    on_drop: Optional[Callable[["PendingTrack"], None]] = field(default=None, repr=False, compare=False)
+    data: dict = field(default_factory=dict, repr=False, compare=False)
+    _resolving: Optional[asyncio.Future] = field(default=None, init=False, repr=False, compare=False)
+    _source: Optional[discord.AudioSource] = field(default=None, init=False, repr=False, compare=False)
+    _building: Optional[asyncio.Future] = field(default=None, init=False, repr=False, compare=False)
+    _build_waiters: int = field(default=0, init=False, repr=False, compare=False)
+    _handed_out: bool = field(default=False, init=False, repr=False, compare=False)
+
+    async def resolve(self) -> None:
+        """Run the resolver once; concurrent callers share the same lookup.
+
+        A lookup that failed or was cancelled is forgotten, so the next call
+        retries it.
+        """
+
+        if self.resolver is None:
+            return
+        if self._resolving is None:
+            self._resolving = asyncio.ensure_future(self.resolver(self))
+            self._resolving.add_done_callback(self._forget_failed_resolve)
+        await asyncio.shield(self._resolving)
+
+    def _forget_failed_resolve(self, future: asyncio.Future) -> None:
+        if self._resolving is future and (future.cancelled() or future.exception() is not None):
+            self._resolving = None
+
+    async def warm_up(self) -> None:
+        """Start the audio source ahead of time so playback begins instantly.
+
+        Does nothing once the source has been handed out by
+        :meth:`create_source`, so a late prefetch cannot start a second copy
+        of a track that is already playing.
+        """
+
+        if self._source is None and not self._handed_out:
+            await self._build()
+
+    async def create_source(self) -> discord.AudioSource:
+        """The warmed source if there is one, otherwise a new one.
+
+        Joins a warm-up that is still running instead of starting another.
+        """
+
+        self._handed_out = True
+        if self._source is None:
+            try:
+                await self._build()
+            except asyncio.CancelledError:
+                self.discard()
+                raise
+        source, self._source = self._source, None
+        if source is None:
+            raise RuntimeError(f"Source was discarded while loading: {self.title}")
+        return source
+
+    def discard(self) -> None:
+        """Release a warmed source that will not be played, or stop building one."""
+
+        building, self._building = self._building, None
+        if building is not None:
+            building.cancel()
+        source, self._source = self._source, None
+        if source is not None:
+            source.cleanup()
+
+    def drop(self) -> None:
+        """The track will not be played (again): release its source and background work."""
+
+        self.discard()
+        if self.on_drop is not None:
+            self.on_drop(self)
+
+    async def _build(self) -> None:
+        # warm_up과 create_source가 하나의 빌드를 공유; 기다리는 쪽이 모두 취소되면 빌드도 취소
+        if self._building is None:
+            self._building = asyncio.ensure_future(self._build_source())
+            self._building.add_done_callback(self._built)
+        building = self._building
+        self._build_waiters += 1
+        try:
+            await asyncio.shield(building)
+        finally:
+            self._build_waiters -= 1
+            if not building.done() and not self._build_waiters:
+                building.cancel()
+
+    def _built(self, future: asyncio.Future) -> None:
+        current = self._building is future
+        if current:
+            self._building = None
+        if future.cancelled() or future.exception() is not None:
+            return
+        if current and self._source is None:
+            self._source = future.result()
+        else:
+            # 빌드가 끝나기 직전에 discard()된 경우
+            future.result().cleanup()
+
+    async def _build_source(self) -> discord.AudioSource:
+        if self.loader is None:
+            raise RuntimeError(f"No loader registered for track: {self.title}")
+        await self.resolve()
+        return await self.loader(self)
+
+
 class BaseTrackSource(ABC):
     """Base class for URL/query driven providers."""
 
@@ -44,8 +197,15 @@ class BaseTrackSource(ABC):
 
     @classmethod
     @abstractmethod
-    async def create_tracks(cls, query: TrackQuery) -> list[discord.AudioSource]:
-        """Resolve the query into playable Discord audio sources."""
+    async def create_tracks(cls, query: TrackQuery) -> list[PendingTrack]:
+        """Resolve the query into lazily playable queue entries."""
+
+    @classmethod
+    async def iter_tracks(cls, query: TrackQuery) -> AsyncIterator[PendingTrack]:
+        """Yield queue entries as they resolve; defaults to :meth:`create_tracks`."""
+
+        for track in await cls.create_tracks(query):
+            yield track
 
 
 class BaseUploadSource(ABC):
@@ -55,8 +215,8 @@ class BaseUploadSource(ABC):
 
     @classmethod
     @abstractmethod
-    async def create_tracks(cls, payload: UploadPayload) -> list[discord.AudioSource]:
-        """Convert the uploaded payload into Discord audio sources."""
+    async def create_tracks(cls, payload: UploadPayload) -> list[PendingTrack]:
+        """Convert the uploaded payload into lazily playable queue entries."""
 
 
 def sort_providers(providers: Iterable[type[BaseTrackSource]]) -> list[type[BaseTrackSource]]:
@@ -0,0 +1,204 @@
+"""Shared decoders that fan Opus frames out to several voice clients."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Dict, Hashable, List, Optional
+
+import discord
+
+from Modules.track_sources.config import BROADCAST_BUFFER_FRAMES, BROADCAST_ENABLED
+
+logger = logging.getLogger(__name__)
+
+FRAME_DURATION = discord.opus.Encoder.FRAME_LENGTH / 1000
+
+# start(초)를 받아 해당 위치부터 재생하는 새 FFmpeg 소스를 만드는 함수
+SourceFactory = Callable[[float], discord.AudioSource]
+
+
+class _FrameRing:
+    """Fixed-size ring of Opus frames addressed by absolute frame index."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._frames: List[Optional[bytes]] = [None] * self.capacity
+        self.start = 0
+        self.end = 0
+
+    def append(self, frame: bytes) -> None:
+        self._frames[self.end % self.capacity] = frame
+        self.end += 1
+        if self.end - self.start > self.capacity:
+            self.start = self.end - self.capacity
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._frames[index % self.capacity]
+
+
+class _Broadcast:
+    """One upstream decoder plus the ring buffer its subscribers read from."""
+
+    def __init__(self, key: Hashable, factory: SourceFactory, capacity: int):
+        self.key = key
+        self.factory = factory
+        self.upstream = factory(0.0)
+        self.ring = _FrameRing(capacity)
+        self.refs = 0
+        self.finished = False
+        self._lock = threading.Lock()
+
+    @property
+    def joinable(self) -> bool:
+        # 첫 프레임이 아직 링에 남아 있어야 새 구독자가 처음부터 들을 수 있음
+        return self.ring.start == 0 and not self.finished
+
+    def read(self, index: int) -> Optional[bytes]:
+        """Return frame ``index``; None if it already fell out of the ring."""
+
+        # 각 길드의 플레이어 스레드가 동시에 호출하므로, 가장 앞선 구독자만 upstream을 읽음
+        with self._lock:
+            while index >= self.ring.end and not self.finished:
+                frame = self.upstream.read()
+                if not frame:
+                    self.finished = True
+                    break
+                self.ring.append(frame)
+            if index < self.ring.start:
+                return None
+            if index >= self.ring.end:
+                return b""
+            return self.ring[index]
+
+
+class BroadcastHub:
+    """Runs one decoder per unique track and hands out subscribers to it.
+
+    A new subscriber shares an existing broadcast while that broadcast's first
+    frame is still buffered, so it hears the track from the start. Once the
+    start has left the ring, ``live=True`` joins the running broadcast at its
+    current position instead; otherwise a fresh broadcast (and decoder) is
+    started. Subscribers that seek or fall out of the ring switch to a
+    private decoder started at their own position.
+    """
+
+    def __init__(self, capacity: int = BROADCAST_BUFFER_FRAMES, *, enabled: bool = BROADCAST_ENABLED):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._broadcasts: Dict[Hashable, _Broadcast] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+        self.joined_live = 0
+        self.started = 0
+
+    def subscribe(self, key: Hashable, factory: SourceFactory, *, live: bool = False) -> discord.AudioSource:
+        if not self.enabled or key is None:
+            return factory(0.0)
+
+        position = 0
+        with self._lock:
+            broadcast = self._broadcasts.get(key)
+            if broadcast is not None and broadcast.joinable:
+                owner = False
+                self.shared += 1
+            elif live and broadcast is not None and not broadcast.finished:
+                # 처음 부분은 이미 링에서 밀려났으므로 지금 나오는 프레임부터 함께 들음
+                position = broadcast.ring.end
+                owner = False
+                self.shared += 1
+                self.joined_live += 1
+            else:
+                broadcast = self._broadcasts[key] = _Broadcast(key, factory, self.capacity)
+                owner = True
+                self.started += 1
+            broadcast.refs += 1
+        return BroadcastSubscriber(self, broadcast, position, owner=owner)
+
+    def _release(self, broadcast: _Broadcast) -> None:
+        with self._lock:
+            broadcast.refs -= 1
+            if broadcast.refs > 0:
+                return
+            if self._broadcasts.get(broadcast.key) is broadcast:
+                del self._broadcasts[broadcast.key]
+        broadcast.upstream.cleanup()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "active": len(self._broadcasts),
+                "subscribers": sum(broadcast.refs for broadcast in self._broadcasts.values()),
+                "started": self.started,
+                "shared": self.shared,
+                "joined_live": self.joined_live,
+            }
+
+
+class BroadcastSubscriber(discord.AudioSource):
+    """Per-voice-client view of a broadcast, or of a private decoder after a seek."""
+
+    def __init__(self, hub: BroadcastHub, broadcast: _Broadcast, position: int, *, owner: bool):
+        self._hub = hub
+        self._broadcast: Optional[_Broadcast] = broadcast
+        self._private: Optional[discord.AudioSource] = None
+        self.position = position
+        self.owner = owner
+        self._closed = False
+
+    @property
+    def _decoder(self) -> discord.AudioSource:
+        return self._private if self._private is not None else self._broadcast.upstream
+
+    @property
+    def _process(self):
+        # 공유 디코더의 CPU는 처음 띄운 구독자에게만 집계 (길드별 중복 집계 방지)
+        if self._private is not None:
+            return getattr(self._private, "_process", None)
+        return getattr(self._broadcast.upstream, "_process", None) if self.owner else None
+
+    def read(self) -> bytes:
+        if self._private is not None:
+            return self._private.read()
+        frame = self._broadcast.read(self.position)
+        if frame is None:
+            # 링에서 밀려난 경우(일시정지 등) 현재 위치부터 전용 디코더로 이어서 재생
+            self.seek(self.position * FRAME_DURATION)
+            return self._private.read()
+        if frame:
+            self.position += 1
+        return frame
+
+    def seek(self, seconds: float) -> None:
+        """Continue from ``seconds`` on a private decoder."""
+
+        broadcast = self._broadcast
+        private, self._private = self._private, broadcast.factory(max(0.0, seconds))
+        self.position = round(max(0.0, seconds) / FRAME_DURATION)
+        self.owner = True
+        if private is not None:
+            private.cleanup()
+        elif not self._closed:
+            self._hub._release(broadcast)
+
+    def is_opus(self) -> bool:
+        return self._decoder.is_opus()
+
+    def cleanup(self) -> None:
+        # AudioSource.__del__에서도 불리므로 한 번만 정리
+        if self._closed:
+            return
+        self._closed = True
+        if self._private is not None:
+            self._private.cleanup()
+        else:
+            self._hub._release(self._broadcast)
+
+    def __getattr__(self, name):
+        # title/data/passthrough 등 원본 소스의 속성은 그대로 노출
+        if name.startswith("__") or "_broadcast" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self._decoder, name)
+
+
+broadcast_hub = BroadcastHub()
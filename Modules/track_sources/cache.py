@@ -0,0 +1,135 @@
+"""Async cache for yt-dlp extraction results."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from cachetools import TLRUCache
+
+from Modules.track_sources.base import TrackQuery
+
+logger = logging.getLogger(__name__)
+
+# googlevideo 서명 URL은 ?expire=<epoch> 또는 HLS 매니페스트의 /expire/<epoch>/ 형태
+_EXPIRE_PATTERN = re.compile(r"[?&/]expire[=/](\d+)")
+
+
+def stream_expiry(info: Dict[str, Any]) -> Optional[float]:
+    """Return the earliest signed-URL expiry (epoch seconds) found in an info dict."""
+
+    entries = info.get("entries") if "entries" in info else [info]
+    expiries = []
+    for entry in entries or []:
+        url = (entry or {}).get("url") or ""
+        match = _EXPIRE_PATTERN.search(url)
+        if match:
+            expiries.append(float(match.group(1)))
+    return min(expiries) if expiries else None
+
+
+class ExtractionCache:
+    """LRU + per-entry TTL cache keyed by :attr:`TrackQuery.cache_key`.
+
+    Entries holding signed stream URLs expire ``expiry_margin`` seconds before
+    the URL itself does; entries without one (flat playlists, search results)
+    live for ``default_ttl``. Concurrent lookups of the same key share a single
+    extraction, which is cancelled once every caller has given up on it.
+    """
+
+    def __init__(self, maxsize: int = 256, *, default_ttl: float = 30 * 60, expiry_margin: float = 5 * 60):
+        self.default_ttl = default_ttl
+        self.expiry_margin = expiry_margin
+        self._entries: TLRUCache = TLRUCache(maxsize, ttu=self._time_to_use, timer=time.time)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _time_to_use(self, _key, value, now: float) -> float:
+        expiry = stream_expiry(value)
+        if expiry is None:
+            return now + self.default_ttl
+        return expiry - self.expiry_margin
+
+    async def get_or_extract(
+        self,
+        namespace: str,
+        query: TrackQuery,
+        extract: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Optional[Dict[str, Any]]:
+        key = f"{namespace}:{query.cache_key}"
+        cached = self._entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(extract())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._store(key, done))
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            # 한 요청이 취소돼도 다른 대기자를 위해 추출은 계속 진행
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # 마지막 대기자까지 떠났다면 추출 작업도 취소 (대기 중인 스레드 슬롯 반환)
+            if self._waiters.get(key) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            remaining = self._waiters.get(key, 1) - 1
+            if remaining:
+                self._waiters[key] = remaining
+            else:
+                self._waiters.pop(key, None)
+
+    def _store(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.debug("Extraction failed for %s: %s", key, task.exception())
+            return
+        value = task.result()
+        if value:
+            self._entries[key] = value
+
+    def peek(self, namespace: str, query: TrackQuery) -> Optional[Dict[str, Any]]:
+        cached = self._entries.get(f"{namespace}:{query.cache_key}")
+        if cached is not None:
+            self.hits += 1
+        return cached
+
+    def put(self, namespace: str, query: TrackQuery, value: Dict[str, Any]) -> None:
+        """Store a result produced outside :meth:`get_or_extract` (e.g. a streamed playlist)."""
+
+        if value:
+            self._entries[f"{namespace}:{query.cache_key}"] = value
+
+    def invalidate(self, namespace: str, query: TrackQuery) -> None:
+        self._entries.pop(f"{namespace}:{query.cache_key}", None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+extraction_cache = ExtractionCache()
@@ -1,5 +1,7 @@
 """Centralised configuration for media download/transcode options."""
 
+import os
+
 COMMON_DOWNLOAD_OPTIONS = {
     "restrictfilenames": True,
     "ignoreerrors": False,
@@ -27,16 +29,106 @@ SOUNDCLOUD_FORMAT_OPTIONS = {
     **COMMON_DOWNLOAD_OPTIONS,
     "format": "bestaudio/best",
     "noplaylist": False,
-    "extract_flat": False,
+    # 세트는 트랙 URL만 받아오고, 각 트랙은 필요할 때 따로 hydrate
+    "extract_flat": "in_playlist",
     "default_search": "scsearch1",
 }
 
+# SoundCloud 세트 hydrate: 추가 시점에 미리 불러올 앞쪽 곡 수, 동시 요청 수, 곡당 제한 시간(초)
+SOUNDCLOUD_EAGER_HYDRATE = 3
+SOUNDCLOUD_HYDRATE_CONCURRENCY = 4
+SOUNDCLOUD_HYDRATE_TIMEOUT = 20.0
+
 FFMPEG_STREAM_OPTIONS = {
     "before_options": "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -thread_queue_size 4096",
     "options": "-vn -b:a 320k -ac 2 -ar 48000 -bufsize 128k",
 }
 
+# 원본이 이미 Opus(WebM/Ogg)일 때는 재인코딩 없이 컨테이너만 바꿔서 전달 (codec="copy"와 함께 사용)
+FFMPEG_OPUS_PASSTHROUGH = os.getenv("FFMPEG_OPUS_PASSTHROUGH", "true").strip().lower() in {"1", "true", "yes", "on"}
+FFMPEG_PASSTHROUGH_OPTIONS = {
+    "before_options": FFMPEG_STREAM_OPTIONS["before_options"],
+    "options": "-vn",
+}
+
 FFMPEG_MEMORY_OPTIONS = {
     "before_options": "-vn -loglevel warning ",
     "options": "-c:a libopus -b:a 320k -ar 48000 ",
 }
+
+# 여러 서버가 같은 곡을 재생할 때 디코더 하나를 공유할지, 공유 링 버퍼에 보관할 프레임 수 (20ms 단위)
+BROADCAST_ENABLED = os.getenv("BROADCAST_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+BROADCAST_BUFFER_FRAMES = int(os.getenv("BROADCAST_BUFFER_FRAMES", "500"))
+# 첫 프레임이 이미 링에서 밀려난 곡을 다른 서버가 틀 때, 지금 재생 중인 위치부터 같은 디코더를 함께 들을지
+# (끄면 그 서버만을 위한 디코더를 새로 띄워 처음부터 재생)
+BROADCAST_LIVE_JOIN = os.getenv("BROADCAST_LIVE_JOIN", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+# 재생 중에 대기열 앞쪽 몇 곡을 미리 해석할지, 동시에 몇 곡까지 해석할지, 바로 다음 곡의 FFmpeg를 미리 띄워 둘지
+PREFETCH_DEPTH = int(os.getenv("PREFETCH_DEPTH", "3"))
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "2"))
+PREFETCH_WARM_FFMPEG = os.getenv("PREFETCH_WARM_FFMPEG", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+# 곡 사이를 겹쳐 재생할 길이(초): 비워 두면 곡마다 따로 재생, 0이면 끊김 없이(gapless) 바로 이어서 재생
+_CROSSFADE = os.getenv("CROSSFADE_SECONDS", "").strip()
+CROSSFADE_SECONDS = max(0.0, float(_CROSSFADE)) if _CROSSFADE else None
+# 현재 곡이 끝나기 몇 초 전(페이드 구간 제외)에 다음 곡 소스를 준비해 둘지
+CROSSFADE_PRELOAD_SECONDS = 15.0
+
+# 디스크 캐시들의 기본 위치 (저장소 루트의 .cache)
+_CACHE_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".cache")
+
+# 다운로드한 곡을 Opus로 인코딩해 보관하는 디스크 캐시 (빈 문자열이면 사용 안 함)
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", os.path.join(_CACHE_ROOT, "audio"))
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_MB", "2048")) * 1024 * 1024
+AUDIO_CACHE_OPUS_BITRATE = os.getenv("AUDIO_CACHE_OPUS_BITRATE", "160k")
+
+# 업로드 파일을 메모리에 올리지 않고 임시 파일로 받아 둘 위치(None이면 시스템 임시 디렉터리)와 청크 크기
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+UPLOAD_CHUNK_SIZE = 256 * 1024
+# 한 메시지의 첨부 파일 여러 개를 동시에 처리할 최대 개수 (디스코드 메시지당 첨부 한도가 10개)
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "10"))
+
+# 메타데이터는 파일 앞/뒤 일부만 읽어서 확인 (ID3/FLAC 태그가 더 크면 최대 PROBE_MAX_HEAD_BYTES까지 확장)
+PROBE_HEAD_BYTES = 256 * 1024
+PROBE_TAIL_BYTES = 256 * 1024
+PROBE_MAX_HEAD_BYTES = 16 * 1024 * 1024
+# 한 메시지의 첨부 파일들을 하나의 HTTP 세션으로 동시에 확인할 최대 개수
+PROBE_CONCURRENCY = 4
+
+# deezspot 다운로드: 로그인 세션을 다시 만들기까지의 최대 시간(초), 곡을 받아 둘 작업 디렉터리(None이면 임시 디렉터리)
+SPOTIFY_SESSION_MAX_AGE = float(os.getenv("SPOTIFY_SESSION_MAX_AGE", str(6 * 60 * 60)))
+SPOTIFY_SCRATCH_DIR = os.getenv("SPOTIFY_SCRATCH_DIR") or None
+
+# Spotify Web API: 초당 요청 수/버스트 허용량(토큰 버킷), 연결 풀 크기, 재시도 횟수, 토큰 만료 전 갱신 여유(초)
+SPOTIFY_API_RATE = float(os.getenv("SPOTIFY_API_RATE", "10"))
+SPOTIFY_API_BURST = int(os.getenv("SPOTIFY_API_BURST", "20"))
+SPOTIFY_API_CONNECTIONS = 16
+SPOTIFY_API_MAX_RETRIES = 5
+SPOTIFY_TOKEN_REFRESH_MARGIN = 60.0
+# Spotify 메타데이터 응답 캐시: 재검증 없이 쓰는 기간(초; 재생목록은 자주 바뀌므로 짧게), SQLite 파일 (빈 문자열이면 메모리만)
+SPOTIFY_METADATA_TTL = 24 * 60 * 60
+SPOTIFY_PLAYLIST_TTL = 5 * 60
+SPOTIFY_METADATA_CACHE_PATH = os.getenv(
+    "SPOTIFY_METADATA_CACHE_PATH", os.path.join(_CACHE_ROOT, "spotify_metadata.sqlite3")
+)
+
+# Spotify 앨범/재생목록 곡을 검색 결과와 매칭해 재생: 검색 순서, 후보 수, 길이 허용 오차(초), 최소 점수
+SPOTIFY_MATCH_PROVIDERS = ("youtube", "soundcloud")
+SPOTIFY_MATCH_CANDIDATES = 5
+SPOTIFY_MATCH_DURATION_TOLERANCE = 5.0
+SPOTIFY_MATCH_MIN_SCORE = 0.6
+# 매칭 결과를 보관하는 SQLite 파일 (빈 문자열이면 메모리에만 보관)
+SPOTIFY_MATCH_CACHE_PATH = os.getenv("SPOTIFY_MATCH_CACHE_PATH", os.path.join(_CACHE_ROOT, "spotify_matches.sqlite3"))
+
+# 제공자별 추출 스레드 수 (discord.py의 기본 executor와 분리)
+EXTRACTION_POOL_WORKERS = {
+    "youtube": 4,
+    "soundcloud": 2,
+    "spotify": 2,
+    "metadata": 2,
+    "default": 2,
+}
+
+# yt-dlp 추출을 스레드("thread")에서 할지, 워커 프로세스("process")에서 할지
+EXTRACTOR_MODE = os.getenv("EXTRACTOR_MODE", "thread").strip().lower()
+EXTRACTOR_PROCESSES = int(os.getenv("EXTRACTOR_PROCESSES", "4"))
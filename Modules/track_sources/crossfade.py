@@ -0,0 +1,243 @@
+"""Gapless and crossfading playback through one long-lived mixing audio source."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Optional
+
+import discord
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FRAME_DURATION = discord.opus.Encoder.FRAME_LENGTH / 1000
+SAMPLES_PER_FRAME = discord.opus.Encoder.SAMPLES_PER_FRAME
+CHANNELS = discord.opus.Encoder.CHANNELS
+FRAME_SIZE = discord.opus.Encoder.FRAME_SIZE
+
+# Opus 디코더가 곡 중간부터 디코딩을 시작할 때 생기는 잡음을 피하려고 페이드 직전 몇 프레임을 미리 디코딩
+_DECODER_PREROLL = 3
+
+
+class _Deck:
+    """One track inside the mixer: its source, position and fade-in progress."""
+
+    def __init__(self, source: discord.AudioSource, duration: float):
+        self.source = source
+        self.total = round(duration / FRAME_DURATION) if duration and duration > 0 else None
+        self.played = 0
+        self.faded_in: Optional[int] = None
+        self._decoder: Optional[discord.opus.Decoder] = None
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.total is None else self.total - self.played
+
+    def read(self) -> bytes:
+        frame = self.source.read()
+        if frame:
+            self.played += 1
+        return frame
+
+    def pcm(self, frame: bytes) -> np.ndarray:
+        """``frame`` as a (samples, channels) int16 view, decoding Opus if needed."""
+
+        if self.source.is_opus():
+            if self._decoder is None:
+                self._decoder = discord.opus.Decoder()
+            frame = self._decoder.decode(frame)
+        return np.frombuffer(frame, dtype=np.int16).reshape(-1, CHANNELS)
+
+    def preroll(self, frame: bytes) -> None:
+        if self.source.is_opus():
+            self.pcm(frame)
+
+    def cleanup(self) -> None:
+        self.source.cleanup()
+
+
+class CrossfadeMixer(discord.AudioSource):
+    """Plays a sequence of tracks as one audio source, overlapping their ends.
+
+    :meth:`start` sets the first track; :meth:`queue_next` hands over the
+    following one while the current plays. Once the current track is within
+    ``seconds`` of its expected end (from its duration), both are read and
+    mixed with equal-power gain ramps; with ``seconds=0`` the next track's
+    first frame follows the current's last one (gapless). Without a queued
+    track the mixer ends with the current one, like a plain source.
+
+    Outside a fade, frames are passed through untouched, so Opus sources stay
+    Opus and cost nothing extra; only faded frames are decoded, mixed as
+    PCM and re-encoded by the voice client. :meth:`is_opus` describes the
+    frame last returned by :meth:`read`, which is how discord.py's player
+    asks. The ramps and the mixing buffers are allocated once, so a faded
+    frame costs two vectorised multiply-adds and one copy into ``bytes``.
+
+    ``on_switch`` is called from the player thread whenever the queued track
+    takes over.
+    """
+
+    def __init__(self, seconds: float, *, on_switch: Optional[Callable[[], None]] = None):
+        self.window = max(0, round(seconds / FRAME_DURATION))
+        self.on_switch = on_switch
+        self._lock = threading.Lock()
+        self._current: Optional[_Deck] = None
+        self._next: Optional[_Deck] = None
+        self._closed = False
+        # 첫 read() 전에는 PCM으로 보고해야 voice client가 play()에서 인코더를 만듦
+        self._opus = False
+
+        steps = max(1, self.window) * SAMPLES_PER_FRAME
+        position = (np.arange(steps, dtype=np.float32) + 0.5) / steps
+        # 같은 출력 크기를 유지하는 equal-power 곡선, 프레임별로 (samples, 1) 조각으로 나눠 둠
+        self._fade_in = np.sin(position * (np.pi / 2)).reshape(-1, SAMPLES_PER_FRAME, 1)
+        self._fade_out = np.cos(position * (np.pi / 2)).reshape(-1, SAMPLES_PER_FRAME, 1)
+        self._mix = np.empty((SAMPLES_PER_FRAME, CHANNELS), dtype=np.float32)
+        self._scratch = np.empty((SAMPLES_PER_FRAME, CHANNELS), dtype=np.float32)
+        self._out = np.empty((SAMPLES_PER_FRAME, CHANNELS), dtype=np.int16)
+        self.switches = 0
+        self.faded_frames = 0
+
+    def start(self, source: discord.AudioSource, duration: float = 0) -> None:
+        with self._lock:
+            self._current = _Deck(source, duration)
+
+    def queue_next(self, source: discord.AudioSource, duration: float = 0) -> bool:
+        """Queue the track that follows; False if the mixer already ended (play it separately)."""
+
+        with self._lock:
+            if self._closed or self._current is None:
+                return False
+            previous, self._next = self._next, _Deck(source, duration)
+        if previous is not None:
+            previous.cleanup()
+        return True
+
+    def detach_next(self) -> Optional[discord.AudioSource]:
+        """Take back a queued track that has not started fading in, without cleaning it up.
+
+        None if nothing is queued or the fade already began; such a track
+        stays in the mixer.
+        """
+
+        with self._lock:
+            deck = self._next
+            if deck is None or deck.played:
+                return None
+            self._next = None
+        return deck.source
+
+    def discard_next(self) -> None:
+        """Drop the queued track, whether or not it started fading in."""
+
+        with self._lock:
+            deck, self._next = self._next, None
+        if deck is not None:
+            deck.cleanup()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the current track by its duration, or None if unknown."""
+
+        with self._lock:
+            remaining = self._current.remaining if self._current is not None else None
+        return None if remaining is None else max(0, remaining) * FRAME_DURATION
+
+    def is_opus(self) -> bool:
+        return self._opus
+
+    def read(self) -> bytes:
+        with self._lock:
+            if self._closed or self._current is None:
+                return b""
+            current, upcoming = self._current, self._next
+            remaining = current.remaining
+
+            # 페이드 구간: 남은 프레임 수가 창 안으로 들어오고 다음 곡이 준비된 경우
+            if upcoming is not None and self.window and remaining is not None and remaining <= self.window:
+                if remaining <= 0:
+                    # 길이 정보보다 길게 이어지는 곡은 이미 소리가 0이므로 여기서 넘김
+                    return self._switch(current, upcoming)
+                frame = current.read()
+                if not frame:
+                    return self._switch(current, upcoming)
+                incoming = upcoming.read()
+                if not incoming:
+                    # 다음 곡이 비어 있으면 버리고 현재 곡을 그대로 이어감
+                    upcoming.cleanup()
+                    self._next = None
+                    self._opus = current.source.is_opus()
+                    return frame
+                step = self.window - remaining
+                upcoming.faded_in = step + 1
+                return self._blend(current.pcm(frame), self._fade_out[step], upcoming.pcm(incoming), self._fade_in[step])
+
+            frame = current.read()
+            if not frame:
+                if upcoming is None:
+                    self._closed = True
+                    return b""
+                return self._switch(current, upcoming)
+
+            if current.faded_in is not None and current.faded_in < self.window:
+                # 이전 곡이 예상보다 일찍 끝나 페이드 인이 덜 된 경우 남은 구간을 마저 올림
+                step = current.faded_in
+                current.faded_in += 1
+                return self._blend(current.pcm(frame), self._fade_in[step])
+
+            if upcoming is not None and self.window and remaining is not None and remaining <= self.window + _DECODER_PREROLL:
+                current.preroll(frame)
+            self._opus = current.source.is_opus()
+            return frame
+
+    def _switch(self, finished: _Deck, upcoming: _Deck) -> bytes:
+        # 락을 잡은 상태에서 호출됨
+        self._current, self._next = upcoming, None
+        self.switches += 1
+        finished.cleanup()
+        if self.on_switch is not None:
+            try:
+                self.on_switch()
+            except Exception:
+                logger.exception("Crossfade switch callback failed")
+        frame = upcoming.read()
+        if not frame:
+            self._closed = True
+            return b""
+        if upcoming.faded_in is not None and upcoming.faded_in < self.window:
+            step = upcoming.faded_in
+            upcoming.faded_in += 1
+            return self._blend(upcoming.pcm(frame), self._fade_in[step])
+        self._opus = upcoming.source.is_opus()
+        return frame
+
+    def _blend(self, first: np.ndarray, first_gain: np.ndarray, second=None, second_gain=None) -> bytes:
+        mix = self._mix
+        if first.shape != mix.shape or (second is not None and second.shape != mix.shape):
+            # 20ms가 아닌 프레임은 드물기 때문에 크기를 맞춰서 처리
+            first = _fit(first)
+            second = _fit(second) if second is not None else None
+        np.multiply(first, first_gain, out=mix)
+        if second is not None:
+            np.multiply(second, second_gain, out=self._scratch)
+            mix += self._scratch
+        np.clip(mix, -32768, 32767, out=mix)
+        np.copyto(self._out, mix, casting="unsafe")
+        self._opus = False
+        self.faded_frames += 1
+        return self._out.tobytes()
+
+    def cleanup(self) -> None:
+        # 플레이어가 멈출 때 호출됨; 아직 시작하지 않은 다음 곡은 detach_next()로 되찾을 수 있게 둠
+        with self._lock:
+            self._closed = True
+            current, self._current = self._current, None
+        if current is not None:
+            current.cleanup()
+
+
+def _fit(pcm: np.ndarray) -> np.ndarray:
+    fitted = np.zeros((SAMPLES_PER_FRAME, CHANNELS), dtype=np.int16)
+    count = min(len(pcm), SAMPLES_PER_FRAME)
+    fitted[:count] = pcm[:count]
+    return fitted
@@ -0,0 +1,233 @@
+"""Content-addressed on-disk cache of downloaded audio, stored as Opus."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from Modules.track_sources.config import AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_BYTES, AUDIO_CACHE_OPUS_BITRATE
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL REFERENCES objects(digest),
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_last_used ON objects(last_used);
+"""
+
+
+@dataclass(frozen=True)
+class CachedAudio:
+    """A cache hit: the stored file and the metadata recorded with it."""
+
+    digest: str
+    path: str
+    size: int
+    metadata: Dict[str, Any] = field(default_factory=dict, compare=False)
+
+    @property
+    def is_opus(self) -> bool:
+        return self.path.endswith(".opus")
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+def _encode_opus(source_path: str, target_path: str, bitrate: str) -> bool:
+    """Encode ``source_path`` to Ogg/Opus; False if FFmpeg is missing or fails."""
+
+    try:
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-v", "error", "-i", source_path,
+                "-vn", "-map_metadata", "-1",
+                "-c:a", "libopus", "-b:a", bitrate, "-ar", "48000", "-ac", "2",
+                target_path,
+            ],
+            check=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        return True
+    except FileNotFoundError:
+        logger.warning("ffmpeg not found; caching %s without re-encoding", source_path)
+    except subprocess.CalledProcessError as exc:
+        logger.warning("Opus encode failed for %s: %s", source_path, exc.stderr.decode(errors="replace").strip())
+    return False
+
+
+class AudioDiskCache:
+    """Size-bounded LRU cache of audio files keyed by provider and track id.
+
+    Files live under ``objects/`` named by their SHA-256, so two ids that
+    resolve to the same audio share one file; a small SQLite index maps
+    ``provider:track_id`` to a digest and keeps the metadata needed to queue
+    the track without touching the network. Each file's checksum is verified
+    the first time it is served in this process; corrupt or missing files are
+    dropped and reported as a miss. Every method blocks, so call them from an
+    extraction pool.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = AUDIO_CACHE_MAX_BYTES,
+        *,
+        opus_bitrate: str = AUDIO_CACHE_OPUS_BITRATE,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.opus_bitrate = opus_bitrate
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._verified: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.corrupt = 0
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def _object_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest + ext)
+
+    def get(self, provider: str, track_id: str) -> Optional[CachedAudio]:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT e.digest, o.ext, o.size, e.metadata FROM entries e JOIN objects o USING (digest) WHERE e.key = ?",
+                (f"{provider}:{track_id}",),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            digest, ext, size, metadata = row
+            path = self._object_path(digest, ext)
+            if not self._is_valid(digest, path, size):
+                logger.warning("Dropping corrupt audio cache object %s", digest)
+                self.corrupt += 1
+                self.misses += 1
+                self._drop_object(digest, ext)
+                return None
+
+            with self.db:
+                self.db.execute("UPDATE objects SET last_used = ? WHERE digest = ?", (time.time(), digest))
+            self.hits += 1
+            return CachedAudio(digest, path, size, json.loads(metadata))
+
+    def put(self, provider: str, track_id: str, source_path: str, metadata: Dict[str, Any]) -> CachedAudio:
+        """Encode ``source_path`` to Opus, store it and index it under the track id.
+
+        ``source_path`` itself is left in place for the caller to clean up.
+        """
+
+        os.makedirs(self.root, exist_ok=True)
+        # os.replace로 옮길 수 있도록 같은 파일시스템(캐시 디렉터리 안)에서 인코딩
+        staging = tempfile.mkdtemp(dir=self.root)
+        try:
+            encoded = os.path.join(staging, "audio.opus")
+            if not _encode_opus(source_path, encoded, self.opus_bitrate):
+                encoded = os.path.join(staging, "audio" + os.path.splitext(source_path)[1])
+                shutil.copyfile(source_path, encoded)
+            ext = os.path.splitext(encoded)[1]
+            digest = _file_digest(encoded)
+            size = os.path.getsize(encoded)
+            path = self._object_path(digest, ext)
+
+            with self._lock:
+                if not self._is_valid(digest, path, size):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(encoded, path)
+                    self._verified.add(digest)
+                with self.db:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO objects (digest, ext, size, last_used) VALUES (?, ?, ?, ?)",
+                        (digest, ext, size, time.time()),
+                    )
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO entries (key, digest, metadata) VALUES (?, ?, ?)",
+                        (f"{provider}:{track_id}", digest, json.dumps(metadata, ensure_ascii=False)),
+                    )
+                self._evict(keep=digest)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return CachedAudio(digest, path, size, dict(metadata))
+
+    def _is_valid(self, digest: str, path: str, size: int) -> bool:
+        try:
+            if os.path.getsize(path) != size:
+                return False
+        except OSError:
+            return False
+        if digest not in self._verified:
+            if _file_digest(path) != digest:
+                return False
+            self._verified.add(digest)
+        return True
+
+    def _evict(self, *, keep: str) -> None:
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 가장 오래 쓰이지 않은 파일부터 지움 (재생 중인 파일은 열린 핸들이 있어 끝까지 재생됨)
+        for digest, ext, size in self.db.execute(
+            "SELECT digest, ext, size FROM objects WHERE digest != ? ORDER BY last_used", (keep,)
+        ).fetchall():
+            self._drop_object(digest, ext)
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def _drop_object(self, digest: str, ext: str) -> None:
+        with self.db:
+            self.db.execute("DELETE FROM entries WHERE digest = ?", (digest,))
+            self.db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+        self._verified.discard(digest)
+        try:
+            os.remove(self._object_path(digest, ext))
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+        return {
+            "objects": count,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "corrupt": self.corrupt,
+        }
+
+
+audio_cache: Optional[AudioDiskCache] = AudioDiskCache(AUDIO_CACHE_DIR) if AUDIO_CACHE_DIR else None
@@ -0,0 +1,165 @@
+"""Bounded, per-provider thread pools for blocking extraction work."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+from Modules.track_sources.config import EXTRACTION_POOL_WORKERS
+
+T = TypeVar("T")
+
+# 작업을 요청한 길드와 백그라운드(미리 불러오기) 여부; 커맨드/프리페처가 설정
+current_guild: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("current_guild", default=None)
+background_extraction: contextvars.ContextVar[bool] = contextvars.ContextVar("background_extraction", default=False)
+
+
+class _ProviderPool:
+    """Thread pool whose slots are handed out round-robin across guilds.
+
+    Interactive requests are always served before background (prefetch) work,
+    and within each lane every guild gets one slot per turn, so one guild's
+    playlist burst cannot starve single lookups elsewhere. Jobs that are still
+    waiting for a slot are dropped when the awaiting task is cancelled.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"extract-{name}")
+        self._lanes: tuple[OrderedDict, OrderedDict] = (OrderedDict(), OrderedDict())
+        self.running = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.peak_waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for lane in self._lanes for queue in lane.values())
+
+    async def run(self, func: Callable[..., T], *args: Any, executor: Optional[Executor] = None) -> T:
+        """Wait for a slot, then run ``func`` on this pool's threads or on ``executor``.
+
+        ``executor`` lets a process pool do the work while this pool still
+        enforces the per-provider limit and guild fairness; ``func`` and its
+        arguments must then be picklable.
+        """
+
+        loop = asyncio.get_running_loop()
+        turn = loop.create_future()
+        lane = self._lanes[1 if background_extraction.get() else 0]
+        guild: Hashable = current_guild.get()
+        lane.setdefault(guild, deque()).append(turn)
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        self._dispatch()
+
+        try:
+            await turn
+        except asyncio.CancelledError:
+            if turn.done() and not turn.cancelled():
+                # 슬롯을 받은 직후 취소된 경우
+                self._release()
+            else:
+                self._discard(lane, guild, turn)
+            self.cancelled += 1
+            raise
+
+        if executor is None:
+            context = contextvars.copy_context()
+            future = self._executor.submit(context.run, func, *args)
+        else:
+            try:
+                future = executor.submit(func, *args)
+            except BaseException:
+                self._release()
+                raise
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        try:
+            return await asyncio.wrap_future(future, loop=loop)
+        except asyncio.CancelledError:
+            # 이미 스레드에서 실행 중이면 끝까지 돌고 결과만 버려짐
+            self.cancelled += 1
+            raise
+
+    def _dispatch(self) -> None:
+        while self.running < self.workers:
+            turn = self._next_turn()
+            if turn is None:
+                return
+            self.running += 1
+            turn.set_result(None)
+
+    def _next_turn(self) -> Optional[asyncio.Future]:
+        for lane in self._lanes:
+            while lane:
+                guild, queue = next(iter(lane.items()))
+                turn = queue.popleft()
+                # 다음 차례를 위해 해당 길드를 맨 뒤로 보냄
+                del lane[guild]
+                if queue:
+                    lane[guild] = queue
+                if not turn.done():
+                    return turn
+        return None
+
+    def _discard(self, lane: OrderedDict, guild: Hashable, turn: asyncio.Future) -> None:
+        queue = lane.get(guild)
+        if queue is None:
+            return
+        try:
+            queue.remove(turn)
+        except ValueError:
+            pass
+        if not queue:
+            del lane[guild]
+
+    def _release(self) -> None:
+        self.running -= 1
+        self.completed += 1
+        self._dispatch()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_POOLS: Dict[str, _ProviderPool] = {}
+
+
+def get_pool(provider: str) -> _ProviderPool:
+    pool = _POOLS.get(provider)
+    if pool is None:
+        workers = EXTRACTION_POOL_WORKERS.get(provider, EXTRACTION_POOL_WORKERS["default"])
+        pool = _POOLS[provider] = _ProviderPool(provider, workers)
+    return pool
+
+
+async def run_extraction(provider: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``func`` on the named provider pool instead of the loop's default executor."""
+
+    if kwargs:
+        func = functools.partial(func, **kwargs)
+    return await get_pool(provider).run(func, *args)
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    return {name: pool.stats() for name, pool in _POOLS.items()}
+
+
+def shutdown_pools() -> None:
+    for pool in _POOLS.values():
+        pool.shutdown()
+    _POOLS.clear()
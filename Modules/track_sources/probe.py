@@ -0,0 +1,288 @@
+"""Header-only audio metadata probing with a content-keyed cache."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import aiohttp
+from cachetools import LRUCache
+from mutagen import File as MutagenFile
+
+from Modules.track_sources.config import (
+    PROBE_CONCURRENCY,
+    PROBE_HEAD_BYTES,
+    PROBE_MAX_HEAD_BYTES,
+    PROBE_TAIL_BYTES,
+)
+from Modules.track_sources.executor import run_extraction
+
+# easy=True 태그 키와, easy 래퍼가 없는 형식(WAV 등)의 ID3 프레임 ID
+_TAG_FRAMES = {"title": "TIT2", "artist": "TPE1"}
+
+
+@dataclass(frozen=True)
+class AudioProbe:
+    title: Optional[str] = None
+    artist: Optional[str] = None
+    duration: float = 0
+    format: Optional[str] = None
+
+    def as_metadata(self, fallback_title: str = "Unknown") -> Dict[str, Any]:
+        return {
+            "title": self.title or fallback_title,
+            "artist": self.artist or "Unknown",
+            "duration": self.duration,
+        }
+
+
+class _SparseFile(io.RawIOBase):
+    """Read-only view of a ``size`` byte file where only the head and tail are known.
+
+    Mutagen seeks to absolute offsets (MP4 atoms, ID3v1 at the end) and uses
+    the file size for bitrate based duration estimates, so the gap in the
+    middle is presented as zeros rather than truncated away.
+    """
+
+    def __init__(self, head: bytes, tail: bytes, size: int):
+        self._head = head
+        self._tail = tail
+        self._size = max(size, len(head))
+        self._tail_start = self._size - len(tail)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._size}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        start = self._position
+        end = min(self._size, start + len(buffer))
+        if start >= end:
+            return 0
+        chunk = bytearray(end - start)
+        if start < len(self._head):
+            part = self._head[start:end]
+            chunk[: len(part)] = part
+        if end > self._tail_start:
+            offset = max(start, self._tail_start)
+            part = self._tail[offset - self._tail_start : end - self._tail_start]
+            chunk[offset - start : offset - start + len(part)] = part
+        buffer[: len(chunk)] = chunk
+        self._position = end
+        return len(chunk)
+
+
+def required_prefix(head: bytes) -> int:
+    """Bytes needed from the start of the file to cover its leading tag region.
+
+    Covers ID3v2 (size in the header) and FLAC metadata blocks, either of
+    which can exceed the default head size when cover art is embedded.
+    Returns ``len(head)`` when nothing more is known to be needed.
+    """
+
+    if head[:3] == b"ID3" and len(head) >= 10:
+        size = 10 + ((head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9])
+        if head[5] & 0x10:  # footer
+            size += 10
+        # ID3 뒤에 오는 첫 프레임/헤더까지 읽을 수 있도록 여유를 둠
+        return size + PROBE_HEAD_BYTES // 4
+
+    if head[:4] == b"fLaC":
+        offset = 4
+        while offset + 4 <= len(head):
+            flags, length = head[offset], int.from_bytes(head[offset + 1 : offset + 4], "big")
+            offset += 4 + length
+            if flags & 0x80:  # last metadata block
+                return offset
+        # 다음 블록 헤더까지 읽어야 끝인지 알 수 있음
+        return offset + 4
+
+    return len(head)
+
+
+def _first_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if hasattr(value, "text"):  # ID3 frame
+        value = value.text
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    text = str(value).strip() if value is not None else ""
+    return text or None
+
+
+def _tag(tags: Any, key: str) -> Optional[str]:
+    if not tags:
+        return None
+    # easy=True면 ID3/MP4/Vorbis 모두 소문자 키로 정규화되고, 아니면 ID3 프레임 ID로 조회
+    for candidate in (key, _TAG_FRAMES.get(key)):
+        if not candidate:
+            continue
+        try:
+            value = tags.get(candidate) if hasattr(tags, "get") else tags[candidate]
+        except (KeyError, ValueError, TypeError):
+            continue
+        text = _first_text(value)
+        if text:
+            return text
+    return None
+
+
+def _parse(head: bytes, tail: bytes, size: int) -> AudioProbe:
+    audio = MutagenFile(_SparseFile(head, tail, size), easy=True)
+    if audio is None:
+        raise ValueError("Unrecognised audio format")
+    info = getattr(audio, "info", None)
+    return AudioProbe(
+        title=_tag(audio.tags, "title"),
+        artist=_tag(audio.tags, "artist"),
+        duration=float(getattr(info, "length", 0) or 0),
+        format=type(audio).__name__,
+    )
+
+
+class MetadataProber:
+    """Probes tags and duration from a bounded prefix/suffix of each file.
+
+    Results are cached by a digest of the probed regions plus the file size,
+    so the same file uploaded again (or to another guild) is not parsed twice.
+    Parsing runs on the ``metadata`` extraction pool.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self._cache: LRUCache = LRUCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    async def probe_regions(self, head: bytes, tail: bytes, size: int) -> AudioProbe:
+        key = hashlib.blake2b(struct.pack(">Q", size) + head + b"\0" + tail, digest_size=16).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        probe = await run_extraction("metadata", _parse, head, tail, size)
+        self._cache[key] = probe
+        return probe
+
+    async def probe_file(self, target: Union[str, io.BytesIO]) -> AudioProbe:
+        """Probe a path or in-memory buffer, reading only its head and tail."""
+
+        def _regions():
+            handle = open(target, "rb") if isinstance(target, str) else target
+            snapshot = handle.tell()
+            try:
+                size = handle.seek(0, io.SEEK_END)
+                handle.seek(0)
+                head = handle.read(PROBE_HEAD_BYTES)
+                while len(head) < min(required_prefix(head), PROBE_MAX_HEAD_BYTES, size):
+                    head += handle.read(min(required_prefix(head), PROBE_MAX_HEAD_BYTES) - len(head))
+                tail = b""
+                if size > len(head):
+                    handle.seek(max(len(head), size - PROBE_TAIL_BYTES))
+                    tail = handle.read()
+                return head, tail, size
+            finally:
+                if isinstance(target, str):
+                    handle.close()
+                else:
+                    handle.seek(snapshot)
+
+        head, tail, size = await run_extraction("metadata", _regions)
+        return await self.probe_regions(head, tail, size)
+
+    async def probe_attachment(self, attachment, *, session: Optional[aiohttp.ClientSession] = None) -> AudioProbe:
+        """Probe a Discord attachment with HTTP range requests, without downloading it."""
+
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self.probe_attachment(attachment, session=own_session)
+
+        size = getattr(attachment, "size", None) or 0
+
+        async def read_range(start: int, end: int) -> bytes:
+            async with session.get(attachment.url, headers={"Range": f"bytes={start}-{end - 1}"}) as response:
+                response.raise_for_status()
+                if response.status == 206:
+                    return await response.read()
+                if start > 0:
+                    return b""
+                # CDN이 Range를 무시하고 전체를 보내면 앞부분만 읽고 연결을 끊음
+                data = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    data += chunk
+                    if len(data) >= end:
+                        break
+                return bytes(data[:end])
+
+        head_request = read_range(0, PROBE_HEAD_BYTES)
+        if size > PROBE_HEAD_BYTES:
+            tail_start = max(PROBE_HEAD_BYTES, size - PROBE_TAIL_BYTES)
+            head, tail = await asyncio.gather(head_request, read_range(tail_start, size))
+        else:
+            head, tail = await head_request, b""
+        limit = min(PROBE_MAX_HEAD_BYTES, size or PROBE_MAX_HEAD_BYTES)
+        while len(head) < min(required_prefix(head), limit):
+            more = await read_range(len(head), min(required_prefix(head), limit))
+            if not more:
+                break
+            head += more
+        if tail and size - len(tail) < len(head):
+            # 앞부분을 늘리다 꼬리와 겹친 경우 겹친 부분은 잘라냄
+            tail = tail[len(head) - (size - len(tail)):]
+        return await self.probe_regions(head, tail, max(size, len(head)))
+
+    def probe_attachments(
+        self,
+        attachments: Iterable[Any],
+        *,
+        concurrency: int = PROBE_CONCURRENCY,
+    ) -> List["asyncio.Task[AudioProbe]"]:
+        """Start probing every attachment of a message concurrently, keeping their order.
+
+        All probes share one HTTP session and at most ``concurrency`` run at
+        once. One task is returned per attachment, so callers can use each
+        file's metadata as soon as it is ready and a bad file only fails its
+        own task. The session is closed when the last probe finishes or is
+        cancelled.
+        """
+
+        attachments = list(attachments)
+        if not attachments:
+            return []
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        session = aiohttp.ClientSession()
+        remaining = len(attachments)
+
+        async def _one(attachment) -> AudioProbe:
+            nonlocal remaining
+            try:
+                async with semaphore:
+                    return await self.probe_attachment(attachment, session=session)
+            finally:
+                remaining -= 1
+                if not remaining:
+                    await session.close()
+
+        return [asyncio.ensure_future(_one(attachment)) for attachment in attachments]
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+metadata_prober = MetadataProber()
@@ -1,9 +1,11 @@
 from Modules.track_sources.providers.soundcloud import SoundCloudSource
+from Modules.track_sources.providers.spotify import SpotifySource
 from Modules.track_sources.providers.upload import UploadSource
 from Modules.track_sources.providers.youtube import YouTubeSearchFallback, YouTubeUrlSource
 
 __all__ = [
     "SoundCloudSource",
+    "SpotifySource",
     "UploadSource",
     "YouTubeSearchFallback",
     "YouTubeUrlSource",
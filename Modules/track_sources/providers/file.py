@@ -0,0 +1,326 @@
+"""Audio sources backed by files on disk instead of in-memory buffers."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import weakref
+from typing import Awaitable, Dict, Hashable, Optional, Tuple
+
+import aiohttp
+import discord
+
+from Modules.track_sources.broadcast import broadcast_hub
+from Modules.track_sources.config import (
+    FFMPEG_MEMORY_OPTIONS,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_SPOOL_DIR,
+)
+from Modules.track_sources.disk_cache import CachedAudio
+from Modules.track_sources.executor import run_extraction
+from Modules.track_sources.probe import AudioProbe, metadata_prober
+
+logger = logging.getLogger(__name__)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class AudioFile:
+    """A spooled upload or download on disk.
+
+    Temporary files are deleted once the last reference (queue entry or
+    decoder) goes away; FFmpeg processes that already opened the file keep
+    reading it until they exit.
+    """
+
+    complete = True
+
+    def __init__(self, path: str, *, temporary: bool = True):
+        self.path = path
+        self._digest: Optional[str] = None
+        if temporary:
+            weakref.finalize(self, _remove, path)
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    async def digest(self) -> str:
+        if self._digest is None:
+            def _hash() -> str:
+                with open(self.path, "rb") as handle:
+                    return hashlib.file_digest(handle, "blake2b").hexdigest()
+
+            self._digest = await run_extraction("metadata", _hash)
+        return self._digest
+
+    async def broadcast_key(self) -> Hashable:
+        return ("file", await self.digest())
+
+    def open_stream(self) -> Optional[io.RawIOBase]:
+        """A reader for FFmpeg's stdin, or None when FFmpeg can open the path itself."""
+
+        return None
+
+
+class SpooledUpload(AudioFile):
+    """Attachment that is playable while it is still being downloaded.
+
+    Received data is appended to the temp file in ``UPLOAD_CHUNK_SIZE``
+    batches, written from a worker thread so disk I/O never blocks the
+    event loop; decoders started before the download finishes read through
+    :class:`_SpoolReader`, which waits for more bytes instead of reporting
+    EOF. :meth:`cancel` stops the download, e.g. when the track is removed
+    from the queue.
+    """
+
+    def __init__(self, path: str, *, expected_size: Optional[int] = None):
+        super().__init__(path)
+        self.expected_size = expected_size
+        self.written = 0
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+        self._condition = threading.Condition()
+        self._progress = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def complete(self) -> bool:
+        return self._done.is_set()
+
+    def start(self, url: str) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._download(url))
+
+    async def _download(self, url: str) -> None:
+        try:
+            with open(self.path, "wb") as handle:
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(url) as response:
+                        response.raise_for_status()
+                        pending = bytearray()
+                        async for chunk in response.content.iter_chunked(UPLOAD_CHUNK_SIZE):
+                            pending += chunk
+                            if len(pending) >= UPLOAD_CHUNK_SIZE:
+                                await self._write(handle, pending)
+                        await self._write(handle, pending)
+        except asyncio.CancelledError as exc:
+            self.error = exc
+            raise
+        except Exception as exc:
+            # 이미 받은 부분까지는 재생되고, 그 뒤에서 곡이 끝남
+            self.error = exc
+            logger.warning("Upload download failed after %d bytes: %s", self.written, exc)
+        finally:
+            self._done.set()
+            self._advance(0)
+
+    async def _write(self, handle, pending: bytearray) -> None:
+        if not pending:
+            return
+        data = bytes(pending)
+        pending.clear()
+        await asyncio.to_thread(_write_flush, handle, data)
+        self._advance(len(data))
+
+    def _advance(self, count: int) -> None:
+        with self._condition:
+            self.written += count
+            self._condition.notify_all()
+        self._progress.set()
+
+    async def wait_complete(self) -> None:
+        while not self.complete:
+            self._progress.clear()
+            await self._progress.wait()
+
+    def wait_written(self, position: int, timeout: float) -> None:
+        # 파이프 writer 스레드에서 호출: position 이후 데이터가 들어오거나 다운로드가 끝날 때까지 대기
+        with self._condition:
+            self._condition.wait_for(lambda: self.written > position or self.complete, timeout)
+
+    async def broadcast_key(self) -> Hashable:
+        if self.complete and self.error is None:
+            return await super().broadcast_key()
+        # 아직 받는 중이면 내용 해시를 낼 수 없으므로 이 업로드 전용 키 사용
+        return ("spool", self.path)
+
+    def open_stream(self) -> Optional[io.RawIOBase]:
+        return None if self.complete else _SpoolReader(self)
+
+    def cancel(self) -> None:
+        """Stop downloading; decoders already reading see the data received so far."""
+
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+
+def _write_flush(handle, data: bytes) -> None:
+    handle.write(data)
+    handle.flush()
+
+
+class _SpoolReader(io.RawIOBase):
+    """Blocking reader over a growing spool file, fed to FFmpeg's stdin."""
+
+    def __init__(self, spool: SpooledUpload):
+        self._spool = spool
+        self._handle = open(spool.path, "rb")
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while not self.closed:
+            # 읽기 전에 완료 여부를 확인해야 마지막 청크를 놓치지 않음
+            done = self._spool.complete
+            try:
+                data = self._handle.read(size)
+            except ValueError:
+                return b""
+            if data or done:
+                return data
+            self._spool.wait_written(self._handle.tell(), timeout=0.5)
+        return b""
+
+    def close(self) -> None:
+        if not self.closed:
+            self._handle.close()
+        super().close()
+
+
+class FileAudioSource(discord.FFmpegOpusAudio):
+    """FFmpeg reads the file itself, so the payload never enters Python memory.
+
+    Uploads that are still downloading are piped through stdin instead, so
+    playback starts as soon as the first chunks are on disk.
+    """
+
+    def __init__(self, audio_file: AudioFile, metadata: Dict, *, bitrate: int = 320, start: float = 0.0):
+        # 디코더가 살아 있는 동안 임시 파일이 지워지지 않도록 참조 유지
+        self.audio_file = audio_file
+        self.metadata = metadata
+        self.title = metadata.get("title", "Unknown")
+        self._stream = audio_file.open_stream()
+
+        options = dict(FFMPEG_MEMORY_OPTIONS)
+        if start > 0:
+            options["before_options"] = f"-ss {start:.3f} {options['before_options']}"
+        if self._stream is not None:
+            super().__init__(self._stream, pipe=True, bitrate=bitrate, **options)
+        else:
+            super().__init__(audio_file.path, bitrate=bitrate, **options)
+
+    def cleanup(self):
+        try:
+            super().cleanup()
+        finally:
+            if self._stream is not None:
+                self._stream.close()
+
+    @classmethod
+    async def shared(cls, audio_file: AudioFile, metadata: Dict, *, live: bool = False) -> discord.AudioSource:
+        return broadcast_hub.subscribe(
+            await audio_file.broadcast_key(),
+            lambda start: cls(audio_file, metadata, start=start),
+            live=live,
+        )
+
+
+class CachedFileAudioSource(discord.FFmpegOpusAudio):
+    """Variant of :class:`FileAudioSource` that reads a file from the disk cache.
+
+    Cached Opus files are remuxed rather than re-encoded.
+    """
+
+    def __init__(self, cached: CachedAudio, *, bitrate: int = 320, start: float = 0.0):
+        self.cached = cached
+        self.metadata = cached.metadata
+        self.title = cached.metadata.get("title", "Unknown")
+        self.passthrough = cached.is_opus
+
+        options = {"before_options": FFMPEG_MEMORY_OPTIONS["before_options"], "options": "-vn"}
+        if not self.passthrough:
+            options = dict(FFMPEG_MEMORY_OPTIONS)
+        if start > 0:
+            options["before_options"] = f"-ss {start:.3f} {options['before_options']}"
+        super().__init__(
+            cached.path,
+            bitrate=bitrate,
+            codec="copy" if self.passthrough else None,
+            **options,
+        )
+
+    @classmethod
+    def shared(cls, cached: CachedAudio) -> discord.AudioSource:
+        return broadcast_hub.subscribe(("disk", cached.digest), lambda start: cls(cached, start=start))
+
+
+async def spool_upload(file, *, directory: Optional[str] = UPLOAD_SPOOL_DIR) -> AudioFile:
+    """Start streaming a Discord attachment to a temp file in ``UPLOAD_CHUNK_SIZE`` chunks.
+
+    Returns immediately with a :class:`SpooledUpload` that keeps filling in the
+    background; objects without a URL are read whole into a plain :class:`AudioFile`.
+    """
+
+    suffix = os.path.splitext(getattr(file, "filename", "") or "")[1]
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=suffix, dir=directory or None)
+    url = getattr(file, "url", None)
+    if url:
+        os.close(fd)
+        spool = SpooledUpload(path, expected_size=getattr(file, "size", None))
+        spool.start(url)
+        return spool
+
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(await file.read())
+    except BaseException:
+        _remove(path)
+        raise
+    return AudioFile(path)
+
+
+async def load_upload(file, *, probe: Optional[Awaitable[AudioProbe]] = None) -> Tuple[AudioFile, Dict]:
+    """Start spooling the upload and read its tags from the header/trailer bytes only.
+
+    ``probe`` is a probe already started for this file (see
+    :meth:`MetadataProber.probe_attachments`); otherwise one is made here.
+    """
+
+    audio_file = await spool_upload(file)
+    filename = getattr(file, "filename", "Unknown")
+    try:
+        if probe is not None:
+            probe = await probe
+        elif getattr(file, "url", None):
+            # 다운로드와 별개로 Range 요청으로 앞/뒤 일부만 받아 태그를 읽음
+            probe = await metadata_prober.probe_attachment(file)
+        else:
+            probe = await metadata_prober.probe_file(audio_file.path)
+        metadata = probe.as_metadata(fallback_title=filename)
+    except asyncio.CancelledError:
+        # 요청이 취소되면(?stop 등) 받던 파일도 멈춤
+        cancel_upload(audio_file)
+        raise
+    except Exception:
+        metadata = {"title": filename, "artist": "Unknown", "duration": 0}
+    return audio_file, metadata
+
+
+def cancel_upload(audio_file: AudioFile) -> None:
+    """Stop spooling ``audio_file`` if it is an upload still downloading."""
+
+    if isinstance(audio_file, SpooledUpload):
+        audio_file.cancel()
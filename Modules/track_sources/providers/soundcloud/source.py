@@ -3,19 +3,33 @@
 from __future__ import annotations
 
 import asyncio
-from typing import List
+import logging
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlsplit
 
 import discord
 
-from Modules.track_sources.base import BaseTrackSource, TrackQuery
-from Modules.track_sources.config import FFMPEG_STREAM_OPTIONS
-from Modules.track_sources.providers.soundcloud.ytdl_client import soundcloud_client
+from Modules.track_sources.base import BaseTrackSource, PendingTrack, TrackQuery
+from Modules.track_sources.broadcast import broadcast_hub
+from Modules.track_sources.cache import extraction_cache
+from Modules.track_sources.config import (
+    SOUNDCLOUD_EAGER_HYDRATE,
+    SOUNDCLOUD_HYDRATE_CONCURRENCY,
+    SOUNDCLOUD_HYDRATE_TIMEOUT,
+)
+from Modules.track_sources.utils.ffmpeg import stream_source_kwargs
+from Modules.track_sources.utils.timing import timed
+from Modules.track_sources.utils.ytdl import extract_info
+
+logger = logging.getLogger(__name__)
 
 
 class _SoundCloudAudioSource(discord.FFmpegOpusAudio):
-    def __init__(self, source: str, *, data: dict):
-        super().__init__(source, **FFMPEG_STREAM_OPTIONS)
+    def __init__(self, source: str, *, data: dict, start: float = 0.0):
+        options = stream_source_kwargs(data, start=start)
+        super().__init__(source, **options)
         self.data = data
+        self.passthrough = options.get("codec") == "copy"
         self.title = data.get("title", "Unknown Title")
         self.url = data.get("url")
         self.artist = data.get("uploader") or data.get("creator")
@@ -37,46 +51,129 @@ class SoundCloudSource(BaseTrackSource):
         )
 
     @classmethod
-    async def create_tracks(cls, query: TrackQuery) -> List[discord.FFmpegOpusAudio]:
-        ytdl = soundcloud_client()
-        loop = asyncio.get_event_loop()
-
-        def _extract():
-            info_query = query.raw.strip()
-            lower_query = info_query.lower()
-            if not info_query.startswith("http"):
-                if lower_query.startswith("scsearch:"):
-                    info_query_to_use = info_query
-                elif lower_query.startswith("soundcloud:"):
-                    info_query_to_use = info_query.split(":", 1)[1].strip() or info_query
-                elif lower_query.startswith("soundcloud "):
-                    info_query_to_use = info_query.split(" ", 1)[1].strip() or info_query
-                else:
-                    info_query_to_use = f"scsearch1:{info_query}"
-            else:
-                info_query_to_use = info_query
-            return ytdl.extract_info(info_query_to_use, download=False)
-
-        data = await loop.run_in_executor(None, _extract)
-        entries = _hydrate_entries(data)
-        return [_SoundCloudAudioSource(entry["url"], data=entry) for entry in entries]
-
-
-def _hydrate_entries(data):
-    entries = []
-    if not data:
-        return entries
-
-    raw_entries = data["entries"] if "entries" in data else [data]
-    client = soundcloud_client()
-    for entry in raw_entries:
-        if not entry:
-            continue
-        if "url" not in entry and entry.get("webpage_url"):
+    async def create_tracks(cls, query: TrackQuery) -> List[PendingTrack]:
+        timings: Dict[str, float] = {}
+        with timed(timings, "extract"):
+            data = await extraction_cache.get_or_extract(
+                cls.name, query, lambda: extract_info("soundcloud", _info_query(query.raw))
+            )
+        if not data:
+            return []
+
+        raw_entries = [entry for entry in (data["entries"] if "entries" in data else [data]) if entry]
+        # 첫 곡을 바로 재생하고 제목을 보여줄 수 있도록 앞쪽 몇 곡만 미리 hydrate
+        head = raw_entries[:SOUNDCLOUD_EAGER_HYDRATE]
+        with timed(timings, "hydrate"):
+            hydrated = await _hydrate_entries(head)
+        entries = hydrated + raw_entries[len(head):]
+
+        logger.info(
+            "SoundCloud %s: %d entries, extract %.2fs, eager hydrate %d/%d in %.2fs",
+            query.raw,
+            len(raw_entries),
+            timings["extract"],
+            sum(1 for entry in hydrated if entry.get("url") and not _is_flat(entry)),
+            len(head),
+            timings["hydrate"],
+        )
+        return [cls._pending_from_entry(entry) for entry in entries if entry.get("url")]
+
+    @classmethod
+    def _pending_from_entry(cls, entry: dict) -> PendingTrack:
+        if _is_flat(entry):
+            # 아직 hydrate 되지 않은 세트 항목: URL 슬러그를 임시 제목으로 쓰고 재생 시점에 해석
+            return PendingTrack(
+                title=entry.get("title") or _title_from_url(entry["url"]),
+                webpage_url=entry["url"],
+                duration=entry.get("duration") or 0,
+                loader=cls._load_source,
+                resolver=cls._resolve_stream,
+            )
+        return PendingTrack(
+            title=entry.get("title", "Unknown Title"),
+            webpage_url=entry.get("webpage_url"),
+            duration=entry.get("duration") or 0,
+            loader=cls._load_source,
+            data=entry,
+        )
+
+    @classmethod
+    async def _resolve_stream(cls, track: PendingTrack) -> None:
+        timings: Dict[str, float] = {}
+        with timed(timings, "hydrate"):
+            entry = await _hydrate_entry(track.webpage_url)
+        if not entry or not entry.get("url"):
+            raise ValueError(f"SoundCloud 트랙을 불러오지 못했습니다: {track.title}")
+        # 캐시에 있는 dict를 건드리지 않도록 복사본에 단계별 소요 시간을 기록
+        track.data = {**entry, "timings": timings}
+        track.title = entry.get("title") or track.title
+        track.duration = entry.get("duration") or track.duration
+        logger.debug("SoundCloud lazy hydrate %s in %.2fs", track.title, timings["hydrate"])
+
+    @classmethod
+    async def _load_source(cls, track: PendingTrack) -> discord.AudioSource:
+        data = track.data
+        # 같은 곡을 재생 중인 다른 서버가 있으면 그 디코더를 공유
+        return broadcast_hub.subscribe(
+            ("soundcloud", data.get("id") or track.webpage_url or data["url"], data.get("format_id")),
+            lambda start: _SoundCloudAudioSource(data["url"], data=data, start=start),
+        )
+
+
+def _info_query(raw: str) -> str:
+    info_query = raw.strip()
+    lower_query = info_query.lower()
+    if info_query.startswith("http"):
+        return info_query
+    if lower_query.startswith("scsearch:"):
+        return info_query
+    if lower_query.startswith("soundcloud:"):
+        return info_query.split(":", 1)[1].strip() or info_query
+    if lower_query.startswith("soundcloud "):
+        return info_query.split(" ", 1)[1].strip() or info_query
+    return f"scsearch1:{info_query}"
+
+
+def _is_flat(entry: dict) -> bool:
+    return entry.get("_type") in {"url", "url_transparent"}
+
+
+def _title_from_url(url: str) -> str:
+    slug = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+    return unquote(slug).replace("-", " ") or "Unknown Title"
+
+
+async def _hydrate_entry(url: str) -> Optional[dict]:
+    return await asyncio.wait_for(
+        extraction_cache.get_or_extract(
+            SoundCloudSource.name, TrackQuery(url), lambda: extract_info("soundcloud", url)
+        ),
+        timeout=SOUNDCLOUD_HYDRATE_TIMEOUT,
+    )
+
+
+async def _hydrate_entries(
+    entries: List[dict],
+    *,
+    concurrency: int = SOUNDCLOUD_HYDRATE_CONCURRENCY,
+) -> List[dict]:
+    """Hydrate flat entries concurrently, keeping order.
+
+    Entries that fail or time out are returned unchanged (still flat), so the
+    caller gets partial results and those tracks are retried lazily at play time.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(entry: dict) -> dict:
+        if not _is_flat(entry) or not entry.get("url"):
+            return entry
+        async with semaphore:
             try:
-                entry = client.extract_info(entry["webpage_url"], download=False)
-            except Exception:
-                continue
-        if entry.get("url"):
-            entries.append(entry)
-    return entries
+                hydrated = await _hydrate_entry(entry["url"])
+            except Exception as exc:
+                logger.warning("SoundCloud hydrate failed for %s: %s", entry["url"], exc)
+                return entry
+        return hydrated if hydrated and hydrated.get("url") else entry
+
+    return list(await asyncio.gather(*(_one(entry) for entry in entries)))
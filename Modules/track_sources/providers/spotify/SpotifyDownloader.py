@@ -1,168 +1,214 @@
-import requests
-import urllib.parse
+import asyncio
+import logging
 import re
+import time
+import urllib.parse
 
-_SESSION = None
-
-def debug_response(response, max_length=1000):
-    content = response.text[:max_length] + '...' if len(response.text) > max_length else response.text
-    print(f"[Debug] Response Snippet:\n{content}\n")
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = 'https://spotisongdownloader.to'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36'
+
+# track.php에서 다운로드 API 주소를 찾는 패턴
+API_PATTERNS = [
+    r'url:\s*["\'](/api/composer/spotify/[^"\']+)["\']',
+    r'url\s*:\s*["\']([^"\']+/api/[^"\']+)["\']',
+    r'const apiUrl\s*=\s*["\']([^"\']+)["\']'
+]
+
+
+class SpotiSongEndpoint:
+    """PHPSESSID and scraped API endpoint of spotisongdownloader, cached between tracks.
+
+    The cookie and the endpoint scraped from ``track.php`` are fetched once
+    and reused until ``max_age`` passes or the API rejects them, after which
+    they are fetched again and the track retried once. Track details come
+    from the cached Spotify metadata client, so resolving a track is a
+    single POST to the API. As before, the returned link points at the file
+    tagged by the site's ``saveid3`` step; ``id3=False`` skips that extra
+    request and returns the raw ``dlink``.
+    ``base_url`` can point at a local stub server.
+    """
+
+    def __init__(self, base_url=BASE_URL, quality='320', max_age=30 * 60):
+        self.base_url = base_url.rstrip('/')
+        self.quality = quality
+        self.max_age = max_age
+        self._session = None
+        self._loop = None
+        self._lock = None
+        self._cookie = None
+        self._api_url = None
+        self._refreshed_at = 0.0
+        self.refreshes = 0
+        self.requests = 0
+
+    @property
+    def session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # 쿠키는 직접 Cookie 헤더로 보내므로 세션 쿠키 저장소는 사용하지 않음
+            self._session = aiohttp.ClientSession(
+                cookie_jar=aiohttp.DummyCookieJar(),
+                headers={'User-Agent': USER_AGENT, 'Referer': f'{self.base_url}/'},
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+            self._loop = loop
+            self._lock = asyncio.Lock()
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _fresh(self):
+        return self._api_url is not None and time.monotonic() - self._refreshed_at < self.max_age
+
+    def invalidate(self):
+        self._api_url = None
+
+    async def ensure(self):
+        """Cookie and API endpoint, fetching them first if they are missing or stale."""
+        session = self.session
+        if self._fresh():
+            return self._cookie, self._api_url
+        async with self._lock:
+            if self._fresh():
+                return self._cookie, self._api_url
+
+            self.requests += 1
+            async with session.get(f'{self.base_url}/') as response:
+                response.raise_for_status()
+                morsel = response.cookies.get('PHPSESSID')
+            phpsessid = morsel.value if morsel else ''
+
+            self.requests += 1
+            async with session.get(f'{self.base_url}/track.php', headers={'Cookie': f'PHPSESSID={phpsessid}'}) as response:
+                response.raise_for_status()
+                page = await response.text()
+
+            for pattern in API_PATTERNS:
+                match = re.search(pattern, page)
+                if match:
+                    break
+            else:
+                raise ValueError("API 주소를 찾을 수 없음")
+
+            self._cookie = f'PHPSESSID={phpsessid}; quality={self.quality}'
+            self._api_url = urllib.parse.urljoin(self.base_url, match.group(1))
+            self._refreshed_at = time.monotonic()
+            self.refreshes += 1
+            logger.debug("API endpoint found: %s", self._api_url)
+            return self._cookie, self._api_url
+
+    def _headers(self, cookie):
+        return {
+            'Accept': 'application/json, text/javascript, */*; q=0.01',
+            'Cookie': cookie,
+            'Origin': self.base_url,
+            'Referer': f'{self.base_url}/track.php',
+        }
+
+    async def resolve(self, track_data, id3=True):
+        """Download link for ``track_data`` (``song_name``, ``artist``, ``url``, ...)."""
+        payload = {
+            'song_name': track_data['song_name'],
+            'artist_name': track_data['artist'],
+            'url': track_data['url']
+        }
+        last_error = None
+        for _ in range(2):
+            cookie, api_url = await self.ensure()
+            self.requests += 1
+            async with self.session.post(api_url, data=payload, headers=self._headers(cookie)) as response:
+                if response.status == 200:
+                    download_data = await response.json(content_type=None)
+                    dlink = download_data.get('dlink')
+                    if dlink:
+                        break
+                    last_error = "dlink 필드 누락"
+                else:
+                    last_error = f"{response.status}: {(await response.text())[:200]}"
+            # 세션 만료나 API 주소 변경일 수 있으므로 다시 받아서 한 번 더 시도
+            self.invalidate()
+        else:
+            raise ValueError(f"다운로드 링크 생성 실패: {last_error}")
+
+        if not id3:
+            return dlink
+        return await self._save_id3(cookie, {**track_data, 'dlink': dlink})
+
+    async def _save_id3(self, cookie, track_data):
+        payload = {
+            'url': track_data['dlink'],
+            'name': track_data['song_name'],
+            'artist': track_data['artist'],
+            'album': track_data.get('album', 'Unknown Album'),
+            'thumb': track_data.get('thumb', ''),
+            'released': track_data.get('released', '')
+        }
+        self.requests += 1
+        async with self.session.post(
+            f'{self.base_url}/api/composer/ffmpeg/saveid3.php', data=payload, headers=self._headers(cookie)
+        ) as response:
+            response.raise_for_status()
+            filename = (await response.text()).strip()
+        return f'{self.base_url}/api/composer/ffmpeg/saved/{filename}'
+
+    async def fetch_track_data(self, spotify_url):
+        """Track details from the site itself, for when the Spotify API is not configured."""
+        self.requests += 1
+        async with self.session.get(
+            f'{self.base_url}/api/composer/spotify/xsingle_track.php', params={'url': spotify_url}
+        ) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+
+async def get_track_data(spotify_url):
+    # 순환 import 방지를 위해 지연 import
+    from Modules.track_sources.providers.spotify.client import spotify_client
+    from Modules.track_sources.providers.spotify.getMetadata import parse_uri
 
-def get_cookie(quality='320'):
-    global _SESSION
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
-        'Referer': 'https://spotisongdownloader.to/'
-    }
     try:
-        if _SESSION is None:
-            _SESSION = requests.Session()
-
-        response = _SESSION.get('https://spotisongdownloader.to/', headers=headers)
-        print(f"Cookie Status: {response.status_code}")
-        
-        cookies = _SESSION.cookies.get_dict()
-        return f"PHPSESSID={cookies.get('PHPSESSID', '')}; quality={quality}"
+        track = await spotify_client.get_track(parse_uri(spotify_url)['id'])
     except Exception as e:
-        print(f"Cookie Error: {str(e)}")
-        return None
-
-def get_api():
-    global _SESSION
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
-        'Referer': 'https://spotisongdownloader.to/'
+        logger.warning("Spotify metadata unavailable, asking the site instead: %s", e)
+        return await endpoint.fetch_track_data(spotify_url)
+
+    album = track.get('album') or {}
+    return {
+        'song_name': track['name'],
+        'artist': ", ".join(a['name'] for a in track['artists']),
+        'url': spotify_url,
+        'album': album.get('name', 'Unknown Album'),
+        'thumb': album['images'][0]['url'] if album.get('images') else '',
+        'released': album.get('release_date', '')
     }
-    try:
-        response = _SESSION.get('https://spotisongdownloader.to/track.php', headers=headers)
-        print(f"API Status: {response.status_code}")
-
-        patterns = [
-            r'url:\s*["\'](/api/composer/spotify/[^"\']+)["\']',
-            r'url\s*:\s*["\']([^"\']+/api/[^"\']+)["\']',
-            r'const apiUrl\s*=\s*["\']([^"\']+)["\']'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, response.text)
-            if match:
-                api_endpoint = urllib.parse.urljoin('https://spotisongdownloader.to', match.group(1))
-                print(f"API Endpoint Found: {api_endpoint}")
-                return api_endpoint
-
-        print("❗ No API Pattern Matched")
-        return None
-            
-    except Exception as e:
-        print(f"API Error: {str(e)}")
-        return None
 
-def get_data(link):
-    try:
-        response = requests.get(
-            'https://spotisongdownloader.to/api/composer/spotify/xsingle_track.php', 
-            params={'url': link},
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
-                'Referer': 'https://spotisongdownloader.to/'
-            },
-            timeout=15
-        )
-        
-        print(f"[DEBUG] GET Data Status: {response.status_code}")
-
-        response.raise_for_status()
-        return response.json()
-        
-    except requests.exceptions.JSONDecodeError:
-        print(f"[ERROR] Invalid JSON Response: {response.text[:200]}...")
-        return None
-        
-    except Exception as e:
-        print(f"[ERROR] get_data error: {str(e)}")
-        return None
-
-def get_url(track_data, cookie):
-    api_url = get_api()
-    if not api_url:
-        print("API URL을 찾을 수 없음")
-        return None
-
-    headers = {
-        'Accept': 'application/json, text/javascript, */*; q=0.01',
-        'Cookie': cookie,
-        'Origin': 'https://spotisongdownloader.to',
-        'Referer': 'https://spotisongdownloader.to/track.php',
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36'
-    }
 
-    payload = {
-        'song_name': track_data['song_name'],
-        'artist_name': track_data['artist'],
-        'url': track_data['url']
-    }
+async def get_spotify_download_link_async(spotify_url, id3=True):
+    """Spotify URL을 입력받아 다운로드 링크 반환"""
+    track_data = await get_track_data(spotify_url)
+    if not track_data:
+        raise ValueError("트랙 데이터 추출 실패")
+    return await endpoint.resolve(track_data, id3=id3)
 
-    try:
-        response = requests.post(api_url, data=payload, headers=headers)
-        response.raise_for_status()
-        download_data = response.json()
-        
-        track_data['dlink'] = download_data.get('dlink')
-        if not track_data['dlink']:
-            print("dlink 필드 누락")
-            return None
 
-        return get_id3_url(track_data, cookie)
+def get_spotify_download_link(spotify_url, id3=True):
+    from Modules.track_sources.providers.spotify.client import spotify_client
 
-    except Exception as e:
-        print(f"Download Error: {str(e)}")
-        return None
-
-def get_id3_url(track_data, cookie):
-    headers = {
-        'Accept': 'application/json, text/javascript, */*; q=0.01',
-        'Cookie': cookie,
-        'Origin': 'https://spotisongdownloader.to',
-        'Referer': 'https://spotisongdownloader.to/track.php',
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36'
-    }
+    async def run():
+        try:
+            return await get_spotify_download_link_async(spotify_url, id3=id3)
+        finally:
+            await endpoint.close()
+            await spotify_client.close()
 
-    payload = {
-        'url': track_data['dlink'],
-        'name': track_data['song_name'],
-        'artist': track_data['artist'],
-        'album': track_data.get('album', 'Unknown Album'),
-        'thumb': track_data.get('thumb', ''),
-        'released': track_data.get('released', '')
-    }
+    return asyncio.run(run())
 
-    try:
-        response = requests.post(
-            'https://spotisongdownloader.to/api/composer/ffmpeg/saveid3.php',
-            data=payload,
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        filename = response.text.strip()
-        return f"https://spotisongdownloader.to/api/composer/ffmpeg/saved/{filename}"
-    
-    except Exception as e:
-        print(f"ID3 Error: {str(e)}")
-        return None
 
-def get_spotify_download_link(spotify_url):
-    """Spotify URL을 입력받아 다운로드 링크 반환"""
-    cookie = get_cookie()
-    if not cookie:
-        raise ValueError("쿠키 획득 실패")
-    
-    track_data = get_data(spotify_url)
-    if not track_data:
-        raise ValueError("트랙 데이터 추출 실패")
-    
-    final_link = get_url(track_data, cookie)
-    if not final_link:
-        raise ValueError("다운로드 링크 생성 실패")
-    
-    return final_link 
\ No newline at end of file
+endpoint = SpotiSongEndpoint()
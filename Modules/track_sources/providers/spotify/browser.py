@@ -0,0 +1,261 @@
+"""One long-lived browser process with a pool of reusable tabs for token minting."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+try:
+    import zendriver as zd
+except ImportError:
+    zd = None
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+BROWSER_EXECUTABLE = os.getenv("CHROME_PATH", "/usr/bin/google-chrome")
+BROWSER_OPTIONS = {
+    "disable_dev_shm_usage": True,
+    "args": ["--display=:99"],
+}
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Resident memory in bytes of ``pid`` plus all its descendants, or None if unavailable.
+
+    Chrome keeps renderers and the GPU process as children of the browser
+    process, so the main pid alone badly undercounts. Reads ``/proc``, so
+    it only works on Linux.
+    """
+
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as stat:
+                raw = stat.read()
+        except OSError:
+            continue
+        # comm 필드에 공백/괄호가 있을 수 있으므로 마지막 ')' 이후부터 파싱
+        fields = raw[raw.rfind(b")") + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(entry))
+
+    total, stack, found = 0, [pid], False
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/statm") as statm:
+                total += int(statm.read().split()[1]) * _PAGE_SIZE
+            found = True
+        except (OSError, IndexError, ValueError):
+            pass
+        stack.extend(children.get(current, ()))
+    return total if found else None
+
+
+class BrowserManager:
+    """Shares one browser between token requests instead of starting Chrome for each.
+
+    :meth:`page` hands out a tab from a pool of at most ``pages`` tabs, so
+    that many requests run concurrently and the rest wait. A tab goes back
+    to the pool (reset to ``about:blank``) after each use and is closed
+    after ``max_uses`` uses or if the caller raised. The browser is started
+    lazily and restarted when it has died or when its process tree grows
+    past ``max_rss_mb``. A dead browser is restarted at once; a memory
+    restart is postponed until every tab in use has been returned, and no
+    new tabs are handed out in the meantime, so it never closes a page
+    under a running request.
+    """
+
+    def __init__(
+        self,
+        *,
+        pages: int = 2,
+        max_uses: int = 25,
+        max_rss_mb: Optional[float] = 1024,
+        headless: bool = False,
+        executable: str = BROWSER_EXECUTABLE,
+        options: Optional[Dict[str, Any]] = None,
+    ):
+        self.pages = max(1, pages)
+        self.max_uses = max(1, max_uses)
+        self.max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.headless = headless
+        self.executable = executable
+        self.options = BROWSER_OPTIONS if options is None else options
+        self._browser: Any = None
+        self._generation = 0
+        self._idle: List[Any] = []
+        self._in_use = 0
+        self._retiring = False
+        self._returned: Optional[asyncio.Event] = None
+        self._uses: Dict[int, int] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.starts = 0
+        self.restarts = 0
+        self.tabs_opened = 0
+        self.tabs_recycled = 0
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.pages)
+            self._returned = asyncio.Event()
+            if not self._in_use:
+                self._returned.set()
+            self._loop = loop
+
+    def _alive(self) -> bool:
+        return self._browser is not None and not getattr(self._browser, "stopped", False)
+
+    def rss(self) -> Optional[int]:
+        pid = getattr(self._browser, "_process_pid", None)
+        return process_tree_rss(pid) if pid else None
+
+    async def _start(self) -> Any:
+        if zd is None:
+            raise RuntimeError("zendriver is not installed")
+        started = time.perf_counter()
+        self._browser = await zd.start(
+            headless=self.headless,
+            browser_executable_path=self.executable,
+            options=self.options,
+        )
+        self._generation += 1
+        self._idle.clear()
+        self._uses.clear()
+        self.starts += 1
+        logger.info("Browser started in %.1fs", time.perf_counter() - started)
+        return self._browser
+
+    async def _stop(self) -> None:
+        browser, self._browser = self._browser, None
+        self._retiring = False
+        self._idle.clear()
+        self._uses.clear()
+        if browser is not None:
+            with contextlib.suppress(Exception):
+                await browser.stop()
+
+    async def browser(self) -> Any:
+        """The running browser, (re)starting it if it died or uses too much memory.
+
+        A memory restart first waits for the tabs in use to come back.
+        """
+
+        self._bind_loop()
+        async with self._lock:
+            if self._alive() and self.max_rss and not self._retiring:
+                rss = self.rss()
+                if rss is not None and rss > self.max_rss:
+                    logger.warning(
+                        "Browser using %.0f MB; restarting once %d tab(s) in use are returned",
+                        rss / 1024 / 1024, self._in_use,
+                    )
+                    self._retiring = True
+            if self._retiring and self._alive():
+                # 락을 잡은 채 기다리므로 그동안 새 탭은 나가지 않음 (반납에는 락이 필요 없음)
+                await self._returned.wait()
+                self.restarts += 1
+                await self._stop()
+            if not self._alive():
+                if self._browser is not None:
+                    logger.warning("Browser process died; restarting")
+                    self.restarts += 1
+                    await self._stop()
+                await self._start()
+            return self._browser
+
+    async def _acquire_tab(self) -> Any:
+        browser = await self.browser()
+        # browser()가 돌아온 뒤 await 없이 바로 세야 재시작 판단과 어긋나지 않음
+        self._in_use += 1
+        self._returned.clear()
+        try:
+            if self._idle:
+                return self._idle.pop()
+            self.tabs_opened += 1
+            tab = await browser.get("about:blank", new_tab=True)
+        except BaseException:
+            self._check_in()
+            raise
+        self._uses[id(tab)] = 0
+        return tab
+
+    def _check_in(self) -> None:
+        self._in_use -= 1
+        if not self._in_use:
+            self._returned.set()
+
+    async def _release_tab(self, tab: Any, generation: int, failed: bool) -> None:
+        uses = self._uses.get(id(tab), 0) + 1
+        if generation != self._generation or not self._alive() or self._retiring:
+            return  # 재시작할 브라우저의 탭은 풀에 되돌리지 않음
+        if failed or uses >= self.max_uses:
+            self._uses.pop(id(tab), None)
+            self.tabs_recycled += 1
+            with contextlib.suppress(Exception):
+                await tab.close()
+            return
+        try:
+            await tab.get("about:blank")
+        except Exception:
+            self._uses.pop(id(tab), None)
+            return
+        self._uses[id(tab)] = uses
+        self._idle.append(tab)
+
+    @contextlib.asynccontextmanager
+    async def page(self, url: Optional[str] = None) -> AsyncIterator[Any]:
+        """A pooled tab, optionally navigated to ``url``, returned to the pool on exit."""
+
+        self._bind_loop()
+        async with self._slots:
+            tab = await self._acquire_tab()
+            generation = self._generation
+            failed = True
+            try:
+                if url:
+                    await tab.get(url)
+                yield tab
+                failed = False
+            finally:
+                try:
+                    await self._release_tab(tab, generation, failed)
+                finally:
+                    self._check_in()
+
+    async def close(self) -> None:
+        if self._lock is None:
+            await self._stop()
+            return
+        async with self._lock:
+            await self._stop()
+
+    def stats(self) -> Dict[str, Any]:
+        rss = self.rss() if self._alive() else None
+        return {
+            "starts": self.starts,
+            "restarts": self.restarts,
+            "tabs_opened": self.tabs_opened,
+            "tabs_recycled": self.tabs_recycled,
+            "idle_tabs": len(self._idle),
+            "tabs_in_use": self._in_use,
+            "rss_mb": round(rss / 1024 / 1024, 1) if rss else None,
+        }
+
+
+browser_manager = BrowserManager()
@@ -1,5 +1,7 @@
 import argparse
+import json
 import os
+import random
 import re
 import sys
 import asyncio
@@ -7,15 +9,23 @@ import aiohttp
 from datetime import datetime
 from dataclasses import dataclass
 import io
+from cachetools import LRUCache
 from mutagen.mp3 import MP3
+from PIL import Image
 from mutagen.id3 import ID3, APIC, TIT2, TPE1, TALB, TDRC, TRCK, TSRC, COMM
 
 from Modules.track_sources.providers.spotify.getMetadata import (
     SpotifyInvalidUrlException,
-    get_filtered_data,
+    get_filtered_data_async,
     parse_uri,
 )
+from Modules.track_sources.providers.spotify.client import spotify_client
+from Modules.track_sources.providers.spotify.browser import browser_manager
 from Modules.track_sources.providers.spotify.getToken import get_session_token
+from Modules.track_sources.providers.spotify.tokens import SessionTokenPool
+
+DOWNLOAD_API_URL = "https://api.spotidownloader.com/download/"
+CONTENT_RANGE_PATTERN = re.compile(r'bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)')
 
 @dataclass
 class Track:
@@ -29,49 +39,81 @@ class Track:
     image_url: str = ""
     release_date: str = ""
 
-class TokenManager:
-    def __init__(self):
-        self.token = None
-        self.refresh_interval = 45 * 60  # 45분마다 갱신
-        self.running = False
-        self._refresh_event = asyncio.Event()
-
-    async def start(self):
-        self.running = True
-        while self.running:
-            try:
-                self.token = await get_session_token()
-                if not self.token:
-                    raise Exception("Failed to fetch token")
-                print("Successfully refreshed download token")
-                await asyncio.wait_for(self._refresh_event.wait(), self.refresh_interval)
-                self._refresh_event.clear()
-            except asyncio.TimeoutError:
-                pass  # 정기 갱신 시간 도달
-            except Exception as e:
-                print(f"Token refresh error: {e}, retrying in 30 seconds...")
-                await asyncio.sleep(30)
-
-    def trigger_refresh(self):
-        self._refresh_event.set()
+class CoverArtCache:
+    """Cover images fetched once per URL and shared by every track in a batch.
+
+    Concurrent requests for the same URL share one fetch, and results are
+    kept in an LRU bounded by total bytes. With ``max_size`` set, covers
+    larger than ``max_size`` pixels on either side are scaled down and
+    recompressed as JPEG before they are cached.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_size=None, quality=90):
+        self.max_size = max_size
+        self.quality = quality
+        self._cache = LRUCache(maxsize=max_bytes, getsizeof=len)
+        self._inflight = {}
+        self.hits = 0
+        self.fetches = 0
+
+    async def get(self, session, url):
+        cached = self._cache.get(url)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(session, url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        else:
+            self.hits += 1
+        return await asyncio.shield(task)
+
+    async def _fetch(self, session, url):
+        self.fetches += 1
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            data = await resp.read()
+        if self.max_size:
+            data = await asyncio.to_thread(self._shrink, data)
+        if len(data) <= self._cache.maxsize:
+            self._cache[url] = data
+        return data
+
+    def _shrink(self, data):
+        with Image.open(io.BytesIO(data)) as image:
+            if max(image.size) <= self.max_size:
+                return data
+            image.thumbnail((self.max_size, self.max_size))
+            output = io.BytesIO()
+            image.convert("RGB").save(output, format="JPEG", quality=self.quality, optimize=True)
+        return output.getvalue()
 
-    def stop(self):
-        self.running = False
-        self._refresh_event.set()
 
 class Downloader:
     def __init__(self, token_manager, output_path=None, filename_format='title_artist', 
-                 use_track_numbers=True, use_album_subfolders=False):
+                 use_track_numbers=True, use_album_subfolders=False,
+                 concurrency=4, per_host_limit=4, max_retries=3, resume=True, cover_cache=None,
+                 api_url=DOWNLOAD_API_URL):
         self.token_manager = token_manager
+        self.api_url = api_url
         self.output_path = output_path
         self.filename_format = filename_format
         self.use_track_numbers = use_track_numbers
         self.use_album_subfolders = use_album_subfolders
+        self.concurrency = max(1, concurrency)
+        self.per_host_limit = max(1, per_host_limit)
+        self.max_retries = max(0, max_retries)
+        self.resume = resume
+        self.cover_cache = cover_cache or CoverArtCache()
         self.failed_tracks = []
+        # .part 파일별 전체 크기 (이번 실행에서 알게 된 경우만)
+        self._part_sizes = {}
 
     async def fetch_tracks(self, url):
         try:
-            metadata = get_filtered_data(url)
+            metadata = await get_filtered_data_async(url)
             if "error" in metadata:
                 raise Exception(metadata["error"])
             
@@ -124,15 +166,47 @@ class Downloader:
         return tracks
 
     async def download_all(self, tracks, content_type, content_name):
+        """Download tracks concurrently over one shared session.
+
+        Each track streams into ``<name>.part`` and resumes from there on a
+        retry or a later run. Tags are written on a worker thread while the
+        freed slot starts the next download, and finished tracks are recorded
+        in a progress file so a rerun skips them.
+        """
         total = len(tracks)
+        progress = self._load_progress()
+        pending = []
         for idx, track in enumerate(tracks, 1):
-            print(f"Downloading {idx}/{total}: {track.title} - {track.artists}")
-            success, message = await self._download_track(track, content_type, content_name)
-            if not success:
-                self.failed_tracks.append((track.title, track.artists, message))
-                print(f"Failed: {message}")
-            else:
-                print("Success")
+            output_path = self._get_output_path(track, content_type, content_name)
+            if self.resume and progress.get(track.id) == output_path and os.path.exists(output_path):
+                print(f"[{idx}/{total}] Skipped (already downloaded): {track.title} - {track.artists}")
+                continue
+            pending.append((idx, track, output_path))
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency * 2, limit_per_host=self.per_host_limit)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        progress_lock = asyncio.Lock()
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def process(idx, track, output_path):
+                try:
+                    async with semaphore:
+                        print(f"[{idx}/{total}] Downloading: {track.title} - {track.artists}")
+                        part_path = await self._download_track(session, track, output_path)
+                    # 태그 작업은 슬롯을 반납한 뒤 진행해서 다음 곡 다운로드와 겹치게 함
+                    await self._embed_metadata(session, part_path, track)
+                    os.replace(part_path, output_path)
+                except Exception as e:
+                    self.failed_tracks.append((track.title, track.artists, str(e)))
+                    print(f"[{idx}/{total}] Failed: {track.title} - {e}")
+                    return
+                async with progress_lock:
+                    progress[track.id] = output_path
+                    await asyncio.to_thread(self._save_progress, dict(progress))
+                print(f"[{idx}/{total}] Success: {track.title}")
+
+            await asyncio.gather(*(process(*item) for item in pending))
 
         if self.failed_tracks:
             print(f"\nCompleted with {len(self.failed_tracks)} errors:")
@@ -141,76 +215,109 @@ class Downloader:
         else:
             print("\nAll tracks downloaded successfully!")
 
-    async def _download_track(self, track):
-        buffer = io.BytesIO()
-        max_retries = 2
-        retry_count = 0
-        error_message = ""
+    @property
+    def _progress_path(self):
+        return os.path.join(self.output_path, ".download-progress.json")
 
+    def _load_progress(self):
         try:
-                async with aiohttp.ClientSession() as session:
-                    # API 요청
-                    api_url = "https://api.spotidownloader.com/download/"
-                    headers = {
-                        'Authorization': f'Bearer {self.token_manager.token}',
-                        'Host': 'api.spotidownloader.com',
-                        'Referer': 'https://spotidownloader.com/',
-                        'Origin': 'https://spotidownloader.com',
-                        'Content-Type': 'application/json'
-                    }
-                    payload = {"id": track.id}
-
-                    async with session.post(api_url, 
-                                            headers=headers, 
-                                            json=payload, 
-                                            timeout=30
-                    ) as response:
-                        if response.status != 200:
-                            error_message = await response.text()
-                            self.token_manager.trigger_refresh()
-                            raise Exception(f"API request failed: {error_message}")
-
-                        data = await response.json()
-                        print(data)
-                        if not data.get('success'):
-                            error_message = data.get('error', 'Unknown error')
-                            raise Exception(f"API error: {error_message}")
-
-                    host = data['link'].split('//', 1)[1].split('/', 1)[0]
-                    download_headers = {
-                        'Host': host,
-                        'Referer': 'https://spotidownloader.com/',
-                        'Origin': 'https://spotidownloader.com'
-                    }
-
-                    audio_url = data['link']
-                    print(f"[DEBUG] 오디오 다운로드 URL: {audio_url}")
-
-                    # 오디오 다운로드
-                    async with session.get(data['link'], headers=download_headers, timeout=300) as audio_response:
-                        if audio_response.status != 200:
-                            raise Exception(f"Audio download failed: {audio_response.status}")
-                        
-                        total_size = 0
-
-                        while True:
-                            chunk = await audio_response.content.read(8192)
-                            if not chunk:
-                                break
-                            buffer.write(chunk)
-                            total_size += len(chunk)
-                        
-                        print(f"[DEBUG] 총 다운로드 크기: {total_size}바이트")
-                        buffer.seek(0)
-                                                
-                        return True, "다운로드 성공", buffer
-
-        except Exception as e:
-                return False, str(e), buffer
-        finally:
-                pass
-
-        return False, error_message, None
+            with open(self._progress_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_progress(self, progress):
+        os.makedirs(self.output_path, exist_ok=True)
+        tmp_path = self._progress_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(progress, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._progress_path)
+
+    async def _download_track(self, session, track, output_path):
+        """Stream the track into ``output_path + '.part'``, retrying with exponential backoff."""
+        part_path = output_path + ".part"
+        os.makedirs(os.path.dirname(part_path) or ".", exist_ok=True)
+        if not self.resume and os.path.exists(part_path):
+            os.remove(part_path)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = min(2 ** attempt, 30) + random.uniform(0, 1)
+                print(f"Retrying {track.title} in {delay:.1f}s ({attempt}/{self.max_retries}): {last_error}")
+                await asyncio.sleep(delay)
+            try:
+                link = await self._request_link(session, track)
+                await self._stream_to_file(session, link, part_path)
+                return part_path
+            except Exception as e:
+                last_error = e
+
+        raise Exception(f"Download failed after {self.max_retries + 1} attempts: {last_error}")
+
+    async def _request_link(self, session, track):
+        token = await self.token_manager.get()
+        headers = {
+            'Authorization': f'Bearer {token}',
+            'Referer': 'https://spotidownloader.com/',
+            'Origin': 'https://spotidownloader.com',
+            'Content-Type': 'application/json'
+        }
+        async with session.post(
+            self.api_url,
+            headers=headers,
+            json={"id": track.id},
+            timeout=aiohttp.ClientTimeout(total=30),
+        ) as response:
+            if response.status != 200:
+                if response.status in (401, 403):
+                    self.token_manager.invalidate(token)
+                raise Exception(f"API request failed ({response.status}): {await response.text()}")
+            data = await response.json()
+
+        if not data.get('success'):
+            raise Exception(f"API error: {data.get('error', 'Unknown error')}")
+        return data['link']
+
+    async def _stream_to_file(self, session, link, part_path):
+        # 이전 시도(또는 이전 실행)에서 받아 둔 부분이 있으면 Range 요청으로 이어받음
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        expected = self._part_sizes.get(part_path)
+        headers = {
+            'Referer': 'https://spotidownloader.com/',
+            'Origin': 'https://spotidownloader.com'
+        }
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+
+        async with session.get(link, headers=headers) as response:
+            content_range = response.headers.get('Content-Range')
+            start, total = _parse_content_range(content_range)
+            if response.status == 416 and offset:
+                if total == offset and expected in (None, total):
+                    return  # 이미 끝까지 받아 둔 파일
+            elif response.status not in (200, 206):
+                raise Exception(f"Audio download failed: {response.status}")
+            elif response.status == 200 or (
+                start == offset and (expected is None or total is None or total == expected)
+            ):
+                # 서버가 Range를 무시하고 200으로 전체를 보내면 처음부터 다시 씀
+                if response.status == 200:
+                    start, total = 0, response.content_length
+                if total:
+                    self._part_sizes[part_path] = total
+                with open(part_path, 'ab' if start else 'wb') as f:
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        f.write(chunk)
+                return
+            elif not offset:
+                raise Exception(f"Unexpected partial response: {content_range}")
+
+        # 요청한 위치부터가 아니거나 다른 파일의 일부인 응답: 받아 둔 부분을 버리고 처음부터
+        print(f"Restarting {os.path.basename(part_path)}: asked for byte {offset}, got {content_range or response.status}")
+        os.remove(part_path)
+        self._part_sizes.pop(part_path, None)
+        await self._stream_to_file(session, link, part_path)
 
     def _get_output_path(self, track, content_type, content_name):
         filename = self._format_filename(track, content_type)
@@ -235,12 +342,23 @@ class Downloader:
             return f"{track.track_number:02d} - {base}.mp3"
         return f"{base}.mp3"
 
-    async def _embed_metadata(self, buffer, track):
-        buffer.seek(0)
-        audio = MP3(buffer, ID3=ID3)
+    async def _embed_metadata(self, session, path, track):
+        image_data = None
+        if track.image_url:
+            try:
+                # 같은 앨범의 곡들은 한 번 받은 커버를 그대로 공유 (복사 없이 같은 bytes 객체)
+                image_data = await self.cover_cache.get(session, track.image_url)
+            except Exception as e:
+                print(f"Cover art error: {e}")
+        # mutagen 파일 작업은 스레드에서 실행해 다른 곡의 다운로드를 막지 않음
+        await asyncio.to_thread(self._write_tags, path, track, image_data)
+
+    @staticmethod
+    def _write_tags(path, track, image_data):
+        audio = MP3(path, ID3=ID3)
         try:
             audio.add_tags()
-        except:
+        except Exception:
             pass
 
         audio.tags.add(TIT2(encoding=3, text=track.title))
@@ -255,24 +373,24 @@ class Downloader:
         if track.isrc:
             audio.tags.add(TSRC(encoding=3, text=track.isrc))
 
-        if track.image_url:
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(track.image_url) as resp:
-                        image_data = await resp.read()
-                audio.tags.add(APIC(
-                    encoding=3,
-                    mime='image/jpeg',
-                    type=3,
-                    desc='',
-                    data=image_data
-                ))
-            except Exception as e:
-                print(f"Cover art error: {e}")
-
-        buffer.seek(0)
-        audio.save(buffer, v2_version=3)
-        buffer.seek(0)
+        if image_data:
+            audio.tags.add(APIC(
+                encoding=3,
+                mime='image/png' if image_data.startswith(b'\x89PNG') else 'image/jpeg',
+                type=3,
+                desc='',
+                data=image_data
+            ))
+
+        audio.save(path, v2_version=3)
+
+def _parse_content_range(value):
+    """(first byte, total size) from a ``Content-Range`` header; either may be None."""
+    match = CONTENT_RANGE_PATTERN.match(value or '')
+    if not match:
+        return None, None
+    start, total = match.groups()
+    return (int(start) if start else None), (int(total) if total != '*' else None)
 
 async def main():
     parser = argparse.ArgumentParser(description="Download Spotify tracks/albums/playlists")
@@ -284,18 +402,25 @@ async def main():
                        help="Add track numbers for albums/playlists")
     parser.add_argument("--album-folders", action="store_true", 
                        help="Create album subfolders for playlists")
+    parser.add_argument("-j", "--concurrency", type=int, default=4,
+                       help="Number of tracks to download at once (default: 4)")
+    parser.add_argument("--per-host", type=int, default=4,
+                       help="Maximum connections per host (default: 4)")
+    parser.add_argument("--retries", type=int, default=3,
+                       help="Retries per track with exponential backoff (default: 3)")
+    parser.add_argument("--no-resume", action="store_true",
+                       help="Ignore previous progress and partial files")
+    parser.add_argument("--tokens", type=int, default=2,
+                       help="Download session tokens to keep minted ahead of time (default: 2)")
+    parser.add_argument("--cover-size", type=int, default=0,
+                       help="Downscale cover art to at most this many pixels per side (default: keep original)")
     
     args = parser.parse_args()
+    token_manager = SessionTokenPool(get_session_token, size=args.tokens)
 
     try:
-        # Initialize token manager
-        token_manager = TokenManager()
-        token_task = asyncio.create_task(token_manager.start())
-
-        # Wait for initial token
-        while not token_manager.token:
-            print("Waiting for initial token...")
-            await asyncio.sleep(1)
+        # Mint download tokens in the background; the first download waits for the first one
+        token_manager.start()
 
         # Initialize downloader
         downloader = Downloader(
@@ -303,7 +428,12 @@ async def main():
             output_path=args.output,
             filename_format=args.format,
             use_track_numbers=args.track_numbers,
-            use_album_subfolders=args.album_folders
+            use_album_subfolders=args.album_folders,
+            concurrency=args.concurrency,
+            per_host_limit=args.per_host,
+            max_retries=args.retries,
+            resume=not args.no_resume,
+            cover_cache=CoverArtCache(max_size=args.cover_size or None)
         )
 
         # Fetch tracks
@@ -318,8 +448,9 @@ async def main():
     except Exception as e:
         print(f"Fatal error: {e}")
     finally:
-        token_manager.stop()
-        await token_task
+        await token_manager.close()
+        await browser_manager.close()
+        await spotify_client.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
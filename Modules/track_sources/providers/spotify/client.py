@@ -0,0 +1,428 @@
+"""Async Spotify Web API client with a pooled session, cached token and rate limiting."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import aiohttp
+from cachetools import LRUCache
+
+from Modules.track_sources.config import (
+    SPOTIFY_API_BURST,
+    SPOTIFY_API_CONNECTIONS,
+    SPOTIFY_API_MAX_RETRIES,
+    SPOTIFY_API_RATE,
+    SPOTIFY_METADATA_CACHE_PATH,
+    SPOTIFY_METADATA_TTL,
+    SPOTIFY_PLAYLIST_TTL,
+    SPOTIFY_TOKEN_REFRESH_MARGIN,
+)
+from Modules.track_sources.executor import run_extraction
+from Modules.track_sources.providers.spotify.getMetadata import (
+    SpotifyAPIException,
+    album_base_url,
+    auth_url,
+    parse_uri,
+    playlist_base_url,
+    track_base_url,
+    tracks_batch_url,
+)
+
+logger = logging.getLogger(__name__)
+
+# 타입별 트랙 목록 페이지 크기와 /v1/tracks?ids= 한 번에 조회할 수 있는 ID 수 (API 최대값)
+_PAGE_LIMITS = {"playlist": 100, "album": 50}
+_TRACK_BATCH_SIZE = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class TokenBucket:
+    """Token-bucket limiter: ``rate`` requests per second with bursts up to ``capacity``.
+
+    :meth:`pause` empties the bucket and holds every caller until the pause
+    ends, which is how a 429 ``Retry-After`` is honoured for the whole client
+    rather than just the request that received it. Waiting is done with
+    ``asyncio.sleep`` so the event loop keeps running.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0.0
+        self._updated = max(now, self._paused_until)
+
+
+class _ClientCredentialsToken:
+    """Client-credentials access token shared by every request until shortly before it expires."""
+
+    def __init__(self, client_id: Optional[str], client_secret: Optional[str], *, margin: float):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.margin = margin
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+
+    def _valid(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at - self.margin
+
+    async def get(self, session: aiohttp.ClientSession) -> str:
+        if self._valid():
+            return self._token
+        # 만료가 가까우면 한 요청만 새 토큰을 받고 나머지는 그 결과를 기다림
+        async with self._lock:
+            if self._valid():
+                return self._token
+            if not self.client_id or not self.client_secret:
+                raise SpotifyAPIException("SPOTIFY_CLIENT_ID / SPOTIFY_CLIENT_SECRET are not set")
+            async with session.post(
+                auth_url,
+                data={"grant_type": "client_credentials"},
+                auth=aiohttp.BasicAuth(self.client_id, self.client_secret),
+            ) as response:
+                if response.status != 200:
+                    raise SpotifyAPIException(f"Failed to get token: {await response.text()}")
+                payload = await response.json()
+            self._token = payload["access_token"]
+            self._expires_at = time.monotonic() + float(payload.get("expires_in", 3600))
+            self.refreshes += 1
+            return self._token
+
+    def invalidate(self, token: str) -> None:
+        if self._token == token:
+            self._token = None
+
+
+def _retry_after(headers) -> float:
+    try:
+        return max(0.0, float(headers.get("Retry-After", "1")))
+    except ValueError:
+        return 1.0
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: Dict[str, Any]
+    etag: str
+    fetched_at: float
+
+
+class SpotifyResponseCache:
+    """API responses kept in an in-memory LRU in front of an SQLite table.
+
+    Each entry keeps the response's ``ETag`` (or, for assembled collections,
+    the playlist ``snapshot_id``) so stale entries can be revalidated instead
+    of downloaded again. Every method blocks, so call them from an extraction
+    pool.
+    """
+
+    def __init__(self, path: str, maxsize: int = 512):
+        self.path = path
+        self._memory: LRUCache = LRUCache(maxsize)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CachedResponse]:
+        found: Dict[str, CachedResponse] = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                cached = self._memory.get(key)
+                if cached is None:
+                    missing.append(key)
+                else:
+                    found[key] = cached
+            # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for start in range(0, len(missing), 500):
+                chunk = missing[start : start + 500]
+                rows = self.db.execute(
+                    f"SELECT key, body, etag, fetched_at FROM responses WHERE key IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, body, etag, fetched_at in rows:
+                    found[key] = self._memory[key] = CachedResponse(json.loads(body), etag, fetched_at)
+        return found
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, Tuple[Dict[str, Any], str]]) -> None:
+        now = time.time()
+        with self._lock, self.db:
+            for key, (body, etag) in items.items():
+                self._memory[key] = CachedResponse(body, etag, now)
+            self.db.executemany(
+                "INSERT OR REPLACE INTO responses (key, body, etag, fetched_at) VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(body, ensure_ascii=False), etag, now) for key, (body, etag) in items.items()],
+            )
+
+    def put(self, key: str, body: Dict[str, Any], etag: str = "") -> None:
+        self.put_many({key: (body, etag)})
+
+    def touch(self, key: str) -> None:
+        now = time.time()
+        with self._lock, self.db:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory[key] = CachedResponse(cached.body, cached.etag, now)
+            self.db.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (now, key))
+
+
+class SpotifyClient:
+    """The Spotify Web API metadata service for tracks, albums and playlists.
+
+    All requests share one ``aiohttp`` session (and its connection pool),
+    one cached access token and one :class:`TokenBucket`. Track lists are
+    paged by offset: once the first page reports ``total``, the remaining
+    pages are requested concurrently and stitched back together in order.
+
+    Responses go through :class:`SpotifyResponseCache`. Entries younger than
+    their TTL are served without a request; older ones are revalidated with
+    ``If-None-Match``. An assembled album or playlist is reused as long as
+    its top-level object is unchanged (304, or the same ``snapshot_id``), so
+    a repeat load costs one request rather than one per page. Full track
+    objects are fetched in batches of 50 ids and cached one by one.
+    """
+
+    def __init__(
+        self,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        *,
+        rate: float = SPOTIFY_API_RATE,
+        burst: int = SPOTIFY_API_BURST,
+        connections: int = SPOTIFY_API_CONNECTIONS,
+        max_retries: int = SPOTIFY_API_MAX_RETRIES,
+        cache: Optional[SpotifyResponseCache] = None,
+    ):
+        self._token = _ClientCredentialsToken(
+            client_id or os.getenv("SPOTIFY_CLIENT_ID"),
+            client_secret or os.getenv("SPOTIFY_CLIENT_SECRET"),
+            margin=SPOTIFY_TOKEN_REFRESH_MARGIN,
+        )
+        self._bucket = TokenBucket(rate, burst)
+        self.cache = cache or SpotifyResponseCache(SPOTIFY_METADATA_CACHE_PATH)
+        self.connections = connections
+        self.max_retries = max_retries
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.requests = 0
+        self.throttled = 0
+        self.cache_hits = 0
+        self.revalidated = 0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # 이벤트 루프마다 세션이 묶이므로 (CLI의 asyncio.run 등) 루프가 바뀌면 새로 만듦
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connections),
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+            self._loop = loop
+            self._token._lock = asyncio.Lock()
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _request(
+        self, url: str, params: Optional[Dict[str, Any]] = None, *, etag: str = ""
+    ) -> Tuple[int, Optional[Dict[str, Any]], str]:
+        """GET ``url``; returns ``(status, body, etag)`` where status is 200 or 304."""
+
+        session = self.session
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            token = await self._token.get(session)
+            headers = {"Authorization": f"Bearer {token}"}
+            if etag:
+                headers["If-None-Match"] = etag
+            self.requests += 1
+            async with session.get(url, params=params, headers=headers) as response:
+                if response.status == 200:
+                    return 200, await response.json(), response.headers.get("ETag", "")
+                if response.status == 304 and etag:
+                    return 304, None, etag
+                if response.status == 429:
+                    delay = _retry_after(response.headers)
+                    logger.warning("Spotify rate limited; pausing requests for %.1fs", delay)
+                    self.throttled += 1
+                    self._bucket.pause(delay)
+                    continue
+                if response.status == 401 and attempt == 0:
+                    self._token.invalidate(token)
+                    continue
+                if response.status >= 500 and attempt < self.max_retries:
+                    await asyncio.sleep(min(2 ** attempt, 8))
+                    continue
+                raise SpotifyAPIException(f"API error {response.status}: {await response.text()}")
+        raise SpotifyAPIException(f"API request failed after {self.max_retries + 1} attempts: {url}")
+
+    async def _cached_get(self, url: str, *, ttl: float) -> Tuple[Dict[str, Any], bool]:
+        """Cached GET; returns the body and whether it changed since it was last cached."""
+
+        cached = await run_extraction("metadata", self.cache.get, url)
+        if cached is not None and time.time() - cached.fetched_at < ttl:
+            self.cache_hits += 1
+            return cached.body, False
+
+        status, body, etag = await self._request(url, etag=cached.etag if cached else "")
+        if status == 304:
+            self.revalidated += 1
+            await run_extraction("metadata", self.cache.touch, url)
+            return cached.body, False
+        await run_extraction("metadata", self.cache.put, url, body, etag)
+        return body, True
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Uncached GET of an API URL."""
+
+        return (await self._request(url, params))[1]
+
+    async def fetch_all_items(self, url: str, first_page: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+        """All items of a paged list, given its first page; later pages are fetched concurrently."""
+
+        items = list(first_page.get("items") or [])
+        total = first_page.get("total") or 0
+        offsets = range(len(items), total, limit) if items else ()
+        pages = await asyncio.gather(
+            *(self.get_json(url, {"offset": offset, "limit": limit}) for offset in offsets)
+        )
+        for page in pages:
+            items.extend(page.get("items") or [])
+        return items
+
+    async def get_track(self, track_id: str) -> Dict[str, Any]:
+        return (await self._cached_get(track_base_url.format(track_id), ttl=SPOTIFY_METADATA_TTL))[0]
+
+    async def get_tracks(self, track_ids: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """Full track objects for ``track_ids`` in order, looked up 50 ids per request.
+
+        Tracks cached within the TTL are not requested; unknown ids come back as None.
+        """
+
+        keys = {track_id: track_base_url.format(track_id) for track_id in track_ids}
+        cached = await run_extraction("metadata", self.cache.get_many, list(keys.values()))
+        now = time.time()
+        found = {
+            track_id: cached[key].body
+            for track_id, key in keys.items()
+            if key in cached and now - cached[key].fetched_at < SPOTIFY_METADATA_TTL
+        }
+        self.cache_hits += len(found)
+
+        missing = [track_id for track_id in keys if track_id not in found]
+        batches = [missing[start : start + _TRACK_BATCH_SIZE] for start in range(0, len(missing), _TRACK_BATCH_SIZE)]
+        responses = await asyncio.gather(
+            *(self.get_json(tracks_batch_url, {"ids": ",".join(batch)}) for batch in batches)
+        )
+        fetched = {track["id"]: track for response in responses for track in response.get("tracks") or [] if track}
+        if fetched:
+            await run_extraction(
+                "metadata", self.cache.put_many, {keys[track_id]: (track, "") for track_id, track in fetched.items()}
+            )
+        found.update(fetched)
+        return [found.get(track_id) for track_id in track_ids]
+
+    async def _get_collection(self, kind: str, base_url: str, collection_id: str) -> Dict[str, Any]:
+        url = base_url.format(collection_id)
+        collection, changed = await self._cached_get(
+            url, ttl=SPOTIFY_PLAYLIST_TTL if kind == "playlist" else SPOTIFY_METADATA_TTL
+        )
+        # 재생목록은 snapshot_id가 바뀌지 않았다면 전체 트랙 목록을 다시 받을 필요가 없음
+        version = collection.get("snapshot_id") or ""
+        assembled_key = f"{url}#assembled"
+        assembled = await run_extraction("metadata", self.cache.get, assembled_key)
+        if assembled is not None and (not changed or (version and assembled.etag == version)):
+            return assembled.body
+
+        first_page = collection.get("tracks") or {}
+        items = await self.fetch_all_items(f"{url}/tracks", first_page, _PAGE_LIMITS[kind])
+        if kind == "album":
+            # 앨범의 트랙 목록은 ISRC 등이 빠진 간략 객체이므로 50개씩 묶어 전체 정보로 교체
+            full = await self.get_tracks([item["id"] for item in items])
+            items = [track or item for track, item in zip(full, items)]
+        result = {**collection, "tracks": {**first_page, "items": items, "next": None}}
+        await run_extraction("metadata", self.cache.put, assembled_key, result, version)
+        return result
+
+    async def get_album(self, album_id: str) -> Dict[str, Any]:
+        return await self._get_collection("album", album_base_url, album_id)
+
+    async def get_playlist(self, playlist_id: str) -> Dict[str, Any]:
+        return await self._get_collection("playlist", playlist_base_url, playlist_id)
+
+    async def get_raw_spotify_data(self, spotify_url: str) -> Dict[str, Any]:
+        """Same shape as :func:`getMetadata.get_raw_spotify_data`, with every track filled in."""
+
+        url_info = parse_uri(spotify_url)
+        if url_info["type"] == "playlist":
+            return await self.get_playlist(url_info["id"])
+        if url_info["type"] == "album":
+            return await self.get_album(url_info["id"])
+        return await self.get_track(url_info["id"])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "token_refreshes": self._token.refreshes,
+            "cache_hits": self.cache_hits,
+            "revalidated": self.revalidated,
+        }
+
+
+spotify_client = SpotifyClient()
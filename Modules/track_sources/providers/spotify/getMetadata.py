@@ -1,20 +1,14 @@
+# Spotify 메타데이터 조회의 단일 진입점: URL 파싱과 응답 정리는 여기서, 요청/토큰/캐시는 client.SpotifyClient가 담당
 from urllib.parse import urlparse, parse_qs
-import requests
-import json
-import os
-import base64
 from dotenv import load_dotenv
-import aiohttp
 
 load_dotenv()
 
-client_id = os.getenv('SPOTIFY_CLIENT_ID')
-client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
-
 auth_url = 'https://accounts.spotify.com/api/token'
 playlist_base_url = 'https://api.spotify.com/v1/playlists/{}'
 album_base_url = 'https://api.spotify.com/v1/albums/{}'
 track_base_url = 'https://api.spotify.com/v1/tracks/{}'
+tracks_batch_url = 'https://api.spotify.com/v1/tracks'
 
 class SpotifyInvalidUrlException(Exception):
     pass
@@ -22,17 +16,6 @@ class SpotifyInvalidUrlException(Exception):
 class SpotifyAPIException(Exception):
     pass
 
-def get_access_token():
-    auth_header = base64.b64encode(f'{client_id}:{client_secret}'.encode()).decode()
-    headers = {
-        'Authorization': f'Basic {auth_header}',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-    response = requests.post(auth_url, headers=headers, data={'grant_type': 'client_credentials'})
-    if response.status_code != 200:
-        raise SpotifyAPIException(f"Failed to get token: {response.text}")
-    return response.json()['access_token']
-
 def parse_uri(uri):
     u = urlparse(uri)
     if u.netloc == "embed.spotify.com":
@@ -51,50 +34,12 @@ def parse_uri(uri):
         return {"type": parts[-2], "id": parts[-1]}
     raise SpotifyInvalidUrlException(f"Unsupported URL structure: {uri}")
 
-def fetch_all_items(url, access_token):
-    items = []
-    while url:
-        response = requests.get(url, headers={'Authorization': f'Bearer {access_token}'})
-        if response.status_code != 200:
-            raise SpotifyAPIException(f"API error: {response.text}")
-        data = response.json()
-        items.extend(data['items'])
-        url = data.get('next')
-    return items
-
-def get_raw_spotify_data(spotify_url):
-    try:
-        url_info = parse_uri(spotify_url)
-        access_token = get_access_token()
-    except Exception as e:
-        return {"error": str(e)}
+async def get_raw_spotify_data_async(spotify_url):
+    # 공유 세션/캐시된 토큰/동시 페이지 요청을 쓰는 비동기 클라이언트 (순환 import 방지를 위해 지연 import)
+    from Modules.track_sources.providers.spotify.client import spotify_client
 
     try:
-        if url_info['type'] == "playlist":
-            playlist = requests.get(
-                f'{playlist_base_url.format(url_info["id"])}',
-                headers={'Authorization': f'Bearer {access_token}'}
-            ).json()
-            playlist['tracks']['items'] = fetch_all_items(
-                f'{playlist_base_url.format(url_info["id"])}/tracks?limit=100',
-                access_token
-            )
-            return playlist
-        elif url_info['type'] == "album":
-            album = requests.get(
-                f'{album_base_url.format(url_info["id"])}',
-                headers={'Authorization': f'Bearer {access_token}'}
-            ).json()
-            album['tracks']['items'] = fetch_all_items(
-                f'{album_base_url.format(url_info["id"])}/tracks?limit=50',
-                access_token
-            )
-            return album
-        elif url_info['type'] == "track":
-            return requests.get(
-                f'{track_base_url.format(url_info["id"])}',
-                headers={'Authorization': f'Bearer {access_token}'}
-            ).json()
+        return await spotify_client.get_raw_spotify_data(spotify_url)
     except Exception as e:
         return {"error": str(e)}
 
@@ -160,9 +105,9 @@ def format_playlist_data(data):
         ]
     }
 
-def get_filtered_data(spotify_url):
-    raw_data = get_raw_spotify_data(spotify_url)
+async def get_filtered_data_async(spotify_url):
+    raw_data = await get_raw_spotify_data_async(spotify_url)
     if 'error' in raw_data:
         return raw_data
     url_info = parse_uri(spotify_url)
-    return format_data(raw_data, url_info['type'])
\ No newline at end of file
+    return format_data(raw_data, url_info['type'])
@@ -1,9 +1,13 @@
 import asyncio
-import zendriver as zd
-from zendriver import Config
+import json
 from typing import Optional
 import random
 
+from Modules.track_sources.providers.spotify.browser import browser_manager
+
+SITE_URL = "https://spotidownloader.com/"
+SESSION_API = "api.spotidownloader.com/session"
+
 async def get_turnstile_token(page, max_attempts=20, check_interval=0.5) -> Optional[str]:
     attempts = 0
     while attempts < max_attempts:
@@ -16,77 +20,73 @@ async def get_turnstile_token(page, max_attempts=20, check_interval=0.5) -> Opti
         attempts += 1
     return None
 
-async def get_session_token(max_wait: int = 30) -> Optional[str]:
-    browser = await zd.start(headless=False, #config=config,
-                            # no_sandbox=True,
-                            browser_executable_path="/usr/bin/google-chrome",
-                            options={
-                                    "disable_dev_shm_usage": True,
-                                    "args": ["--display=:99"]
-                                   }
-                            )
+async def get_session_token(max_wait: int = 30, manager=None, site_url: str = SITE_URL,
+                            session_api: str = SESSION_API) -> Optional[str]:
+    # 브라우저를 매번 띄우지 않고 공유 브라우저의 탭을 빌려 씀 (사이트를 새로 열어 새 토큰을 받음)
+    manager = manager or browser_manager
     try:
-        page = await browser.get("https://spotidownloader.com/")
-        await asyncio.sleep(random.uniform(0.3, 1.2))  # Random sleep to avoid detection
-        
-        await page.evaluate("""
-            const event = new MouseEvent('mousemove', {
-                bubbles: true,
-                clientX: 200,
-                clientY: 300
-            });
-            document.dispatchEvent(event);
-        """)
-        
-        
-        # Inject fetch interceptor
-        await page.evaluate("""
-            window.originalFetch = window.fetch;
-            window.sessionToken = null;
-            
-            window.fetch = function() {
-                const fetchArgs = arguments;
-                return new Promise((resolve, reject) => {
-                    window.originalFetch.apply(this, fetchArgs)
-                        .then(async response => {
-                            if (response.url.includes('api.spotidownloader.com/session')) {
-                                try {
-                                    const clonedResponse = response.clone();
-                                    const responseData = await clonedResponse.json();
-                                    if (responseData?.token) {
-                                        window.sessionToken = responseData.token;
-                                    }
-                                } catch (e) {}
-                            }
-                            resolve(response);
-                        })
-                        .catch(reject);
-                });
-            };
-        """)
-        
-        # Solve Cloudflare challenge
-        turnstile_token = await get_turnstile_token(page)
-        if not turnstile_token:
-            return None
-        
-        # Click download button
-        await page.evaluate("""
-            document.querySelector("button.flex.justify-center.items-center.bg-button")?.click();
-        """)
-        
-        # Wait for token
-        for _ in range(max_wait * 2):
-            token = await page.evaluate("window.sessionToken")
-            if token:
-                print(f"Token : {token}")
-                return token
-            await asyncio.sleep(0.5)
-        
-        return None
-        
+        async with manager.page(site_url) as page:
+            return await _mint_token(page, max_wait, session_api)
     except Exception as e:
         print(f"Token fetch error: {e}")
         return None
-    finally:
-        await browser.stop()
\ No newline at end of file
+
+async def _mint_token(page, max_wait: int, session_api: str) -> Optional[str]:
+    await asyncio.sleep(random.uniform(0.3, 1.2))  # Random sleep to avoid detection
+    
+    await page.evaluate("""
+        const event = new MouseEvent('mousemove', {
+            bubbles: true,
+            clientX: 200,
+            clientY: 300
+        });
+        document.dispatchEvent(event);
+    """)
+    
+    
+    # Inject fetch interceptor
+    await page.evaluate("""
+        window.sessionApi = %s;
+        window.originalFetch = window.fetch;
+        window.sessionToken = null;
+        
+        window.fetch = function() {
+            const fetchArgs = arguments;
+            return new Promise((resolve, reject) => {
+                window.originalFetch.apply(this, fetchArgs)
+                    .then(async response => {
+                        if (response.url.includes(window.sessionApi)) {
+                            try {
+                                const clonedResponse = response.clone();
+                                const responseData = await clonedResponse.json();
+                                if (responseData?.token) {
+                                    window.sessionToken = responseData.token;
+                                }
+                            } catch (e) {}
+                        }
+                        resolve(response);
+                    })
+                    .catch(reject);
+            });
+        };
+    """ % json.dumps(session_api))
+    
+    # Solve Cloudflare challenge
+    turnstile_token = await get_turnstile_token(page)
+    if not turnstile_token:
+        return None
+    
+    # Click download button
+    await page.evaluate("""
+        document.querySelector("button.flex.justify-center.items-center.bg-button")?.click();
+    """)
+    
+    # Wait for token
+    for _ in range(max_wait * 2):
+        token = await page.evaluate("window.sessionToken")
+        if token:
+            print(f"Token : {token}")
+            return token
+        await asyncio.sleep(0.5)
+    
+    return None
@@ -1,5 +1,6 @@
 import asyncio
-import zendriver as zd
+
+from Modules.track_sources.providers.spotify.browser import browser_manager
 
 async def get_token(page, max_attempts=20, check_interval=0.5):
     attempts = 0
@@ -13,21 +14,10 @@ async def get_token(page, max_attempts=20, check_interval=0.5):
         attempts += 1
     raise TimeoutError()
 
-async def fetch_token():
-    browser = await zd.start(
-    headless=False,
-    no_sandbox=True,
-    browser_executable_path="/usr/bin/google-chrome",
-    options={
-        "disable_dev_shm_usage": True,
-        "args": ["--display=:99"]
-    }
-)
-    try:
-        page = await browser.get("https://spotidownloader.com/")
+async def fetch_token(manager=None):
+    # 공유 브라우저의 탭을 빌려 씀
+    async with (manager or browser_manager).page("https://spotidownloader.com/") as page:
         return await get_token(page)
-    finally:
-        await browser.stop()
 
 async def main():
     try:
@@ -37,6 +27,8 @@ async def main():
     except Exception as e:
         print(e)
         return None
+    finally:
+        await browser_manager.close()
 
 if __name__ == "__main__":
     token = asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,308 @@
+"""Match Spotify tracks to playable YouTube/SoundCloud search results."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from Modules.track_sources.base import TrackQuery
+from Modules.track_sources.cache import extraction_cache
+from Modules.track_sources.config import (
+    SPOTIFY_MATCH_CACHE_PATH,
+    SPOTIFY_MATCH_CANDIDATES,
+    SPOTIFY_MATCH_DURATION_TOLERANCE,
+    SPOTIFY_MATCH_MIN_SCORE,
+    SPOTIFY_MATCH_PROVIDERS,
+)
+from Modules.track_sources.executor import run_extraction
+from Modules.track_sources.utils.ytdl import extract_info
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    spotify_id TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    duration REAL NOT NULL,
+    score REAL NOT NULL,
+    matched_at REAL NOT NULL
+);
+"""
+
+# 제목 뒤에 붙는 "(Official Video)", "[MV]" 같은 꼬리표
+_DECORATION = re.compile(
+    r"[\(\[][^\)\]]*\b(official|lyrics?|audio|video|mv|m/v|visuali[sz]er|hd|hq|4k|remaster(ed)?)\b[^\)\]]*[\)\]]",
+    re.IGNORECASE,
+)
+_FEATURING = re.compile(r"\b(feat|ft|featuring)\b\.?", re.IGNORECASE)
+# 원곡이 아닌 버전을 나타내는 단어; 원곡 제목에 없는데 후보에 있으면 감점
+_VARIANT_WORDS = (
+    "live", "cover", "remix", "karaoke", "instrumental", "inst", "acoustic",
+    "sped", "slowed", "nightcore", "reverb", "8d", "piano", "tutorial", "reaction",
+)
+
+
+@dataclass(frozen=True)
+class SpotifyTrack:
+    """The parts of a Spotify track object used for matching."""
+
+    id: str
+    title: str
+    artists: Tuple[str, ...]
+    duration: float = 0
+    isrc: str = ""
+
+    @property
+    def url(self) -> str:
+        return f"https://open.spotify.com/track/{self.id}"
+
+    @property
+    def display_title(self) -> str:
+        return f"{', '.join(self.artists)} - {self.title}" if self.artists else self.title
+
+    @classmethod
+    def from_api(cls, data: Optional[Dict[str, Any]]) -> Optional["SpotifyTrack"]:
+        """Build from a track object or a playlist item; None for local files and removed tracks."""
+
+        # 재생목록 항목은 {"track": {...}}로 감싸져 있음 (트랙 객체 자체의 "track" 필드는 bool)
+        if data and "track" in data and not isinstance(data["track"], bool):
+            data = data["track"]
+        if not data or not data.get("id") or data.get("type", "track") != "track":
+            return None
+        return cls(
+            id=data["id"],
+            title=data.get("name") or "Unknown",
+            artists=tuple(artist["name"] for artist in data.get("artists") or [] if artist.get("name")),
+            duration=(data.get("duration_ms") or 0) / 1000,
+            isrc=(data.get("external_ids") or {}).get("isrc") or "",
+        )
+
+
+@dataclass(frozen=True)
+class TrackMatch:
+    provider: str
+    url: str
+    title: str
+    duration: float
+    score: float
+
+
+def _normalize(text: str) -> str:
+    text = _DECORATION.sub(" ", text or "")
+    text = _FEATURING.sub(" ", text)
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def _coverage(needle: set, haystack: set) -> float:
+    return len(needle & haystack) / len(needle) if needle else 0.0
+
+
+def score_candidate(
+    track: SpotifyTrack,
+    entry: Dict[str, Any],
+    *,
+    tolerance: float = SPOTIFY_MATCH_DURATION_TOLERANCE,
+) -> float:
+    """Score a search result against ``track`` from 0 (unrelated) to 1.
+
+    A matching ISRC is taken as proof. Otherwise title and artist similarity
+    are combined with how close the durations are; results far longer or
+    shorter than the track (compilations, loops, previews) are rejected, and
+    live/cover/remix style variants the original title does not mention are
+    penalised.
+    """
+
+    if track.isrc:
+        isrc = track.isrc.upper()
+        if (entry.get("isrc") or "").upper() == isrc or isrc in (entry.get("description") or "").upper():
+            return 1.0
+
+    duration = entry.get("duration") or 0
+    if track.duration and duration:
+        difference = abs(track.duration - duration)
+        # 뮤직비디오는 인트로/아웃트로 때문에 꽤 길 수 있으므로 곡 길이의 절반까지는 감점만 함
+        if difference > max(tolerance * 6, track.duration / 2):
+            return 0.0
+        duration_score = 1.0 if difference <= tolerance else max(0.0, 1.0 - (difference - tolerance) / (tolerance * 5))
+    else:
+        duration_score = 0.5
+
+    title = _normalize(track.title)
+    candidate_title = _normalize(entry.get("title") or "")
+    uploader = _normalize(entry.get("channel") or entry.get("uploader") or "")
+    candidate_words = set(candidate_title.split()) | set(uploader.split())
+
+    title_score = max(
+        SequenceMatcher(None, title, candidate_title).ratio(),
+        _coverage(set(title.split()), candidate_words),
+    )
+    artist_score = _coverage(set(_normalize(" ".join(track.artists)).split()), candidate_words) if track.artists else 0.5
+
+    title_words = set(title.split())
+    penalty = 0.3 * sum(1 for word in _VARIANT_WORDS if word in candidate_words and word not in title_words)
+    return max(0.0, 0.45 * title_score + 0.3 * artist_score + 0.25 * duration_score - penalty)
+
+
+class SpotifyMatchCache:
+    """SQLite table of Spotify track id -> chosen search result.
+
+    Every method blocks, so call them from an extraction pool.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def get_many(self, spotify_ids: Iterable[str]) -> Dict[str, TrackMatch]:
+        spotify_ids = list(spotify_ids)
+        found: Dict[str, TrackMatch] = {}
+        with self._lock:
+            # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for start in range(0, len(spotify_ids), 500):
+                chunk = spotify_ids[start : start + 500]
+                rows = self.db.execute(
+                    "SELECT spotify_id, provider, url, title, duration, score FROM matches"
+                    f" WHERE spotify_id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for spotify_id, *fields in rows:
+                    found[spotify_id] = TrackMatch(*fields)
+        return found
+
+    def get(self, spotify_id: str) -> Optional[TrackMatch]:
+        return self.get_many([spotify_id]).get(spotify_id)
+
+    def put(self, spotify_id: str, match: TrackMatch) -> None:
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (spotify_id, match.provider, match.url, match.title, match.duration, match.score, time.time()),
+            )
+
+    def forget(self, spotify_id: str) -> None:
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM matches WHERE spotify_id = ?", (spotify_id,))
+
+
+class SpotifyMatcher:
+    """Finds a playable search result for each Spotify track, once.
+
+    Searches run through the shared extraction cache and pools, in
+    ``providers`` order, and stop at the first result scoring at least
+    ``min_score``. Chosen matches are persisted in :class:`SpotifyMatchCache`,
+    so a playlist queued again (or by another guild) skips the searches, and
+    concurrent lookups of the same track share one search.
+    """
+
+    def __init__(
+        self,
+        cache: SpotifyMatchCache,
+        *,
+        providers: Sequence[str] = SPOTIFY_MATCH_PROVIDERS,
+        candidates: int = SPOTIFY_MATCH_CANDIDATES,
+        min_score: float = SPOTIFY_MATCH_MIN_SCORE,
+    ):
+        self.cache = cache
+        self.providers = tuple(providers)
+        self.candidates = candidates
+        self.min_score = min_score
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.searches = 0
+        self.failures = 0
+
+    async def cached(self, tracks: Iterable[SpotifyTrack]) -> Dict[str, TrackMatch]:
+        """Look up many tracks in the persistent cache with a single query."""
+
+        ids = [track.id for track in tracks]
+        found = await run_extraction("metadata", self.cache.get_many, ids) if ids else {}
+        self.hits += len(found)
+        return found
+
+    async def match(self, track: SpotifyTrack) -> TrackMatch:
+        task = self._inflight.get(track.id)
+        if task is None:
+            task = asyncio.ensure_future(self._match(track))
+            self._inflight[track.id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(track.id, None))
+        return await asyncio.shield(task)
+
+    async def forget(self, track: SpotifyTrack) -> None:
+        await run_extraction("metadata", self.cache.forget, track.id)
+
+    async def _match(self, track: SpotifyTrack) -> TrackMatch:
+        cached = await run_extraction("metadata", self.cache.get, track.id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        best: Optional[TrackMatch] = None
+        for provider, search in self._searches(track):
+            try:
+                entries = await self._search(provider, search)
+            except Exception as exc:
+                logger.warning("Spotify match search %r failed: %s", search, exc)
+                continue
+            for entry in entries:
+                url = entry.get("webpage_url") or entry.get("url")
+                if not url:
+                    continue
+                score = score_candidate(track, entry)
+                if best is None or score > best.score:
+                    best = TrackMatch(provider, url, entry.get("title") or track.title, entry.get("duration") or 0, score)
+            if best is not None and best.score >= self.min_score:
+                break
+
+        if best is None or best.score < self.min_score:
+            self.failures += 1
+            raise ValueError(f"Spotify 곡과 일치하는 음원을 찾지 못했습니다: {track.display_title}")
+
+        logger.debug("Matched %s -> %s (%.2f)", track.display_title, best.url, best.score)
+        await run_extraction("metadata", self.cache.put, track.id, best)
+        return best
+
+    def _searches(self, track: SpotifyTrack) -> List[Tuple[str, str]]:
+        artist = track.artists[0] if track.artists else ""
+        searches = []
+        for provider in self.providers:
+            if provider == "youtube":
+                searches.append((provider, f"ytsearch{self.candidates}:{artist} - {track.title}"))
+                if track.isrc:
+                    # YouTube Music 자동 생성 영상은 설명에 ISRC가 들어 있음
+                    searches.append((provider, f'ytsearch{self.candidates}:"{track.isrc}"'))
+            elif provider == "soundcloud":
+                searches.append((provider, f"scsearch{self.candidates}:{artist} {track.title}"))
+        return searches
+
+    async def _search(self, provider: str, search: str) -> List[Dict[str, Any]]:
+        self.searches += 1
+        data = await extraction_cache.get_or_extract(
+            f"{provider}:search", TrackQuery(search), lambda: extract_info(provider, search)
+        )
+        return [entry for entry in (data or {}).get("entries") or [] if entry]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "searches": self.searches, "failures": self.failures}
+
+
+spotify_matcher = SpotifyMatcher(SpotifyMatchCache(SPOTIFY_MATCH_CACHE_PATH))
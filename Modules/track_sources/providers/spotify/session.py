@@ -0,0 +1,140 @@
+"""Long-lived Spotify login and scratch space shared by deezspot downloads."""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from typing import Any, Callable, Optional, TypeVar
+
+from Modules.track_sources.config import SPOTIFY_SCRATCH_DIR, SPOTIFY_SESSION_MAX_AGE
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 인증 만료/끊김으로 보이는 오류 메시지 (deezspot/librespot이 예외 타입을 통일하지 않음)
+_AUTH_ERROR_HINTS = ("auth", "401", "token", "credential", "login", "session", "bad_credentials")
+
+
+class SpotifyDownloadError(Exception):
+    pass
+
+
+def find_credentials_file() -> str:
+    possible_paths = [
+        os.getenv("SPOTIFY_CREDENTIALS_PATH"),
+        "/app/credentials.json",
+        "/home/pi/charlotte/credentials.json",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "credentials.json"),
+    ]
+    for path in possible_paths:
+        if path and os.path.exists(path):
+            return path
+    raise SpotifyDownloadError("Spotify credentials.json 경로를 찾을 수 없습니다")
+
+
+def is_auth_error(exc: BaseException) -> bool:
+    text = f"{type(exc).__name__} {exc}".lower()
+    return any(hint in text for hint in _AUTH_ERROR_HINTS)
+
+
+class SpotifyDownloadSession:
+    """Logs in once and hands the login and a scratch directory to every download.
+
+    ``login(credentials_path)`` runs lazily on first use and again when the
+    login is older than ``max_age``, fails ``is_valid``, or a download fails
+    with what looks like an authentication error (that download is retried
+    once on the fresh login). The credentials file is located once. Each
+    worker thread gets its own subdirectory of a single scratch directory,
+    reused for every track instead of a new temp dir per download.
+    """
+
+    def __init__(
+        self,
+        login: Callable[[str], Any],
+        *,
+        is_valid: Optional[Callable[[Any], bool]] = None,
+        max_age: float = SPOTIFY_SESSION_MAX_AGE,
+        scratch_dir: Optional[str] = SPOTIFY_SCRATCH_DIR,
+    ):
+        self._login_factory = login
+        self._is_valid = is_valid
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._login: Any = None
+        self._logged_in_at = 0.0
+        self._credentials_path: Optional[str] = None
+        self._scratch_root = scratch_dir
+        self._local = threading.local()
+        self.logins = 0
+        self.relogins = 0
+
+    @property
+    def scratch_root(self) -> str:
+        if self._scratch_root is None:
+            self._scratch_root = tempfile.mkdtemp(prefix="spotify-scratch-")
+            weakref.finalize(self, shutil.rmtree, self._scratch_root, True)
+        return self._scratch_root
+
+    def scratch_dir(self) -> str:
+        """This thread's reusable download directory."""
+
+        path = getattr(self._local, "scratch", None)
+        if path is None or not os.path.isdir(path):
+            path = os.path.join(self.scratch_root, f"worker-{threading.get_ident()}")
+            os.makedirs(path, exist_ok=True)
+            self._local.scratch = path
+        return path
+
+    def _healthy(self) -> bool:
+        if self._login is None or time.monotonic() - self._logged_in_at > self.max_age:
+            return False
+        if self._is_valid is None:
+            return True
+        try:
+            return bool(self._is_valid(self._login))
+        except Exception:
+            return False
+
+    def login(self) -> Any:
+        """The current login, logging in first if there is none or it is unhealthy."""
+
+        with self._lock:
+            if not self._healthy():
+                if self._credentials_path is None:
+                    self._credentials_path = find_credentials_file()
+                if self._login is not None:
+                    logger.info("Spotify download session expired or unhealthy; logging in again")
+                started = time.perf_counter()
+                self._login = self._login_factory(self._credentials_path)
+                self._logged_in_at = time.monotonic()
+                self.logins += 1
+                logger.info("Spotify download session ready in %.2fs", time.perf_counter() - started)
+            return self._login
+
+    def run(self, download: Callable[[Any, str], T]) -> T:
+        """Call ``download(login, scratch_dir)``, logging in again once on an auth failure."""
+
+        login = self.login()
+        try:
+            return download(login, self.scratch_dir())
+        except SpotifyDownloadError:
+            raise
+        except Exception as exc:
+            if not is_auth_error(exc):
+                raise
+            logger.warning("Spotify download auth failure (%s); logging in again", exc)
+            self.relogins += 1
+            with self._lock:
+                # 다른 스레드가 이미 새로 로그인했다면 그 세션을 그대로 사용
+                if self._login is login:
+                    self._login = None
+        return download(self.login(), self.scratch_dir())
+
+    def stats(self) -> dict:
+        return {"logins": self.logins, "relogins": self.relogins}
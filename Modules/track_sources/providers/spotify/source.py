@@ -2,18 +2,34 @@
 
 from __future__ import annotations
 
+import os
+
 import discord
 
-from Modules.track_sources.base import BaseTrackSource, TrackQuery
-from Modules.track_sources.providers.memory import MemoryAudioSource
-from Modules.track_sources.providers.spotify.utils import (
-    SpotifyDownloadError,
-    download_spotify_to_buffer,
-)
+from Modules.track_sources.base import BaseTrackSource, PendingTrack, TrackQuery
+from Modules.track_sources.disk_cache import audio_cache
+from Modules.track_sources.providers.file import CachedFileAudioSource, FileAudioSource
+from Modules.track_sources.providers.soundcloud import SoundCloudSource
+from Modules.track_sources.providers.spotify.client import spotify_client
 from Modules.track_sources.providers.spotify.getMetadata import (
+    SpotifyAPIException,
     SpotifyInvalidUrlException,
     parse_uri,
 )
+from Modules.track_sources.providers.spotify.matcher import SpotifyTrack, spotify_matcher
+from Modules.track_sources.providers.youtube import YouTubeUrlSource
+
+# 단일 트랙 직접 다운로드는 deezspot이 있을 때만 사용하고, 없으면 검색 매칭으로 재생
+try:
+    from Modules.track_sources.providers.spotify.utils import (
+        SpotifyDownloadError,
+        download_spotify_cached,
+        download_spotify_to_file,
+    )
+except ImportError:
+    SpotifyDownloadError = download_spotify_cached = download_spotify_to_file = None
+
+_MATCH_SOURCES = {"youtube": YouTubeUrlSource, "soundcloud": SoundCloudSource}
 
 
 class SpotifySource(BaseTrackSource):
@@ -26,7 +42,7 @@ class SpotifySource(BaseTrackSource):
         return "spotify.com/" in normalized or normalized.startswith("spotify:")
 
     @classmethod
-    async def create_tracks(cls, query: TrackQuery) -> list[discord.AudioSource]:
+    async def create_tracks(cls, query: TrackQuery) -> list[PendingTrack]:
         try:
             url_info = parse_uri(query.raw)
         except SpotifyInvalidUrlException as exc:
@@ -34,10 +50,91 @@ class SpotifySource(BaseTrackSource):
 
         if url_info["type"] not in {"track", "album", "playlist"}:
             raise ValueError("지원되지 않는 Spotify URL 입니다")
+        if url_info["type"] != "track" or download_spotify_to_file is None:
+            return await cls._matched_tracks(query)
 
         try:
-            buffer, metadata = await download_spotify_to_buffer(query.raw)
+            if audio_cache is not None:
+                cached = await download_spotify_cached(query.raw)
+                metadata, data = cached.metadata, {"cached": cached}
+            else:
+                audio_file, metadata = await download_spotify_to_file(query.raw)
+                data = {"file": audio_file, "metadata": metadata}
         except SpotifyDownloadError as exc:
             raise ValueError(f"Spotify 트랙 다운로드 실패: {exc}") from exc
 
-        return [MemoryAudioSource(buffer, metadata)]
+        track = PendingTrack(
+            title=metadata["title"],
+            webpage_url=query.raw,
+            duration=(metadata.get("duration") or 0) / 1000,
+            loader=cls._load_source,
+            data=data,
+        )
+        return [track]
+
+    @classmethod
+    async def _load_source(cls, track: PendingTrack) -> discord.AudioSource:
+        cached = track.data.get("cached")
+        if cached is None:
+            return await FileAudioSource.shared(track.data["file"], track.data["metadata"])
+        if not os.path.exists(cached.path):
+            # 대기하는 동안 캐시에서 밀려났다면 다시 받아옴
+            cached = track.data["cached"] = await download_spotify_cached(track.webpage_url)
+        return CachedFileAudioSource.shared(cached)
+
+    @classmethod
+    async def _matched_tracks(cls, query: TrackQuery) -> list[PendingTrack]:
+        """Queue album/playlist tracks that are matched to a search result only when needed.
+
+        The Spotify metadata arrives up front, but each track is searched
+        for by its resolver, so playback starts after the first match.
+        Matches already in the persistent cache are filled in with one query.
+        """
+
+        try:
+            raw = await spotify_client.get_raw_spotify_data(query.raw)
+        except SpotifyAPIException as exc:
+            raise ValueError(f"Spotify 정보를 가져오지 못했습니다: {exc}") from exc
+
+        items = raw.get("tracks", {}).get("items") if "tracks" in raw else [raw]
+        spotify_tracks = [track for track in map(SpotifyTrack.from_api, items or []) if track]
+        matches = await spotify_matcher.cached(spotify_tracks)
+        return [
+            PendingTrack(
+                title=track.display_title,
+                webpage_url=track.url,
+                duration=track.duration,
+                loader=cls._load_matched,
+                resolver=cls._resolve_match,
+                data={"spotify": track, "match": matches.get(track.id)},
+            )
+            for track in spotify_tracks
+        ]
+
+    @classmethod
+    async def _resolve_match(cls, track: PendingTrack) -> None:
+        spotify: SpotifyTrack = track.data["spotify"]
+        cached = track.data.get("match")
+        match = cached or await spotify_matcher.match(spotify)
+        try:
+            inner = await cls._matched_source(match)
+        except Exception:
+            if cached is None:
+                raise
+            # 캐시된 영상이 삭제/비공개된 경우 한 번만 다시 검색
+            await spotify_matcher.forget(spotify)
+            match = await spotify_matcher.match(spotify)
+            inner = await cls._matched_source(match)
+        track.data = {**track.data, "match": match, "inner": inner}
+
+    @staticmethod
+    async def _matched_source(match) -> PendingTrack:
+        found = await _MATCH_SOURCES[match.provider].create_tracks(TrackQuery(match.url))
+        if not found:
+            raise ValueError(f"매칭된 음원을 불러오지 못했습니다: {match.url}")
+        await found[0].resolve()
+        return found[0]
+
+    @classmethod
+    async def _load_matched(cls, track: PendingTrack) -> discord.AudioSource:
+        return await track.data["inner"].create_source()
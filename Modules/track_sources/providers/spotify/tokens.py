@@ -0,0 +1,131 @@
+"""Pool of pre-minted download session tokens, refreshed in the background."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SessionTokenPool:
+    """Keeps ``size`` session tokens minted ahead of time.
+
+    Minting a token (``mint()``, e.g. :func:`getToken.get_session_token`)
+    launches a browser, so it runs in a background task rather than in the
+    download path. Tokens are reused for every request until they are
+    ``refresh_margin`` seconds from ``max_age``; then a replacement is minted
+    before the old one is dropped, so :meth:`get` only waits when the pool
+    is empty (at startup or after every token was rejected). Requests are
+    spread round-robin over the pooled tokens.
+    """
+
+    def __init__(
+        self,
+        mint: Callable[[], Awaitable[Optional[str]]],
+        *,
+        size: int = 2,
+        max_age: float = 45 * 60,
+        refresh_margin: float = 5 * 60,
+        retry_delay: float = 30,
+    ):
+        self._mint = mint
+        self.size = max(1, size)
+        self.max_age = max_age
+        self.refresh_margin = min(refresh_margin, max_age / 2)
+        self.retry_delay = retry_delay
+        self._tokens: List[Tuple[str, float]] = []
+        self._next = 0
+        self._available: Optional[asyncio.Condition] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.minted = 0
+        self.failures = 0
+        self.invalidated = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._available = asyncio.Condition()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _prune(self) -> List[Tuple[str, float]]:
+        now = time.monotonic()
+        self._tokens = [(token, minted_at) for token, minted_at in self._tokens if now - minted_at < self.max_age]
+        return self._tokens
+
+    def _refresh_due_in(self) -> float:
+        if len(self._prune()) < self.size:
+            return 0.0
+        oldest = min(minted_at for _, minted_at in self._tokens)
+        return oldest + self.max_age - self.refresh_margin - time.monotonic()
+
+    async def get(self) -> str:
+        """A valid token, waiting for the first one to be minted if necessary."""
+
+        self.start()
+        async with self._available:
+            await self._available.wait_for(self._prune)
+            self._next = (self._next + 1) % len(self._tokens)
+            return self._tokens[self._next][0]
+
+    def invalidate(self, token: str) -> None:
+        """Drop a token the server rejected and mint a replacement."""
+
+        before = len(self._tokens)
+        self._tokens = [entry for entry in self._tokens if entry[0] != token]
+        if len(self._tokens) != before:
+            self.invalidated += 1
+            logger.info("Download token rejected; %d left in pool", len(self._tokens))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            due_in = self._refresh_due_in()
+            if due_in > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), due_in)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            started = time.perf_counter()
+            try:
+                token = await self._mint()
+            except Exception as exc:
+                logger.warning("Download token mint failed: %s", exc)
+                token = None
+            if not token:
+                self.failures += 1
+                await asyncio.sleep(self.retry_delay)
+                continue
+
+            self.minted += 1
+            logger.info("Minted download token in %.1fs", time.perf_counter() - started)
+            async with self._available:
+                self._tokens.append((token, time.monotonic()))
+                # 가득 찬 상태에서 갱신한 경우 가장 오래된 토큰을 내보냄
+                self._tokens.sort(key=lambda entry: entry[1])
+                del self._tokens[: max(0, len(self._tokens) - self.size)]
+                self._available.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "pooled": len(self._prune()),
+            "minted": self.minted,
+            "failures": self.failures,
+            "invalidated": self.invalidated,
+        }
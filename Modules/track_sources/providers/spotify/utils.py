@@ -1,16 +1,22 @@
-"""Helpers responsible for downloading Spotify audio into memory."""
+"""Helpers responsible for downloading Spotify audio to disk."""
 
 from __future__ import annotations
 
 import asyncio
-import io
 import os
+import shutil
 import tempfile
 import traceback
 from typing import Dict, Tuple
 
 from dotenv import load_dotenv
 
+from Modules.track_sources.disk_cache import CachedAudio, audio_cache
+from Modules.track_sources.executor import run_extraction
+from Modules.track_sources.providers.file import AudioFile
+from Modules.track_sources.providers.spotify.getMetadata import parse_uri
+from Modules.track_sources.providers.spotify.session import SpotifyDownloadError, SpotifyDownloadSession
+
 from deezspot.libutils.utils import get_ids, link_is_valid
 from deezspot.models.download.preferences import Preferences
 from deezspot.spotloader.__download__ import DW_TRACK
@@ -21,84 +27,71 @@ from deezspot.spotloader.__spo_api__ import tracking
 load_dotenv()
 
 
-class SpotifyDownloadError(Exception):
-    pass
-
-
-def _find_credentials_file() -> str:
-    possible_paths = [
-        os.getenv("SPOTIFY_CREDENTIALS_PATH"),
-        "/app/credentials.json",
-        "/home/pi/charlotte/credentials.json",
-        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "credentials.json"),
-    ]
-    for path in possible_paths:
-        if path and os.path.exists(path):
-            return path
-    raise SpotifyDownloadError("Spotify credentials.json 경로를 찾을 수 없습니다")
+def _deezspot_login(credentials_path: str) -> SpoLogin:
+    client_id = os.getenv("SPOTIFY_CLIENT_ID")
+    client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
+    if not client_id or not client_secret:
+        raise SpotifyDownloadError("SPOTIFY_CLIENT_ID/SECRET 환경 변수를 설정하세요")
+    # SpoLogin이 deezspot 전역(다운로드용 librespot 세션, 메타데이터 API)을 초기화함
+    return SpoLogin(
+        credentials_path=credentials_path,
+        spotify_client_id=client_id,
+        spotify_client_secret=client_secret,
+    )
+
+
+def _deezspot_session_valid(login: SpoLogin) -> bool:
+    # SpoLogin은 librespot Session을 비공개 속성으로 들고 있음; 확인할 수 없으면 정상으로 간주
+    session = getattr(login, "_SpoLogin__session", None)
+    is_valid = getattr(session, "is_valid", None)
+    return is_valid() if callable(is_valid) else True
+
+
+download_session = SpotifyDownloadSession(_deezspot_login, is_valid=_deezspot_session_valid)
+
+
+def _download_track(spotify_url: str, track_id: str, output_dir: str) -> Tuple[str, Dict]:
+    song_metadata = tracking(track_id)
+    if not song_metadata:
+        raise SpotifyDownloadError("Spotify 메타데이터를 가져오지 못했습니다")
+
+    preferences = Preferences()
+    preferences.link = spotify_url
+    preferences.ids = track_id
+    preferences.song_metadata = song_metadata
+    preferences.quality_download = "NORMAL"
+    preferences.output_dir = output_dir
+    preferences.recursive_quality = False
+    preferences.recursive_download = False
+    preferences.not_interface = True
+    preferences.method_save = 0
+    preferences.is_episode = False
+    preferences.convert_to = None
+    preferences.initial_retry_delay = 10
+    preferences.retry_delay_increase = 5
+    preferences.max_retries = 3
+
+    track = DW_TRACK(preferences).dw()
+    if not track or not track.success or not track.song_path:
+        raise SpotifyDownloadError("트랙 다운로드에 실패했습니다")
+
+    metadata = {
+        "title": getattr(song_metadata, "title", "Unknown"),
+        "artist": " & ".join(
+            [getattr(artist, "name", "Unknown") for artist in getattr(song_metadata, "artists", [])]
+        ),
+        "duration": getattr(song_metadata, "duration_ms", 0),
+    }
+    return track.song_path, metadata
+
+
+def _blocking_download_file(spotify_url: str) -> Tuple[str, Dict]:
+    """Download the track into this worker's scratch dir and return its path and metadata."""
 
-
-def _blocking_download_spotify(spotify_url: str) -> Tuple[io.BytesIO, Dict]:
     try:
         link_is_valid(spotify_url)
         track_id = get_ids(spotify_url)
-
-        client_id = os.getenv("SPOTIFY_CLIENT_ID")
-        client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
-        if not client_id or not client_secret:
-            raise SpotifyDownloadError("SPOTIFY_CLIENT_ID/SECRET 환경 변수를 설정하세요")
-
-        credentials_path = _find_credentials_file()
-        spo_login = SpoLogin(
-            credentials_path=credentials_path,
-            spotify_client_id=client_id,
-            spotify_client_secret=client_secret,
-        )
-
-        song_metadata = tracking(track_id)
-        if not song_metadata:
-            raise SpotifyDownloadError("Spotify 메타데이터를 가져오지 못했습니다")
-
-        preferences = Preferences()
-        preferences.link = spotify_url
-        preferences.ids = track_id
-        preferences.song_metadata = song_metadata
-        preferences.quality_download = "NORMAL"
-        preferences.output_dir = tempfile.mkdtemp()
-        preferences.recursive_quality = False
-        preferences.recursive_download = False
-        preferences.not_interface = True
-        preferences.method_save = 0
-        preferences.is_episode = False
-        preferences.convert_to = None
-        preferences.initial_retry_delay = 10
-        preferences.retry_delay_increase = 5
-        preferences.max_retries = 3
-
-        track = DW_TRACK(preferences).dw()
-        if not track or not track.success or not track.song_path:
-            raise SpotifyDownloadError("트랙 다운로드에 실패했습니다")
-
-        buffer = io.BytesIO()
-        with open(track.song_path, "rb") as handle:
-            buffer.write(handle.read())
-        buffer.seek(0)
-
-        try:
-            os.remove(track.song_path)
-            os.rmdir(os.path.dirname(track.song_path))
-        except Exception:
-            pass
-
-        metadata = {
-            "title": getattr(song_metadata, "title", "Unknown"),
-            "artist": " & ".join(
-                [getattr(artist, "name", "Unknown") for artist in getattr(song_metadata, "artists", [])]
-            ),
-            "duration": getattr(song_metadata, "duration_ms", 0),
-        }
-        return buffer, metadata
-
+        return download_session.run(lambda _login, scratch: _download_track(spotify_url, track_id, scratch))
     except Exception as exc:
         traceback.print_exc()
         if isinstance(exc, SpotifyDownloadError):
@@ -106,6 +99,57 @@ def _blocking_download_spotify(spotify_url: str) -> Tuple[io.BytesIO, Dict]:
         raise SpotifyDownloadError(str(exc)) from exc
 
 
-async def download_spotify_to_buffer(spotify_url: str):
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _blocking_download_spotify, spotify_url)
+def _remove_download(path: str) -> None:
+    # 작업 디렉터리는 다음 곡에 다시 쓰므로 파일만 지움
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _blocking_download_spotify(spotify_url: str) -> Tuple[AudioFile, Dict]:
+    path, metadata = _blocking_download_file(spotify_url)
+    # 메모리로 읽어 들이지 않고 파일을 그대로 넘김; 참조가 사라지면 AudioFile이 삭제
+    fd, target = tempfile.mkstemp(prefix="spotify-", suffix=os.path.splitext(path)[1])
+    os.close(fd)
+    try:
+        shutil.move(path, target)
+    finally:
+        _remove_download(path)
+    return AudioFile(target), metadata
+
+
+def _blocking_download_cached(spotify_url: str) -> CachedAudio:
+    # 트랙 ID는 URL에서 바로 얻을 수 있으므로 캐시 적중 시 네트워크를 전혀 쓰지 않음
+    track_id = parse_uri(spotify_url)["id"]
+    cached = audio_cache.get("spotify", track_id)
+    if cached is not None:
+        return cached
+
+    path, metadata = _blocking_download_file(spotify_url)
+    try:
+        return audio_cache.put("spotify", track_id, path, metadata)
+    finally:
+        _remove_download(path)
+
+
+async def download_spotify_to_file(spotify_url: str) -> Tuple[AudioFile, Dict]:
+    return await run_extraction("spotify", _blocking_download_spotify, spotify_url)
+
+
+_downloads: Dict[str, asyncio.Future] = {}
+
+
+async def download_spotify_cached(spotify_url: str) -> CachedAudio:
+    """Return the track from the disk cache, downloading and encoding it on a miss.
+
+    Concurrent requests for the same track share one download.
+    """
+
+    key = parse_uri(spotify_url)["id"]
+    task = _downloads.get(key)
+    if task is None:
+        task = asyncio.ensure_future(run_extraction("spotify", _blocking_download_cached, spotify_url))
+        _downloads[key] = task
+        task.add_done_callback(lambda _: _downloads.pop(key, None))
+    return await asyncio.shield(task)
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
-from Modules.track_sources.base import BaseUploadSource, UploadPayload
-from Modules.track_sources.providers.memory import MemoryAudioSource
+import discord
+
+from Modules.track_sources.base import BaseUploadSource, PendingTrack, UploadPayload
+from Modules.track_sources.config import BROADCAST_LIVE_JOIN
+from Modules.track_sources.providers.file import FileAudioSource, cancel_upload, load_upload
 
 
 class UploadSource(BaseUploadSource):
@@ -11,5 +14,23 @@ class UploadSource(BaseUploadSource):
 
     @classmethod
     async def create_tracks(cls, payload: UploadPayload):
-        source = await MemoryAudioSource.from_upload(payload.file)
-        return [source]
+        # 첨부 파일을 청크 단위로 디스크에 받아 두고 FFmpeg가 직접 읽게 함
+        audio_file, metadata = await load_upload(payload.file, probe=payload.probe)
+        track = PendingTrack(
+            title=metadata["title"],
+            duration=metadata.get("duration") or 0,
+            loader=cls._load_source,
+            on_drop=cls._cancel_download,
+            data={"file": audio_file, "metadata": metadata},
+        )
+        return [track]
+
+    @staticmethod
+    def _cancel_download(track: PendingTrack) -> None:
+        # 대기열에서 빠졌거나 재생이 끝난 업로드는 남은 부분을 더 받지 않음
+        cancel_upload(track.data["file"])
+
+    @classmethod
+    async def _load_source(cls, track: PendingTrack) -> discord.AudioSource:
+        # 같은 파일을 다른 서버가 이미 재생 중이면 그 위치부터 디코더를 함께 씀
+        return await FileAudioSource.shared(track.data["file"], track.data["metadata"], live=BROADCAST_LIVE_JOIN)
@@ -2,20 +2,26 @@
 
 from __future__ import annotations
 
-import asyncio
-from typing import List
+from typing import AsyncIterator, List
 
 import discord
 
-from Modules.track_sources.base import BaseTrackSource, TrackQuery
-from Modules.track_sources.config import FFMPEG_STREAM_OPTIONS
-from Modules.track_sources.providers.youtube.ytdl_client import youtube_client
+from Modules.track_sources.base import BaseTrackSource, PendingTrack, TrackQuery
+from Modules.track_sources.broadcast import broadcast_hub
+from Modules.track_sources.cache import extraction_cache
+from Modules.track_sources.config import BROADCAST_LIVE_JOIN
+from Modules.track_sources.utils.ffmpeg import stream_source_kwargs
+from Modules.track_sources.utils.ytdl import extract_info, iter_extract
+
+_FLAT_ENTRY_TYPES = {"url", "url_transparent"}
 
 
 class _YouTubeAudioSource(discord.FFmpegOpusAudio):
-    def __init__(self, source: str, *, data: dict):
-        super().__init__(source, **FFMPEG_STREAM_OPTIONS)
+    def __init__(self, source: str, *, data: dict, start: float = 0.0):
+        options = stream_source_kwargs(data, start=start)
+        super().__init__(source, **options)
         self.data = data
+        self.passthrough = options.get("codec") == "copy"
         self.title = data.get("title", "Unknown Title")
         self.url = data.get("url")
 
@@ -30,25 +36,72 @@ class YouTubeUrlSource(BaseTrackSource):
         return "youtube.com/" in normalized or "youtu.be/" in normalized or normalized.startswith("ytsearch:")
 
     @classmethod
-    async def create_tracks(cls, query: TrackQuery) -> List[discord.FFmpegOpusAudio]:
-        ytdl = youtube_client()
-        loop = asyncio.get_event_loop()
-
-        def _extract():
-            raw_query = query.raw if query.normalized.startswith("ytsearch:") else query.raw
-            return ytdl.extract_info(raw_query, download=False)
-
-        data = await loop.run_in_executor(None, _extract)
+    async def create_tracks(cls, query: TrackQuery) -> List[PendingTrack]:
+        data = await _extract_info(query)
         if not data:
             return []
 
         entries = data.get("entries") if "entries" in data else [data]
-        sources: list[_YouTubeAudioSource] = []
+        tracks: list[PendingTrack] = []
         for entry in entries:
             if not entry or "url" not in entry:
                 continue
-            sources.append(_YouTubeAudioSource(entry["url"], data=entry))
-        return sources
+            tracks.append(cls._pending_from_entry(entry))
+        return tracks
+
+    @classmethod
+    async def iter_tracks(cls, query: TrackQuery) -> AsyncIterator[PendingTrack]:
+        cached = extraction_cache.peek(cls.name, query)
+        if cached is not None:
+            for entry in cached.get("entries") if "entries" in cached else [cached]:
+                if entry and "url" in entry:
+                    yield cls._pending_from_entry(entry)
+            return
+
+        collected = []
+        async for entry in iter_extract("youtube", query.raw):
+            collected.append(entry)
+            if "url" in entry:
+                yield cls._pending_from_entry(entry)
+
+        # 끝까지 받아온 경우에만 캐시에 저장 (단일 영상은 그대로, 재생목록은 entries로 묶어서)
+        if len(collected) == 1 and collected[0].get("_type") not in _FLAT_ENTRY_TYPES:
+            extraction_cache.put(cls.name, query, collected[0])
+        elif collected:
+            extraction_cache.put(cls.name, query, {"_type": "playlist", "entries": collected})
+
+    @classmethod
+    def _pending_from_entry(cls, entry: dict) -> PendingTrack:
+        # extract_flat 항목은 스트림 URL 없이 영상 페이지 URL만 가지고 있음
+        is_flat = entry.get("_type") in _FLAT_ENTRY_TYPES
+        webpage_url = entry.get("webpage_url") or (entry["url"] if is_flat else None)
+        return PendingTrack(
+            title=entry.get("title") or "Unknown Title",
+            webpage_url=webpage_url,
+            duration=entry.get("duration") or 0,
+            loader=cls._load_source,
+            resolver=cls._resolve_stream,
+            data={} if is_flat else entry,
+        )
+
+    @classmethod
+    async def _resolve_stream(cls, track: PendingTrack) -> None:
+        if track.data.get("url"):
+            return
+        data = await _extract_info(TrackQuery(track.webpage_url))
+        if not data or not data.get("url"):
+            raise ValueError(f"스트림 URL을 가져오지 못했습니다: {track.title}")
+        track.data = data
+
+    @classmethod
+    async def _load_source(cls, track: PendingTrack) -> discord.AudioSource:
+        data = track.data
+        # 같은 곡을 재생 중인 다른 서버가 있으면 그 디코더를 공유 (이미 한참 재생됐다면 그 위치부터)
+        return broadcast_hub.subscribe(
+            ("youtube", data.get("id") or track.webpage_url or data["url"], data.get("format_id")),
+            lambda start: _YouTubeAudioSource(data["url"], data=data, start=start),
+            live=BROADCAST_LIVE_JOIN,
+        )
 
 
 class YouTubeSearchFallback(BaseTrackSource):
@@ -63,3 +116,16 @@ class YouTubeSearchFallback(BaseTrackSource):
     async def create_tracks(cls, query: TrackQuery):
         fallback_query = f"ytsearch:{query.raw}"
         return await YouTubeUrlSource.create_tracks(TrackQuery(fallback_query))
+
+    @classmethod
+    async def iter_tracks(cls, query: TrackQuery) -> AsyncIterator[PendingTrack]:
+        async for track in YouTubeUrlSource.iter_tracks(TrackQuery(f"ytsearch:{query.raw}")):
+            yield track
+
+
+async def _extract_info(query: TrackQuery):
+    return await extraction_cache.get_or_extract(
+        YouTubeUrlSource.name,
+        query,
+        lambda: extract_info("youtube", query.raw),
+    )
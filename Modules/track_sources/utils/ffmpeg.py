@@ -0,0 +1,80 @@
+"""FFmpeg option selection and process accounting for stream sources."""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional
+
+from Modules.track_sources.config import (
+    FFMPEG_OPUS_PASSTHROUGH,
+    FFMPEG_PASSTHROUGH_OPTIONS,
+    FFMPEG_STREAM_OPTIONS,
+)
+
+# Ogg로 그대로 옮겨 담을 수 있는 Opus 컨테이너; HLS/DASH 조각은 제외
+_OPUS_CONTAINERS = {"webm", "ogg", "opus"}
+_DIRECT_PROTOCOLS = {"http", "https"}
+
+
+def is_opus_passthrough(info: Dict[str, Any]) -> bool:
+    """Return True when yt-dlp selected a plain HTTP Opus stream FFmpeg can copy."""
+
+    acodec = (info.get("acodec") or "").lower()
+    if not acodec.startswith("opus"):
+        return False
+    if (info.get("protocol") or "https") not in _DIRECT_PROTOCOLS:
+        return False
+    return (info.get("ext") or "").lower() in _OPUS_CONTAINERS
+
+
+def stream_source_kwargs(info: Dict[str, Any], *, start: float = 0.0) -> Dict[str, Any]:
+    """Keyword arguments for ``FFmpegOpusAudio`` playing the stream described by ``info``.
+
+    Opus sources are remuxed (``-c:a copy``) instead of being decoded and
+    re-encoded; everything else keeps the 320k transcode settings. ``start``
+    seeks the input before decoding.
+    """
+
+    if FFMPEG_OPUS_PASSTHROUGH and is_opus_passthrough(info):
+        options = {**FFMPEG_PASSTHROUGH_OPTIONS, "codec": "copy"}
+    else:
+        options = dict(FFMPEG_STREAM_OPTIONS)
+    if start > 0:
+        options["before_options"] = f"-ss {start:.3f} {options['before_options']}"
+    return options
+
+
+try:
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    _CLOCK_TICKS = 100
+
+
+def process_cpu_time(pid: int) -> Optional[float]:
+    """User + system CPU seconds consumed by ``pid``, or None if unavailable.
+
+    Reads ``/proc/<pid>/stat``, so it only works on Linux and only while the
+    process has not been reaped yet.
+    """
+
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as stat:
+            raw = stat.read()
+    except OSError:
+        return None
+    # comm 필드에 공백/괄호가 있을 수 있으므로 마지막 ')' 이후부터 파싱
+    fields = raw[raw.rfind(b")") + 2:].split()
+    try:
+        return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    except (IndexError, ValueError):
+        return None
+
+
+def source_cpu_time(source: Any) -> Optional[float]:
+    """CPU seconds used so far by the FFmpeg process behind a discord.py audio source."""
+
+    process = getattr(source, "_process", None)
+    pid = getattr(process, "pid", None)
+    if pid is None:
+        return None
+    return process_cpu_time(pid)
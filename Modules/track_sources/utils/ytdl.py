@@ -1,12 +1,24 @@
-"""Helpers for constructing shared YoutubeDL instances."""
+"""Helpers for constructing shared YoutubeDL instances and running extractions."""
 
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
 
 import yt_dlp as youtube_dl
+from yt_dlp.utils import PagedList
 
-from Modules.track_sources.config import SOUNDCLOUD_FORMAT_OPTIONS, YTDL_FORMAT_OPTIONS
+from Modules.track_sources.config import (
+    EXTRACTOR_MODE,
+    EXTRACTOR_PROCESSES,
+    SOUNDCLOUD_FORMAT_OPTIONS,
+    YTDL_FORMAT_OPTIONS,
+)
+from Modules.track_sources.executor import get_pool
 
 
 @lru_cache(maxsize=1)
@@ -17,3 +29,131 @@ def youtube_client() -> youtube_dl.YoutubeDL:
 @lru_cache(maxsize=1)
 def soundcloud_client() -> youtube_dl.YoutubeDL:
     return youtube_dl.YoutubeDL(SOUNDCLOUD_FORMAT_OPTIONS)
+
+
+_CLIENTS = {
+    "youtube": youtube_client,
+    "soundcloud": soundcloud_client,
+}
+
+
+def _warm_worker() -> None:
+    # 워커 프로세스마다 YoutubeDL 인스턴스를 미리 만들어 두어 첫 요청 지연을 없앰
+    for factory in _CLIENTS.values():
+        factory()
+
+
+def _worker_extract(kind: str, url: str, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    client = _CLIENTS[kind]()
+    info = client.extract_info(url, **options)
+    # 제너레이터/LazyList 등을 풀어 IPC로 보낼 수 있는 순수 dict로 변환
+    return client.sanitize_info(info) if info else info
+
+
+@lru_cache(maxsize=1)
+def process_executor() -> ProcessPoolExecutor:
+    # 스레드가 도는 봇 프로세스를 fork하지 않도록 spawn 컨텍스트 사용
+    return ProcessPoolExecutor(
+        max_workers=EXTRACTOR_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_worker,
+    )
+
+
+async def extract_info(kind: str, url: str, *, mode: Optional[str] = None, **options: Any):
+    """Run ``YoutubeDL.extract_info`` for ``kind`` on its bounded extraction pool.
+
+    In ``process`` mode the call executes in a worker process holding a warm
+    client and returns a sanitized, plain info dict, keeping yt-dlp's regex and
+    JSON work off the bot process's GIL.
+    """
+
+    options.setdefault("download", False)
+    pool = get_pool(kind)
+    if (mode or EXTRACTOR_MODE) == "process":
+        return await pool.run(_worker_extract, kind, url, options, executor=process_executor())
+    return await pool.run(lambda: _CLIENTS[kind]().extract_info(url, **options))
+
+
+_STREAM_END = object()
+# PagedList를 이만큼씩 잘라서 받음 (getslice(0, None)은 재생목록 전체를 한 번에 받음)
+_PLAYLIST_SLICE = 50
+
+
+def _iter_playlist_entries(entries) -> Iterable:
+    if isinstance(entries, PagedList):
+        return _iter_paged(entries)
+    return iter(entries or [])
+
+
+def _iter_paged(entries: PagedList) -> Iterable:
+    start = 0
+    while True:
+        chunk = entries.getslice(start, start + _PLAYLIST_SLICE)
+        yield from chunk
+        if len(chunk) < _PLAYLIST_SLICE:
+            return
+        start += _PLAYLIST_SLICE
+
+
+async def iter_extract(kind: str, url: str) -> AsyncIterator[Dict[str, Any]]:
+    """Yield playlist entries as yt-dlp pages through them.
+
+    Non-playlist URLs yield their single, fully processed info dict. Stopping
+    the iteration early also stops the worker between entries. Process mode
+    cannot stream generators over IPC, so it yields from a full extraction.
+    """
+
+    if EXTRACTOR_MODE == "process":
+        info = await extract_info(kind, url)
+        entries = (info or {}).get("entries") if info and "entries" in info else [info]
+        for entry in entries or []:
+            if entry:
+                yield entry
+        return
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stopped = threading.Event()
+
+    def _push(item) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, item)
+
+    def _produce() -> None:
+        client = _CLIENTS[kind]()
+        try:
+            info = client.extract_info(url, download=False, process=False)
+            if not info:
+                return
+            if info.get("_type") != "playlist":
+                _push(client.process_ie_result(info, download=False))
+                return
+            for entry in _iter_playlist_entries(info.get("entries")):
+                if stopped.is_set():
+                    return
+                if entry:
+                    _push(entry)
+        except BaseException as exc:
+            _push(exc)
+        finally:
+            _push(_STREAM_END)
+
+    producer = asyncio.ensure_future(get_pool(kind).run(_produce))
+    # 워커가 시작도 못 하고 실패한 경우에도 소비자가 멈추지 않도록 종료 신호를 보냄
+    producer.add_done_callback(
+        lambda done: queue.put_nowait(
+            done.exception() if not done.cancelled() and done.exception() else _STREAM_END
+        )
+    )
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        if not producer.done():
+            producer.cancel()
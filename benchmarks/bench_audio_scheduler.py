@@ -0,0 +1,76 @@
+"""Microbenchmark: enqueue/drain throughput of AudioScheduler vs. the old list queue.
+
+Usage:
+    python benchmarks/bench_audio_scheduler.py [--tracks 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AudioScheduler import AudioScheduler  # noqa: E402
+
+
+class _Track:
+    __slots__ = ("title",)
+
+    def __init__(self, title):
+        self.title = title
+
+
+class ListAudioScheduler(AudioScheduler):
+    """Reference implementation: the pre-deque list queue (pop(0) + full clone)."""
+
+    def _init(self, maxsize):
+        self.queues = []
+
+    def _get(self):
+        removed = self.queues.pop(0)
+        print(f"🎵 대기열 삭제: {removed.title}")
+        self._notify()
+        return removed
+
+    def peek(self, count=1):
+        return self.queues.copy()[:count]
+
+
+def _run(scheduler_cls, tracks):
+    scheduler = scheduler_cls()
+    # 스케줄러의 로그 출력이 측정을 왜곡하지 않도록 버림
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for track in tracks:
+            scheduler.enqueue(track)
+        enqueued = time.perf_counter()
+        for _ in range(100):
+            scheduler.peek(10)
+        peeked = time.perf_counter()
+        while scheduler.dequeue() is not None:
+            pass
+        drained = time.perf_counter()
+        del scheduler
+    return enqueued - start, peeked - enqueued, drained - peeked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=100_000)
+    args = parser.parse_args()
+
+    tracks = [_Track(f"track {i}") for i in range(args.tracks)]
+    print(f"{args.tracks} tracks")
+    print(f"{'implementation':<16}{'enqueue':>12}{'peek x100':>12}{'drain':>12}")
+    for label, scheduler_cls in (("list (old)", ListAudioScheduler), ("deque", AudioScheduler)):
+        enqueue, peek, drain = _run(scheduler_cls, tracks)
+        print(f"{label:<16}{enqueue:>11.3f}s{peek:>11.3f}s{drain:>11.3f}s")
+
+
+if __name__ == "__main__":
+    main()
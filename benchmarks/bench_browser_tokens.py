@@ -0,0 +1,131 @@
+"""Benchmark: token minting with a browser per token vs. one pooled browser.
+
+A local aiohttp server serves a fixture page standing in for the real site:
+it fills the ``cf-turnstile-response`` input after ``--challenge-ms`` and
+its download button fetches ``/session``, which returns a token. Both
+modes run the real ``get_session_token`` against it.
+
+"fresh" reproduces the old behaviour: every token starts Chrome and stops
+it afterwards. "pooled" shares one ``BrowserManager`` (``--pages`` tabs) and
+mints ``--concurrency`` tokens at a time. Reported: latency per token and
+the peak RSS of the browser process tree.
+
+Requires zendriver and Chrome (``--chrome``; ``--headless`` without a display).
+
+Usage:
+    python benchmarks/bench_browser_tokens.py [--tokens 10] [--pages 2] [--concurrency 2] [--headless]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Modules.track_sources.providers.spotify.browser import BROWSER_EXECUTABLE, BrowserManager  # noqa: E402
+from Modules.track_sources.providers.spotify.getToken import get_session_token  # noqa: E402
+
+FIXTURE = """<!doctype html>
+<html><body>
+<input type="hidden" name="cf-turnstile-response">
+<button class="flex justify-center items-center bg-button">Download</button>
+<script>
+setTimeout(() => {
+    document.querySelector('input[name="cf-turnstile-response"]').setAttribute("value", "fixture-turnstile");
+}, %d);
+document.querySelector("button").addEventListener("click", () => fetch("/session"));
+</script>
+</body></html>
+"""
+
+
+async def _serve(challenge_ms: int, port: int) -> web.AppRunner:
+    issued = 0
+
+    async def index(_request):
+        return web.Response(text=FIXTURE % challenge_ms, content_type="text/html")
+
+    async def session(_request):
+        nonlocal issued
+        issued += 1
+        return web.json_response({"token": f"fixture-{issued}"})
+
+    app = web.Application()
+    app.router.add_get("/", index)
+    app.router.add_get("/session", session)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def _run(mode: str, args, site_url: str) -> tuple[list[float], float, int]:
+    def manager() -> BrowserManager:
+        return BrowserManager(pages=args.pages, headless=args.headless, executable=args.chrome, options={})
+
+    shared = manager() if mode == "pooled" else None
+    latencies: list[float] = []
+    peak_rss = 0
+    failures = 0
+    limit = asyncio.Semaphore(args.concurrency if mode == "pooled" else 1)
+
+    async def one() -> None:
+        nonlocal peak_rss, failures
+        async with limit:
+            current = shared or manager()
+            started = time.perf_counter()
+            try:
+                token = await get_session_token(max_wait=10, manager=current, site_url=site_url, session_api="/session")
+                latencies.append(time.perf_counter() - started)
+                peak_rss = max(peak_rss, current.rss() or 0)
+                failures += token is None
+            finally:
+                if shared is None:
+                    await current.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.tokens)))
+    wall = time.perf_counter() - started
+    if shared is not None:
+        print(f"  {shared.stats()}")
+        await shared.close()
+    if failures:
+        print(f"  {failures} token(s) failed")
+    return latencies, wall, peak_rss
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=2, help="tab pool size (pooled mode)")
+    parser.add_argument("--concurrency", type=int, default=2, help="tokens minted at once (pooled mode)")
+    parser.add_argument("--challenge-ms", type=int, default=300, help="delay before the fixture challenge resolves")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--chrome", default=BROWSER_EXECUTABLE)
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+
+    runner = await _serve(args.challenge_ms, args.port)
+    site_url = f"http://127.0.0.1:{args.port}/"
+    print(f"{args.tokens} tokens from fixture {site_url} (challenge {args.challenge_ms} ms)")
+    try:
+        for mode in ("fresh", "pooled"):
+            latencies, wall, peak_rss = await _run(mode, args, site_url)
+            print(
+                f"{mode:7s} per token mean={statistics.mean(latencies) * 1000:8.1f} ms  "
+                f"median={statistics.median(latencies) * 1000:8.1f} ms  "
+                f"wall={wall:6.2f} s  peak rss={peak_rss / 1024 / 1024:7.1f} MB"
+            )
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""Benchmark: event-loop lag during concurrent extractions, thread vs. process mode.
+
+By default a synthetic, GIL-bound workload stands in for yt-dlp's regex/JSON
+parsing so the numbers are reproducible offline. Pass ``--url`` to run real
+``extract_info`` calls instead (requires network access).
+
+Usage:
+    python benchmarks/bench_extraction_lag.py [--jobs 50] [--url URL]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Modules.track_sources.executor import get_pool  # noqa: E402
+from Modules.track_sources.utils.ytdl import extract_info, process_executor  # noqa: E402
+
+_PAGE = "".join(
+    f'<script>var ytInitialData = {{"videoId": "id{i:05d}", "title": "track {i}", "lengthSeconds": "{i % 600}"}};</script>'
+    for i in range(2000)
+)
+_PATTERN = re.compile(r'"videoId": "(\w+)", "title": "([^"]+)", "lengthSeconds": "(\d+)"')
+
+
+def _synthetic_extract(rounds: int) -> dict:
+    entries = []
+    for _ in range(rounds):
+        entries = [
+            json.loads(json.dumps({"id": vid, "title": title, "duration": int(length)}))
+            for vid, title, length in _PATTERN.findall(_PAGE)
+        ]
+    return {"entries": entries[:5]}
+
+
+async def _measure(mode: str, jobs: int, url: str | None, rounds: int) -> dict:
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker():
+        interval = 0.01
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    async def one_job():
+        if url:
+            return await extract_info("youtube", url, mode=mode)
+        executor = process_executor() if mode == "process" else None
+        return await get_pool("youtube").run(_synthetic_extract, rounds, executor=executor)
+
+    if mode == "process":
+        # 워커 기동(spawn + yt-dlp import) 비용은 측정에서 제외
+        await asyncio.gather(*(asyncio.get_running_loop().run_in_executor(process_executor(), _synthetic_extract, 0)
+                               for _ in range(os.cpu_count() or 1)))
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(one_job() for _ in range(jobs)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "lag_p50": statistics.median(lags) * 1000,
+        "lag_p99": lags[int(len(lags) * 0.99) - 1] * 1000 if lags else 0.0,
+        "lag_max": lags[-1] * 1000 if lags else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3, help="synthetic workload size per job")
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    print(f"{args.jobs} concurrent extractions ({'real: ' + args.url if args.url else 'synthetic'})")
+    print(f"{'mode':<10}{'total':>10}{'lag p50':>12}{'lag p99':>12}{'lag max':>12}")
+    for mode in ("thread", "process"):
+        result = asyncio.run(_measure(mode, args.jobs, args.url, args.rounds))
+        print(
+            f"{mode:<10}{result['elapsed']:>9.2f}s{result['lag_p50']:>10.1f}ms"
+            f"{result['lag_p99']:>10.1f}ms{result['lag_max']:>10.1f}ms"
+        )
+    process_executor().shutdown()
+
+
+if __name__ == "__main__":
+    main()
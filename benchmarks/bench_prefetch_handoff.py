@@ -0,0 +1,99 @@
+"""Benchmark: time from dequeue to a playable source, with and without prefetching.
+
+Each queued ``PendingTrack`` gets a loader that sleeps ``--load-ms`` (standing
+in for starting FFmpeg) and counts how often it ran. A consumer drains the
+queue the way the playback loop does (``get()`` then ``create_source()``),
+"playing" each track for ``--play-ms`` so the prefetcher has time to warm the
+next one.
+
+With prefetching, a dequeued track must hand back the source the prefetcher
+built for it: the script checks that no track was loaded twice and that each
+one after the first started from a warm source, and exits non-zero otherwise.
+
+Usage:
+    python benchmarks/bench_prefetch_handoff.py [--tracks 10] [--load-ms 200] [--play-ms 400]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AudioScheduler import AudioScheduler  # noqa: E402
+from Modules.TrackPrefetcher import TrackPrefetcher  # noqa: E402
+from Modules.track_sources.base import PendingTrack  # noqa: E402
+
+
+class _Source(discord.AudioSource):
+    def read(self) -> bytes:
+        return b""
+
+
+async def _run(prefetch: bool, args) -> tuple[list[float], dict[str, int], int]:
+    builds: dict[str, int] = {}
+
+    async def loader(track: PendingTrack) -> discord.AudioSource:
+        builds[track.title] = builds.get(track.title, 0) + 1
+        await asyncio.sleep(args.load_ms / 1000)
+        return _Source()
+
+    scheduler = AudioScheduler()
+    prefetcher = TrackPrefetcher(scheduler, depth=3, warm_ffmpeg=True) if prefetch else None
+    waits: list[float] = []
+    warm_starts = 0
+    # 스케줄러의 로그 출력은 측정과 무관하므로 버림
+    with contextlib.redirect_stdout(io.StringIO()):
+        scheduler.enqueue_list([PendingTrack(title=f"track-{i}", loader=loader) for i in range(args.tracks)])
+        while not scheduler.is_empty():
+            track = await scheduler.get()
+            # 재생 시점 전에 로더가 이미 돌기 시작했으면 미리 띄운 소스를 넘겨받은 것
+            warm_starts += track.title in builds
+            started = time.perf_counter()
+            source = await track.create_source()
+            waits.append(time.perf_counter() - started)
+            await asyncio.sleep(args.play_ms / 1000)
+            source.cleanup()
+        if prefetcher is not None:
+            prefetcher.cancel_all()
+    return waits, builds, warm_starts
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=10)
+    parser.add_argument("--load-ms", type=int, default=200)
+    parser.add_argument("--play-ms", type=int, default=400)
+    args = parser.parse_args()
+
+    print(f"{args.tracks} tracks, load {args.load_ms} ms, play {args.play_ms} ms")
+    ok = True
+    for prefetch in (False, True):
+        waits, builds, warm_starts = await _run(prefetch, args)
+        label = "prefetch" if prefetch else "direct"
+        print(
+            f"{label:8s} dequeue->source mean={statistics.mean(waits) * 1000:7.1f} ms  "
+            f"max={max(waits) * 1000:7.1f} ms  loads={sum(builds.values())}  warm starts={warm_starts}"
+        )
+        if prefetch:
+            reloaded = sorted(title for title, count in builds.items() if count > 1)
+            if reloaded:
+                print(f"  FAIL: warmed source thrown away and rebuilt for {', '.join(reloaded)}")
+                ok = False
+            if warm_starts < args.tracks - 1:
+                print(f"  FAIL: only {warm_starts} of {args.tracks - 1} tracks started from a warm source")
+                ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
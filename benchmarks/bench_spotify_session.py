@@ -0,0 +1,102 @@
+"""Benchmark: per-track setup overhead of Spotify downloads, fresh login vs. shared session.
+
+"fresh" reproduces the old behaviour: every track locates credentials.json,
+creates a new login and a new temp dir. "session" reuses one
+``SpotifyDownloadSession`` for all tracks. Overhead is the time spent per
+track outside the download itself.
+
+By default a stand-in login that sleeps ``--login-ms`` and a no-op download
+are used, so the numbers are reproducible offline. Pass ``--url`` to log in
+with deezspot and download a real track (requires deezspot, credentials.json
+and SPOTIFY_CLIENT_ID/SECRET).
+
+Usage:
+    python benchmarks/bench_spotify_session.py [--tracks 20] [--login-ms 400] [--url URL]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Modules.track_sources.providers.spotify.session import SpotifyDownloadSession  # noqa: E402
+
+
+def _synthetic(login_ms: float):
+    def login(_credentials_path: str) -> object:
+        time.sleep(login_ms / 1000)
+        return object()
+
+    def download(_login, scratch: str) -> str:
+        fd, path = tempfile.mkstemp(dir=scratch, suffix=".ogg")
+        os.close(fd)
+        return path
+
+    return login, download
+
+
+def _real(url: str):
+    from Modules.track_sources.providers.spotify.utils import _deezspot_login, _download_track, get_ids
+
+    track_id = get_ids(url)
+    return _deezspot_login, lambda _login, scratch: _download_track(url, track_id, scratch)[0]
+
+
+def _run(mode: str, tracks: int, login, download) -> list[float]:
+    overheads = []
+    shared = SpotifyDownloadSession(login)
+    for _ in range(tracks):
+        session = shared if mode == "session" else SpotifyDownloadSession(login)
+        spent = 0.0
+
+        def timed_download(current_login, scratch):
+            nonlocal spent
+            started = time.perf_counter()
+            try:
+                return download(current_login, scratch)
+            finally:
+                spent = time.perf_counter() - started
+
+        started = time.perf_counter()
+        path = session.run(timed_download)
+        os.remove(path)
+        if mode == "fresh":
+            # 예전 코드는 곡마다 만든 임시 디렉터리를 지웠음
+            os.rmdir(session.scratch_dir())
+        overheads.append(time.perf_counter() - started - spent)
+    return overheads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=20)
+    parser.add_argument("--login-ms", type=float, default=400.0, help="stand-in login latency (synthetic mode)")
+    parser.add_argument("--url", help="real Spotify track URL to download with deezspot")
+    args = parser.parse_args()
+
+    if args.url:
+        login, download = _real(args.url)
+    else:
+        credentials = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
+        credentials.close()
+        os.environ["SPOTIFY_CREDENTIALS_PATH"] = credentials.name
+        login, download = _synthetic(args.login_ms)
+
+    print(f"{args.tracks} tracks, {'deezspot ' + args.url if args.url else f'stand-in login {args.login_ms:.0f} ms'}")
+    for mode in ("fresh", "session"):
+        overheads = _run(mode, args.tracks, login, download)
+        print(
+            f"{mode:8s} overhead/track mean={statistics.mean(overheads) * 1000:8.2f} ms  "
+            f"median={statistics.median(overheads) * 1000:8.2f} ms  "
+            f"total={sum(overheads):7.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Benchmark: resident memory while queueing many large uploads.
+
+Serves synthetic FLAC files from a local HTTP server (standing in for the
+Discord CDN) and queues them through either the old whole-file ``BytesIO``
+path or the spooled, file-backed upload path. Each mode runs in its own
+subprocess so peak RSS is measured independently.
+
+The defaults match the target scenario (200 x 50 MB). ``bytesio`` mode needs
+``count * size`` of RAM, so shrink ``--count``/``--size-mb`` on small hosts;
+``file`` mode needs the same amount of free disk space in the temp dir.
+
+Usage:
+    python benchmarks/bench_upload_memory.py [--count 200] [--size-mb 50] [--mode both|bytesio|file]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import resource
+import struct
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web  # noqa: E402
+
+_BLOCK = os.urandom(1024 * 1024)
+
+
+def _flac_header(size: int) -> bytes:
+    # fLaC + 마지막 블록인 STREAMINFO (44.1kHz, 2ch, 16bit); mutagen이 길이를 읽을 수 있을 만큼만
+    samples = size // 4
+    info = struct.pack(">HH", 4096, 4096) + b"\x00" * 6
+    packed = (44100 << 44) | (1 << 41) | (15 << 36) | samples
+    info += packed.to_bytes(8, "big") + b"\x00" * 16
+    return b"fLaC" + bytes([0x80]) + len(info).to_bytes(3, "big") + info
+
+
+class _Attachment:
+    """Minimal stand-in for ``discord.Attachment``."""
+
+    def __init__(self, url: str, filename: str, session):
+        self.url = url
+        self.filename = filename
+        self._session = session
+
+    async def read(self) -> bytes:
+        # discord.py의 Attachment.read()와 같이 전체를 한 번에 받음
+        async with self._session.get(self.url) as response:
+            return await response.read()
+
+
+async def _load_bytesio(attachment: _Attachment):
+    """The old upload path: the whole file in a ``BytesIO``, probed in place."""
+
+    from Modules.track_sources.probe import metadata_prober
+
+    buffer = io.BytesIO(await attachment.read())
+    probe = await metadata_prober.probe_file(buffer)
+    return buffer, probe.as_metadata(fallback_title=attachment.filename)
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+async def _serve(size: int) -> web.AppRunner:
+    header = _flac_header(size)
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Length": str(size)})
+        await response.prepare(request)
+        await response.write(header)
+        remaining = size - len(header)
+        while remaining > 0:
+            chunk = _BLOCK[: min(len(_BLOCK), remaining)]
+            await response.write(chunk)
+            remaining -= len(chunk)
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 8765).start()
+    return runner
+
+
+async def _run(mode: str, count: int, size: int, concurrency: int) -> dict:
+    import aiohttp
+
+    from Modules.track_sources.providers.upload import UploadSource
+    from Modules.track_sources.base import UploadPayload
+
+    runner = await _serve(size)
+    queue = []
+    semaphore = asyncio.Semaphore(concurrency)
+    baseline = _rss_mb()
+    started = time.perf_counter()
+
+    async with aiohttp.ClientSession() as session:
+        async def enqueue(index: int) -> None:
+            attachment = _Attachment(f"http://127.0.0.1:8765/{index}.flac", f"{index}.flac", session)
+            async with semaphore:
+                if mode == "bytesio":
+                    queue.append(await _load_bytesio(attachment))
+                else:
+                    queue.extend(await UploadSource.create_tracks(UploadPayload(file=attachment)))
+
+        await asyncio.gather(*(enqueue(index) for index in range(count)))
+        ready = time.perf_counter() - started
+        # 재생은 이미 가능하지만, 공정한 비교를 위해 백그라운드 다운로드가 끝날 때까지 기다림
+        for entry in queue:
+            spool = entry.data["file"] if mode == "file" else None
+            if hasattr(spool, "wait_complete"):
+                await spool.wait_complete()
+
+    elapsed = time.perf_counter() - started
+    result = {
+        "mode": mode,
+        "queued": len(queue),
+        "queued_seconds": round(ready, 2),
+        "seconds": round(elapsed, 2),
+        "baseline_rss_mb": round(baseline, 1),
+        "rss_mb": round(_rss_mb(), 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    queue.clear()
+    await runner.cleanup()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--mode", choices=("both", "bytesio", "file"), default="both")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(_run(args.mode, args.count, args.size_mb * 2**20, args.concurrency))
+        print(json.dumps(result))
+        return
+
+    modes = ("bytesio", "file") if args.mode == "both" else (args.mode,)
+    print(f"Queueing {args.count} uploads x {args.size_mb} MB ({args.count * args.size_mb / 1024:.1f} GB total)")
+    for mode in modes:
+        output = subprocess.run(
+            [
+                sys.executable, __file__, "--child", "--mode", mode,
+                "--count", str(args.count), "--size-mb", str(args.size_mb),
+                "--concurrency", str(args.concurrency),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        if output.returncode != 0:
+            print(f"{mode:8s} failed (exit {output.returncode}): {output.stderr.strip().splitlines()[-1:]}")
+            continue
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(
+            f"{mode:8s} queued={result['queued']:4d} in {result['queued_seconds']:6.2f}s  "
+            f"downloaded in {result['seconds']:6.2f}s  "
+            f"rss={result['rss_mb']:8.1f} MB  peak={result['peak_rss_mb']:8.1f} MB  "
+            f"(baseline {result['baseline_rss_mb']:.1f} MB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import sys
 import os
+import time
 sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
 import traceback
 
@@ -21,6 +22,9 @@ from Modules.features.konglish.KonglishResolver import (
 from Modules.features.language_research.LanguageResearcher import detect_text_type
 from Modules.ServerClient import ServerClient
 from Modules.TrackFactory import TrackFactory
+from Modules.track_sources.broadcast import broadcast_hub
+from Modules.track_sources.cache import extraction_cache
+from Modules.track_sources.executor import pool_stats, shutdown_pools
 from Modules.ErrorHandler import handle_error
 
 # -----------------------------------------
@@ -75,42 +79,84 @@ async def close(self):
     await super().close()
 
 
-async def play_next(guild: discord.Guild):
+# 재생목록을 불러오는 동안 "N곡 추가됨" 메시지를 갱신하는 최소 간격(초)
+PROGRESS_UPDATE_INTERVAL = 2.0
+
+
+def format_added_message(tracks, loading=False):
+    header = f"**🎶 {len(tracks)}곡 추가됨{' (불러오는 중...)' if loading else ''}:**"
+    lines = [f"- {track.title}" for track in tracks[:10]]
+    if len(tracks) > 10:
+        lines.append(f"... 외 {len(tracks) - 10}곡")
+    return "\n".join([header, *lines])
+
+
+async def enqueue_stream(
+    ctx,
+    client,
+    tracks,
+    *,
+    error_message="음악을 불러오는 중 오류가 발생했습니다. 링크가 올바른지 확인해주세요.",
+    partial_message="⚠️ 재생목록 일부를 불러오지 못했습니다.",
+):
     """
-    큐에 남은 트랙이 있다면 다음 트랙을 재생.
+    비동기로 들어오는 트랙을 묶어서 대기열에 추가하고, 안내 메시지를 점진적으로 갱신.
     """
-    client = clients[guild.id]
-    voice_client = client.voice_client
+    added = []
+    pending = []
+    message = None
+    last_update = 0.0
+
+    async def flush(loading):
+        nonlocal pending, message, last_update
+        if pending:
+            client.audio_scheduler.enqueue_list(pending)
+            pending = []
+        content = format_added_message(added, loading)
+        if message is None:
+            message = await ctx.send(content)
+        else:
+            await message.edit(content=content)
+        last_update = time.monotonic()
 
-    # 예외처리: 봇이 음성채널에 없거나, 이미 무언가 재생중이면 종료
-    if not voice_client or not voice_client.is_connected():
-        return
-    if voice_client.is_playing() or voice_client.is_paused():
-        return
-    if client.audio_scheduler.is_empty():
-        return
+    try:
+        try:
+            async with ctx.typing():
+                async for track in tracks:
+                    added.append(track)
+                    pending.append(track)
+                    if message is None or time.monotonic() - last_update >= PROGRESS_UPDATE_INTERVAL:
+                        await flush(loading=True)
+        except Exception as e:
+            if not added:
+                return await handle_error(ctx, e, error_message)
+            await ctx.send(partial_message)
 
-    next_track = client.audio_scheduler.dequeue()
+        if not added:
+            return await ctx.send("⚠️ 재생할 수 있는 콘텐츠를 찾지 못했습니다!")
+        await flush(loading=False)
+    finally:
+        # 대기열에 넣기 전에 취소되면 받아 둔 트랙의 다운로드/임시 파일을 정리
+        for track in pending:
+            track.drop()
 
-    def after_play(error):
-        if error:
-            print(f'재생 오류: {error}')
-            if client.audio_scheduler.text_channel:
-                asyncio.run_coroutine_threadsafe(
-                    client.audio_scheduler.text_channel.send(f"⚠️ 재생 오류: {next_track.title}"),
-                    bot.loop
-                )
-        # 다음 곡 재생
-        fut = asyncio.run_coroutine_threadsafe(play_next(guild), bot.loop)
-        try:
-            fut.result()
-        except:
-            pass
 
-    voice_client.play(next_track, after=after_play)
-    # 텍스트 채널에 알림
-    if client.audio_scheduler.text_channel:
-        await client.audio_scheduler.text_channel.send(f"**▶️ 재생 중:** {next_track.title}")
+async def collect_attachments(message: discord.Message):
+    """
+    메시지의 첨부 파일과, 답장 대상 메시지의 첨부 파일을 순서대로 모음.
+    """
+    attachments = list(message.attachments)
+    reference = message.reference
+    if reference and reference.message_id:
+        referenced = reference.resolved
+        if not isinstance(referenced, discord.Message):
+            try:
+                referenced = await message.channel.fetch_message(reference.message_id)
+            except discord.HTTPException:
+                referenced = None
+        if referenced:
+            attachments.extend(referenced.attachments)
+    return attachments
 
 
 @bot.command(name='play')
@@ -126,50 +172,38 @@ async def play(ctx, *, url=None):
     client = clients[ctx.guild.id]
 
     try:
-        await client.join_voice_channel(ctx.author.voice.channel)
-        client.audio_scheduler.text_channel = ctx.channel
-
-        players = []
-
-        if ctx.message.attachments:
-            attachment = ctx.message.attachments[0]
-            if not attachment.content_type.startswith('audio/'):
-                return await ctx.send("⚠️ 오디오 파일만 업로드 가능합니다.")
+        # 이 요청의 추출 작업을 길드 단위로 분배하고, ?stop 시 함께 취소되도록 함
+        with client.request_scope():
+            await client.join_voice_channel(ctx.author.voice.channel)
+            client.audio_scheduler.text_channel = ctx.channel
+
+            # URL 없이 답장으로 ?play 한 경우에만 답장 대상 메시지의 파일까지 포함
+            attachments = await collect_attachments(ctx.message) if ctx.message.attachments or not url else []
+            if attachments:
+                audio_files = [
+                    attachment for attachment in attachments
+                    if (attachment.content_type or '').startswith('audio/')
+                ]
+                if not audio_files:
+                    return await ctx.send("⚠️ 오디오 파일만 업로드 가능합니다.")
+
+                # 첨부 파일을 동시에 처리하되, 대기열에는 메시지에 올라온 순서대로 추가
+                return await enqueue_stream(
+                    ctx,
+                    client,
+                    TrackFactory.iter_uploads(audio_files),
+                    error_message="파일 처리 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.",
+                    partial_message="⚠️ 일부 파일을 처리하지 못했습니다.",
+                )
 
-            async with ctx.typing():
-                try:
-                    players = await TrackFactory.from_upload(attachment)
-                    if not players or not isinstance(players, list):
-                        return await ctx.send("⚠️ 파일 처리에 실패했습니다.")
-                except Exception as e:
-                    return await handle_error(ctx, e, "파일 처리 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.")
-        else:
             if not url:
                 return await ctx.send("URL을 입력하거나 오디오 파일을 업로드해주세요!")
 
+            # 재생목록은 받아오는 대로 대기열에 넣고 첫 곡부터 바로 재생
+            return await enqueue_stream(ctx, client, TrackFactory.iter_url(url))
 
-            async with ctx.typing():
-                try:
-                    players = await TrackFactory.from_url(url)
-                    if not players or not isinstance(players, list):
-                        return await ctx.send("⚠️ 재생할 수 있는 콘텐츠를 찾지 못했습니다!")
-                    
-                    # Track 객체 유효성 검사 추가
-                    if any(not hasattr(track, 'title') for track in players):
-                        return await ctx.send("⚠️ 다시 시도해주세요!")
-                        
-                except Exception as e:
-                    return await handle_error(ctx, e, "음악을 불러오는 중 오류가 발생했습니다. 링크가 올바른지 확인해주세요.")
-
-        # 큐에 추가
-        client.audio_scheduler.enqueue_list(players)
-        # 사용자에게 알림
-        added_titles = "\n".join([f"- {p.title}" for p in players])
-        await ctx.send(f"**🎶 {len(players)}곡 추가됨:**\n{added_titles}")
-
-        if not client.voice_client.is_playing():
-            await play_next(ctx.guild)
-
+    except asyncio.CancelledError:
+        await ctx.send("⏹️ 불러오던 요청이 취소되었습니다.")
     except Exception as e:
         await handle_error(ctx, e, "알 수 없는 오류가 발생했습니다. 관리자에게 문의해주세요.")
 
@@ -191,24 +225,96 @@ async def show_queue(ctx):
     if client.audio_scheduler.is_empty():
         return await ctx.send("📭 재생 대기열이 비어 있습니다!")
 
+    # 상위 10곡만 꺼내서 보여주기 (전체 복사 없이)
     queue_list = [
         f"**{i + 1}.** {track.title}"
-        for i, track in enumerate(client.audio_scheduler.clone())
+        for i, track in enumerate(client.audio_scheduler.peek(10))
     ]
-    # 너무 길면 상위 10곡만 보여주기
-    display_text = "\n".join(queue_list[:10])
-    if len(queue_list) > 10:
-        display_text += f"\n... (총 {len(queue_list)}곡)"
+    display_text = "\n".join(queue_list)
+    total = len(client.audio_scheduler)
+    if total > 10:
+        display_text += f"\n... (총 {total}곡)"
 
     await ctx.send(f"**🎧 재생 대기열:**\n{display_text}")
 
+@bot.command(name='stats')
+async def stats(ctx):
+    """재생 전환 지연과 FFmpeg CPU 사용량 표시"""
+    metrics = clients[ctx.guild.id].playback_metrics
+    lines = ["**📊 재생 통계:**"]
+    if metrics.average_gap is not None:
+        lines.append(f"- 곡 전환 지연: 최근 {metrics.last_gap * 1000:.0f}ms / 평균 {metrics.average_gap * 1000:.0f}ms")
+    for mode, label in (("passthrough", "Opus 직접 전달"), ("transcode", "재인코딩")):
+        count = metrics.ffmpeg_tracks[mode]
+        if count:
+            cpu = metrics.ffmpeg_cpu[mode]
+            lines.append(f"- {label}: {count}곡, FFmpeg CPU {cpu:.1f}초 (곡당 {cpu / count:.2f}초)")
+    current = metrics.current_ffmpeg_cpu()
+    if current is not None:
+        lines.append(f"- 현재 곡 FFmpeg CPU: {current:.1f}초")
+    hub = broadcast_hub.stats()
+    if hub["shared"]:
+        lines.append(
+            f"- 공유 디코더: {hub['active']}개 재생 중, 지금까지 {hub['shared']}회 공유"
+            f" (재생 중인 위치에서 합류 {hub['joined_live']}회)"
+        )
+    cache = extraction_cache.stats()
+    lookups = cache["hits"] + cache["misses"] + cache["coalesced"]
+    if lookups:
+        lines.append(
+            f"- 추출 캐시: {cache['size']}개 저장, 적중 {cache['hits']}회 / 추출 {cache['misses']}회"
+            f" / 진행 중인 추출 공유 {cache['coalesced']}회 (적중률 {cache['hits'] / lookups:.0%})"
+        )
+    for name, pool in pool_stats().items():
+        lines.append(
+            f"- 추출 스레드 풀 `{name}`: 실행 {pool['running']}/{pool['workers']}, 대기 {pool['waiting']}"
+            f" (최대 {pool['peak_waiting']}), 완료 {pool['completed']}, 취소 {pool['cancelled']}"
+        )
+    if len(lines) == 1:
+        lines.append("아직 기록된 통계가 없습니다.")
+    await ctx.send("\n".join(lines))
+
+@bot.command(name='state')
+async def state(ctx):
+    """재생 루프 상태와 최근 상태 전환 표시 (디버깅용)"""
+    playback = clients[ctx.guild.id].playback
+    lines = [f"**🔁 재생 상태:** {playback.state.value}"]
+    for transition in list(playback.transitions)[-10:]:
+        at = time.strftime("%H:%M:%S", time.localtime(transition.at))
+        detail = f" — {transition.detail}" if transition.detail else ""
+        lines.append(f"`{at}` {transition.previous.value} → {transition.state.value}{detail}")
+    await ctx.send("\n".join(lines)[:2000])
+
+@bot.command(name='remove')
+async def remove(ctx, position: int):
+    """대기열에서 특정 곡 삭제"""
+    client = clients[ctx.guild.id]
+    try:
+        removed = client.audio_scheduler.remove(position - 1)
+    except IndexError:
+        return await ctx.send(f"⚠️ 1 ~ {len(client.audio_scheduler)} 사이의 번호를 입력해주세요.")
+    await ctx.send(f"🗑️ 대기열에서 삭제: {removed.title}")
+
+@bot.command(name='move')
+async def move(ctx, source: int, destination: int):
+    """대기열의 곡 순서 변경"""
+    client = clients[ctx.guild.id]
+    try:
+        moved = client.audio_scheduler.move(source - 1, destination - 1)
+    except IndexError:
+        return await ctx.send(f"⚠️ 1 ~ {len(client.audio_scheduler)} 사이의 번호를 입력해주세요.")
+    await ctx.send(f"↕️ {moved.title} → {destination}번")
+
 @bot.command(name='stop')
 async def stop(ctx):
     """모든 재생 정지 및 대기열 비우기"""
     client = clients[ctx.guild.id]
     voice_client = client.voice_client
     if voice_client and voice_client.is_connected():
+        client.cancel_requests()  # 불러오는 중인 요청 취소
         client.audio_scheduler.clear()  # 대기열 비우기
+        client.prefetcher.cancel_all()  # 미리 불러오던 곡과 띄워 둔 FFmpeg 정리
+        client.playback.interrupt()  # 재생 직전 불러오던 곡 취소
         if voice_client.is_playing():
             voice_client.stop()  # 재생 중지
         await ctx.send("🛑 모든 재생이 정지되고 대기열이 비워졌습니다.")
@@ -221,6 +327,7 @@ async def leave(ctx):
     client = clients[ctx.guild.id]
     voice_client = client.voice_client
     if voice_client and voice_client.is_connected():
+        client.cancel_requests()
         await client.leave_voice_channel()
         await ctx.send("👋 음성 채널을 떠났습니다.")
     else:
@@ -231,9 +338,7 @@ async def leave(ctx):
 async def pause(ctx):
     """재생 일시정지"""
     client = clients[ctx.guild.id]
-    voice_client = client.voice_client
-    if voice_client and voice_client.is_playing():
-        voice_client.pause()
+    if client.playback.pause():
         await ctx.send("⏸️ 일시정지")
     else:
         await ctx.send("재생 중인 곡이 없습니다!")
@@ -243,9 +348,7 @@ async def pause(ctx):
 async def resume(ctx):
     """재생 재개"""
     client = clients[ctx.guild.id]
-    voice_client = client.voice_client
-    if voice_client and voice_client.is_paused():
-        voice_client.resume()
+    if client.playback.resume():
         await ctx.send("▶️ 재생 재개")
     else:
         await ctx.send("일시정지 상태가 아닙니다!")
@@ -287,4 +390,8 @@ def _get_discord_token() -> str:
 
 
 if __name__ == "__main__":
-    bot.run(_get_discord_token())
+    try:
+        bot.run(_get_discord_token())
+    finally:
+        # 봇 종료 후 추출 스레드 풀 정리
+        shutdown_pools()